@@ -7,18 +7,252 @@ import os
 import sys
 import re
 import json
+import bisect
+import heapq
+import mmap
+import pickle
 import logging
-from typing import Dict, List, Any, Optional, Set, Tuple
+from typing import Deque, Dict, FrozenSet, List, Any, Optional, Set, Tuple
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import networkx as nx
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import count, islice
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import breadth_first_order
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+from ia_assistant.analysis.impact_jit import (
+    DEPENDENCY_TYPE_IDS,
+    MODIFIER_CRITICAL,
+    MODIFIER_NONE,
+    MODIFIER_OPTIONAL,
+    calc_strength,
+    find_newlines
+)
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Quantidade máxima de análises mantidas no histórico
+MAX_IMPACT_HISTORY = 5000
+
+# Quantidade mínima de arquivos para compensar o custo de iniciar processos
+PARALLEL_SCAN_THRESHOLD = 64
+
+# Arquivos até este tamanho são lidos antecipadamente por threads; maiores são mapeados
+PREFETCH_MAX_FILE_SIZE = 1024 * 1024
+PREFETCH_WINDOW = 64
+
+# Versão do formato do cache persistente de ocorrências (ver ImpactAnalyzer.cache_file)
+CACHE_FORMAT_VERSION = 1
+
+# Ocorrência bruta encontrada em um arquivo: (tipo, alvo, contexto, linha)
+RawMatch = Tuple[str, str, str, Optional[int]]
+
+class _DependencyScanner:
+    """Localiza ocorrências dos padrões de dependência no conteúdo (bytes) de arquivos."""
+    
+    def __init__(self, dependency_patterns: Dict[str, List[str]], use_hyperscan: bool = True):
+        self.dependency_patterns = dependency_patterns
+        self.use_hyperscan = use_hyperscan
+        
+        # Padrões individuais (compilados pelo Hyperscan) e o tipo de cada um
+        self._pattern_regexes: List[re.Pattern] = []
+        self._pattern_types: List[str] = []
+        
+        # Funde todos os padrões em uma única alternância de grupos nomeados para
+        # varrer o conteúdo uma só vez; match.lastgroup identifica o padrão. As
+        # ocorrências não se sobrepõem: em cada posição vale o primeiro padrão
+        self._pattern_groups: Dict[str, Tuple[str, int]] = {}
+        alternatives = []
+        group_index = 1
+        for dep_type, patterns in dependency_patterns.items():
+            for idx, pattern in enumerate(patterns):
+                group_name = f"{dep_type}__{idx}"
+                compiled = re.compile(pattern.encode(), re.IGNORECASE)
+                self._pattern_regexes.append(compiled)
+                self._pattern_types.append(dep_type)
+                # O alvo é o primeiro grupo de captura dentro do grupo nomeado
+                self._pattern_groups[group_name] = (dep_type, group_index + 1)
+                alternatives.append(f"(?P<{group_name}>{pattern})")
+                group_index += 1 + compiled.groups
+        # Compilada em modo bytes para varrer o arquivo mapeado sem decodificá-lo
+        self.regex = re.compile('|'.join(alternatives).encode(), re.IGNORECASE)
+        
+        self._hyperscan_db = self._compile_hyperscan() if use_hyperscan and HYPERSCAN_AVAILABLE else None
+    
+    def __getstate__(self):
+        # O banco do Hyperscan não é serializável; é recompilado no destino
+        return {'dependency_patterns': self.dependency_patterns, 'use_hyperscan': self.use_hyperscan}
+    
+    def __setstate__(self, state):
+        self.__init__(state['dependency_patterns'], state['use_hyperscan'])
+    
+    def _compile_hyperscan(self):
+        """Compila todos os padrões em um único banco de varredura do Hyperscan."""
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[regex.pattern for regex in self._pattern_regexes],
+                ids=list(range(len(self._pattern_regexes))),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(self._pattern_regexes)
+            )
+            return db
+        except Exception as e:
+            logger.warning(f"Hyperscan indisponível, usando expressões regulares: {e}")
+            return None
+    
+    def scan(self, content) -> List[Tuple[str, bytes, bytes, int]]:
+        """Retorna (tipo, alvo, contexto, posição) de cada ocorrência, em ordem de posição."""
+        if self._hyperscan_db is not None:
+            return self._scan_hyperscan(content)
+        
+        occurrences = []
+        for match in self.regex.finditer(content):
+            dep_type, target_group = self._pattern_groups[match.lastgroup]
+            occurrences.append((dep_type, match.group(target_group), match.group(match.lastgroup), match.start()))
+        return occurrences
+    
+    def _scan_hyperscan(self, content) -> List[Tuple[str, bytes, bytes, int]]:
+        """
+        Monta as ocorrências a partir dos eventos do Hyperscan: cada início
+        reportado é confirmado re-executando apenas o padrão do evento, ancorado
+        naquela posição, para extrair os grupos. Reproduz a semântica da
+        expressão fundida (sem sobreposição; no mesmo início vale o primeiro padrão).
+        """
+        # (início, padrão) -> maior fim reportado; o Hyperscan emite um evento por fim
+        spans: Dict[Tuple[int, int], int] = {}
+        
+        def on_match(pattern_id, start, end, flags, context):
+            key = (start, pattern_id)
+            if spans.get(key, -1) < end:
+                spans[key] = end
+        
+        # O Hyperscan lê o buffer (bytes ou mmap) diretamente, sem cópia
+        self._hyperscan_db.scan(content, match_event_handler=on_match)
+        if not spans:
+            return []
+        
+        # Candidatos (posição, padrão, desempate, fim, match): a posição é um limite
+        # inferior do início real até o candidato ser confirmado (match preenchido)
+        tiebreak = count()
+        candidates = [(start, pattern_id, next(tiebreak), end, None)
+                      for (start, pattern_id), end in spans.items()]
+        heapq.heapify(candidates)
+        
+        occurrences = []
+        position = 0
+        while candidates:
+            start, pattern_id, _, end, match = heapq.heappop(candidates)
+            regex = self._pattern_regexes[pattern_id]
+            
+            if start < position:
+                # Ocorrência iniciada dentro da anterior: o padrão ainda pode casar
+                # mais adiante no mesmo trecho (o Hyperscan só reporta o início mais à esquerda)
+                if end > position:
+                    match = regex.search(content, position)
+                    if match is not None:
+                        heapq.heappush(candidates, (match.start(), pattern_id, next(tiebreak), match.end(), match))
+                continue
+            
+            if match is None:
+                match = regex.match(content, start)
+                if match is None:
+                    continue
+            
+            dep_type = self._pattern_types[pattern_id]
+            occurrences.append((dep_type, match.group(1), match.group(0), start))
+            position = max(match.end(), start + 1)
+        
+        return occurrences
+
+def _scan_content(content, scanner: _DependencyScanner) -> List[RawMatch]:
+    """Extrai as ocorrências de dependência do conteúdo (bytes ou mmap) de um arquivo."""
+    matches = []
+    
+    # Ignora arquivos binários (byte nulo no início, mesmo critério do git)
+    if b'\0' in content[:8000]:
+        return matches
+    
+    newline_offsets = find_newlines(content)
+    
+    # Decodifica apenas os trechos encontrados
+    for dep_type, target, context, start in scanner.scan(content):
+        matches.append((
+            dep_type,
+            target.decode('utf-8', 'replace'),
+            context.decode('utf-8', 'replace'),
+            bisect.bisect_left(newline_offsets, start) + 1
+        ))
+    
+    return matches
+
+def _scan_file_matches(file_path: str, scanner: _DependencyScanner) -> List[RawMatch]:
+    """Extrai as ocorrências de dependência de um arquivo mapeado em memória."""
+    with open(file_path, 'rb') as f:
+        # Arquivos vazios não podem ser mapeados em memória
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            return _scan_content(content, scanner)
+
+def _prefetch_file(file_path: str) -> Optional[bytes]:
+    """Lê arquivos pequenos por completo; retorna None para os que devem ser mapeados."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > PREFETCH_MAX_FILE_SIZE:
+            return None
+        return f.read()
+
+# Varredor usado pelos processos de varredura (definido pelo initializer)
+_worker_scanner: Optional[_DependencyScanner] = None
+
+def _init_scan_worker(scanner: _DependencyScanner):
+    """Inicializa um processo de varredura compilando os padrões uma única vez."""
+    global _worker_scanner
+    _worker_scanner = scanner
+
+def _scan_one(file_path: str) -> Tuple[str, Optional[List[RawMatch]]]:
+    """Extrai as ocorrências de um arquivo dentro de um processo de varredura."""
+    try:
+        return file_path, _scan_file_matches(file_path, _worker_scanner)
+    except Exception as e:
+        logger.warning(f"Erro ao analisar dependências de {file_path}: {e}")
+        return file_path, None
+
+# Palavras do contexto que ajustam a força (críticas têm precedência)
+_CRITICAL_CONTEXT_RE = re.compile(r'critical|essential', re.IGNORECASE)
+_OPTIONAL_CONTEXT_RE = re.compile(r'optional|maybe', re.IGNORECASE)
+
+@lru_cache(maxsize=65536)
+def _dependency_strength(dep_type: str, context: str) -> float:
+    """Calcula força da dependência (0.0 a 1.0), memorizando contextos repetidos."""
+    if _CRITICAL_CONTEXT_RE.search(context):
+        modifier_id = MODIFIER_CRITICAL
+    elif _OPTIONAL_CONTEXT_RE.search(context):
+        modifier_id = MODIFIER_OPTIONAL
+    else:
+        modifier_id = MODIFIER_NONE
+    
+    return calc_strength(DEPENDENCY_TYPE_IDS.get(dep_type, -1), modifier_id)
+
 class ImpactLevel(Enum):
     """Níveis de impacto das mudanças."""
     LOW = "low"
@@ -34,7 +268,10 @@ class DependencyType(Enum):
     IMPLEMENTS = "implements" # Implementação
     DEPENDS_ON = "depends_on" # Dependência funcional
 
-@dataclass
+# Tipos de dependência indexados pelo identificador numérico
+_DEPENDENCY_TYPES = sorted(DependencyType, key=lambda t: DEPENDENCY_TYPE_IDS[t.value])
+
+@dataclass(slots=True)
 class Dependency:
     """Representa uma dependência entre documentos."""
     source_file: str
@@ -46,9 +283,14 @@ class Dependency:
     
     def to_dict(self) -> Dict[str, Any]:
         """Converte para dicionário para serialização."""
-        data = asdict(self)
-        data['dependency_type'] = self.dependency_type.value
-        return data
+        return {
+            'source_file': self.source_file,
+            'target_file': self.target_file,
+            'dependency_type': self.dependency_type.value,
+            'line_number': self.line_number,
+            'context': self.context,
+            'strength': self.strength
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Dependency':
@@ -56,7 +298,7 @@ class Dependency:
         data['dependency_type'] = DependencyType(data['dependency_type'])
         return cls(**data)
 
-@dataclass
+@dataclass(slots=True)
 class ImpactAnalysis:
     """Resultado da análise de impacto."""
     changed_file: str
@@ -69,32 +311,79 @@ class ImpactAnalysis:
     
     def to_dict(self) -> Dict[str, Any]:
         """Converte para dicionário para serialização."""
-        data = asdict(self)
-        data['impact_level'] = self.impact_level.value
-        data['timestamp'] = self.timestamp.isoformat()
-        return data
+        return {
+            'changed_file': self.changed_file,
+            'impact_level': self.impact_level.value,
+            'affected_files': list(self.affected_files),
+            'dependencies': [dep.to_dict() for dep in self.dependencies],
+            'estimated_effort': self.estimated_effort,
+            'recommendations': list(self.recommendations),
+            'timestamp': self.timestamp.isoformat()
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ImpactAnalysis':
         """Cria instância a partir de dicionário."""
         data['impact_level'] = ImpactLevel(data['impact_level'])
+        data['dependencies'] = [Dependency.from_dict(dep) for dep in data['dependencies']]
         data['timestamp'] = datetime.fromisoformat(data['timestamp'])
         return cls(**data)
 
 class ImpactAnalyzer:
     """Analisador de impacto de mudanças."""
     
-    def __init__(self, base_paths: List[str]):
+    def __init__(self, base_paths: List[str], max_workers: Optional[int] = None,
+                 cache_file: Optional[str] = None, use_cache: bool = True,
+                 use_hyperscan: bool = True):
         """
         Inicializa o analisador de impacto.
         
         Args:
             base_paths: Caminhos da base de conhecimento
+            max_workers: Número máximo de processos na varredura (padrão: núcleos disponíveis)
+            cache_file: Arquivo do cache de varredura; sem ele (padrão), as
+                ocorrências não são persistidas e cada instância relê todos os arquivos
+            use_cache: Se False, ignora cache_file
+            use_hyperscan: Se False, não usa o Hyperscan mesmo quando instalado
         """
         self.base_paths = base_paths
+        self.max_workers = max_workers
+        self.cache_file = cache_file if use_cache else None
         self.dependency_graph = nx.DiGraph()
-        self.file_dependencies: Dict[str, List[Dependency]] = defaultdict(list)
-        self.impact_history: List[ImpactAnalysis] = []
+        self._graph_version = 0
+        self._descendants_cache: Dict[Tuple[int, str], FrozenSet[str]] = {}
+        self.impact_history: Deque[ImpactAnalysis] = deque(maxlen=MAX_IMPACT_HISTORY)
+        
+        # Índice em memória dos arquivos da base, preenchido durante a varredura
+        self._file_index: Dict[str, List[str]] = defaultdict(list)
+        self._indexed_paths: Set[str] = set()
+        self._indexed_names: List[Tuple[str, str]] = []
+        self._resolve_cache: Dict[Tuple[str, Optional[str]], Optional[str]] = {}
+        
+        # Caminhos internados: cada caminho tem um único objeto str em toda a análise
+        self._intern: Dict[str, str] = {}
+        
+        # Dependências armazenadas em colunas (uma posição por dependência),
+        # com caminhos substituídos por identificadores inteiros
+        self._paths: List[str] = []
+        self._path_ids: Dict[str, int] = {}
+        self._dep_src = array('i')
+        self._dep_tgt = array('i')
+        self._dep_type = array('B')
+        self._dep_line = array('i')  # -1 quando a linha é desconhecida
+        self._dep_strength = array('d')
+        self._dep_context: List[str] = []
+        self._dep_ranges: Dict[int, Tuple[int, int]] = {}  # origem -> (início, fim)
+        self._reverse_deps: Dict[int, List[int]] = defaultdict(list)  # alvo -> posições
+        
+        # Adjacência em formato CSR (indptr/indices) usada na busca de descendentes
+        self._adj_indptr = array('i', [0])
+        self._adj_indices = array('i')
+        self._csr = None
+        
+        # Diretórios e extensões ignorados na varredura
+        self._ignored_dirs = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv'})
+        self._ignored_suffixes = ('.pyc', '.pyo', '.log', '.tmp', '.cache')
         
         # Padrões de detecção de dependências
         self.dependency_patterns = {
@@ -122,6 +411,13 @@ class ImpactAnalyzer:
             ]
         }
         
+        # Varredor com todos os padrões compilados (Hyperscan quando disponível)
+        self._scanner = _DependencyScanner(self.dependency_patterns, use_hyperscan=use_hyperscan)
+        
+        # Cache de varredura: caminho -> (mtime_ns, tamanho, ocorrências)
+        self._scan_cache: Dict[str, Tuple[int, int, List[RawMatch]]] = self._load_scan_cache()
+        self._scan_cache_dirty = False
+        
         # Inicializa análise de dependências
         self._build_dependency_graph()
     
@@ -131,82 +427,339 @@ class ImpactAnalyzer:
         
         try:
             # Escaneia todos os arquivos
+            file_paths = []
             for base_path in self.base_paths:
                 if os.path.exists(base_path):
-                    self._scan_directory_for_dependencies(base_path)
+                    file_paths.extend(self._scan_directory_for_dependencies(base_path))
+            
+            for file_path, dependencies in self._analyze_files(file_paths):
+                if dependencies:
+                    self._store_dependencies(file_path, dependencies)
             
             # Constrói grafo
-            for file_path, dependencies in self.file_dependencies.items():
-                for dep in dependencies:
-                    self.dependency_graph.add_edge(
-                        file_path, 
-                        dep.target_file, 
-                        weight=dep.strength,
-                        dependency_type=dep.dependency_type.value
-                    )
+            for index in range(len(self._dep_src)):
+                self.dependency_graph.add_edge(
+                    self._paths[self._dep_src[index]],
+                    self._paths[self._dep_tgt[index]],
+                    weight=self._dep_strength[index],
+                    dependency_type=_DEPENDENCY_TYPES[self._dep_type[index]].value
+                )
+            self._build_adjacency()
+            self._bump_graph_version()
             
             logger.info(f"Grafo de dependências construído: {len(self.dependency_graph.nodes)} nós, {len(self.dependency_graph.edges)} arestas")
             
         except Exception as e:
             logger.error(f"Erro ao construir grafo de dependências: {e}")
     
-    def _scan_directory_for_dependencies(self, directory: str):
-        """Escaneia diretório em busca de dependências."""
-        for root, dirs, files in os.walk(directory):
-            # Remove diretórios ignorados
-            dirs[:] = [d for d in dirs if not self._should_ignore_directory(d)]
+    def _build_adjacency(self):
+        """Monta a adjacência em formato CSR a partir das colunas de dependências."""
+        indptr = array('i', [0])
+        indices = array('i')
+        for path_id in range(len(self._paths)):
+            start, end = self._dep_ranges.get(path_id, (0, 0))
+            indices.extend(self._dep_tgt[start:end])
+            indptr.append(len(indices))
+        
+        self._adj_indptr = indptr
+        self._adj_indices = indices
+        
+        if SCIPY_AVAILABLE and indices:
+            size = len(self._paths)
+            self._csr = csr_matrix(
+                (np.ones(len(indices), dtype=np.int8), np.asarray(indices), np.asarray(indptr)),
+                shape=(size, size)
+            )
+        else:
+            self._csr = None
+    
+    def _descendants(self, path_id: int) -> FrozenSet[str]:
+        """Obtém todos os arquivos alcançáveis a partir do arquivo informado."""
+        if self._csr is not None:
+            # Busca em largura implementada em C pelo SciPy
+            order = breadth_first_order(self._csr, path_id, directed=True, return_predecessors=False)
+            reachable = set(order.tolist())
+        else:
+            reachable = {path_id}
+            queue = [path_id]
+            for node in queue:
+                for neighbor in self._adj_indices[self._adj_indptr[node]:self._adj_indptr[node + 1]]:
+                    if neighbor not in reachable:
+                        reachable.add(neighbor)
+                        queue.append(neighbor)
+        
+        # Assim como nx.descendants, o próprio arquivo não é incluído
+        reachable.discard(path_id)
+        return frozenset(self._paths[node] for node in reachable)
+    
+    def _bump_graph_version(self):
+        """Marca o grafo como alterado, invalidando consultas memorizadas."""
+        self._graph_version += 1
+        self._descendants_cache.clear()
+    
+    def _scan_directory_for_dependencies(self, directory: str) -> List[str]:
+        """Escaneia diretório em busca de arquivos a analisar."""
+        # Percorre com os.scandir para reaproveitar o tipo já retornado pelo
+        # sistema de arquivos em cada DirEntry, sem stat() extra por entrada
+        file_paths = []
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            subdirs = []
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            # Assim como os.walk, não segue links simbólicos de diretórios
+                            if not entry.is_symlink() and not self._should_ignore_directory(entry.name):
+                                subdirs.append(entry.path)
+                        elif not self._should_ignore_file(entry.name):
+                            file_path = self._i(entry.path)
+                            file_paths.append(file_path)
+                            self._index_file(entry.name, file_path)
+            except OSError as e:
+                logger.warning(f"Erro ao escanear diretório {current}: {e}")
             
-            for file in files:
-                if not self._should_ignore_file(file):
-                    file_path = os.path.join(root, file)
-                    self._analyze_file_dependencies(file_path)
+            # Empilha em ordem inversa para visitar na mesma ordem do os.walk
+            pending.extend(reversed(subdirs))
+        
+        return file_paths
+    
+    def _i(self, path: str) -> str:
+        """Retorna a instância única (internada) do caminho."""
+        return self._intern.setdefault(path, sys.intern(path))
+    
+    def _index_file(self, file_name: str, file_path: str):
+        """Registra arquivo no índice usado para resolver dependências."""
+        file_path = self._i(file_path)
+        self._file_index[file_name].append(file_path)
+        self._indexed_paths.add(os.path.normpath(file_path))
+        self._indexed_names.append((file_name.lower(), file_path))
+        self._resolve_cache.clear()
+    
+    def _analyze_files(self, file_paths: List[str]) -> List[Tuple[str, List[Dependency]]]:
+        """Analisa dependências dos arquivos, reaproveitando o cache de varredura."""
+        matches_by_file: Dict[str, Optional[List[RawMatch]]] = {}
+        signatures: Dict[str, Tuple[int, int]] = {}
+        pending = []
+        
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                logger.warning(f"Erro ao analisar dependências de {file_path}: {e}")
+                continue
+            
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = self._scan_cache.get(file_path)
+            if cached is not None and cached[:2] == signature:
+                matches_by_file[file_path] = cached[2]
+            else:
+                signatures[file_path] = signature
+                pending.append(file_path)
+        
+        for file_path, matches in self._scan_files(pending):
+            matches_by_file[file_path] = matches
+            if matches is not None:
+                self._scan_cache[file_path] = signatures[file_path] + (matches,)
+                self._scan_cache_dirty = True
+        
+        self._save_scan_cache(file_paths)
+        
+        return [
+            (file_path, self._build_dependencies(file_path, matches_by_file[file_path]))
+            for file_path in file_paths
+            if matches_by_file.get(file_path)
+        ]
+    
+    def _scan_files(self, file_paths: List[str]) -> List[Tuple[str, Optional[List[RawMatch]]]]:
+        """Extrai as ocorrências dos arquivos, em paralelo quando há muitos arquivos."""
+        if len(file_paths) >= PARALLEL_SCAN_THRESHOLD and self.max_workers != 1:
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_workers,
+                                         initializer=_init_scan_worker,
+                                         initargs=(self._scanner,)) as executor:
+                    return list(executor.map(_scan_one, file_paths, chunksize=32))
+            except Exception as e:
+                logger.warning(f"Varredura paralela indisponível, usando modo sequencial: {e}")
+        
+        return self._scan_files_prefetching(file_paths)
+    
+    def _scan_files_prefetching(self, file_paths: List[str]) -> List[Tuple[str, Optional[List[RawMatch]]]]:
+        """Extrai as ocorrências no processo atual, lendo os próximos arquivos em threads."""
+        results = []
+        remaining = iter(file_paths)
+        
+        # Janela limitada de leituras antecipadas enquanto o arquivo atual é varrido
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            pending = deque(
+                (file_path, executor.submit(_prefetch_file, file_path))
+                for file_path in islice(remaining, PREFETCH_WINDOW)
+            )
+            while pending:
+                file_path, future = pending.popleft()
+                next_path = next(remaining, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(_prefetch_file, next_path)))
+                results.append((file_path, self._scan_file(file_path, future)))
+        
+        return results
+    
+    def _scan_file(self, file_path: str, prefetched: Optional[Future] = None) -> Optional[List[RawMatch]]:
+        """Extrai as ocorrências de um arquivo no processo atual."""
+        try:
+            content = prefetched.result() if prefetched is not None else None
+            if content is not None:
+                return _scan_content(content, self._scanner)
+            return _scan_file_matches(file_path, self._scanner)
+        except Exception as e:
+            logger.warning(f"Erro ao analisar dependências de {file_path}: {e}")
+            return None
+    
+    def _load_scan_cache(self) -> Dict[str, Tuple[int, int, List[RawMatch]]]:
+        """Carrega o cache de varredura do disco, se compatível com os padrões atuais."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+            if (data.get('version') == CACHE_FORMAT_VERSION and
+                    data.get('pattern') == self._scanner.regex.pattern):
+                return data['files']
+        except Exception as e:
+            logger.warning(f"Erro ao carregar cache de dependências: {e}")
+        
+        return {}
+    
+    def _save_scan_cache(self, scanned_files: List[str]):
+        """Persiste o cache de varredura, descartando arquivos fora da varredura atual."""
+        if not self.cache_file:
+            return
+        
+        # Mantém apenas os arquivos de base_paths (removidos ou de outros projetos saem)
+        scanned = set(scanned_files)
+        stale = [path for path in self._scan_cache if path not in scanned]
+        for path in stale:
+            del self._scan_cache[path]
+        
+        if not self._scan_cache_dirty and not stale:
+            return
+        
+        try:
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            data = {
+                'version': CACHE_FORMAT_VERSION,
+                'pattern': self._scanner.regex.pattern,
+                'files': self._scan_cache
+            }
+            # Grava em arquivo temporário e substitui, evitando cache corrompido
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, self.cache_file)
+            self._scan_cache_dirty = False
+        except Exception as e:
+            logger.warning(f"Erro ao salvar cache de dependências: {e}")
     
     def _should_ignore_directory(self, dir_name: str) -> bool:
         """Verifica se diretório deve ser ignorado."""
-        ignored_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv'}
-        return dir_name in ignored_dirs
+        return dir_name in self._ignored_dirs
     
     def _should_ignore_file(self, file_name: str) -> bool:
         """Verifica se arquivo deve ser ignorado."""
-        ignored_extensions = {'.pyc', '.pyo', '.log', '.tmp', '.cache'}
-        return any(file_name.endswith(ext) for ext in ignored_extensions)
+        # str.endswith com tupla verifica todas as extensões em uma única chamada
+        return file_name.endswith(self._ignored_suffixes)
     
-    def _analyze_file_dependencies(self, file_path: str):
-        """Analisa dependências de um arquivo específico."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            dependencies = []
-            
-            # Analisa cada tipo de dependência
-            for dep_type, patterns in self.dependency_patterns.items():
-                for pattern in patterns:
-                    matches = re.finditer(pattern, content, re.IGNORECASE)
-                    
-                    for match in matches:
-                        target = match.group(1)
-                        target_file = self._resolve_target_file(target, file_path)
-                        
-                        if target_file and target_file != file_path:
-                            dependency = Dependency(
-                                source_file=file_path,
-                                target_file=target_file,
-                                dependency_type=DependencyType(dep_type),
-                                line_number=self._get_line_number(content, match.start()),
-                                context=match.group(0),
-                                strength=self._calculate_dependency_strength(dep_type, match.group(0))
-                            )
-                            dependencies.append(dependency)
+    def _build_dependencies(self, file_path: str, matches: List[RawMatch]) -> List[Dependency]:
+        """Resolve as ocorrências de um arquivo em dependências."""
+        dependencies = []
+        
+        for dep_type, target, context, line_number in matches:
+            target_file = self._resolve_target_file(target, file_path)
             
-            if dependencies:
-                self.file_dependencies[file_path] = dependencies
-                
-        except Exception as e:
-            logger.warning(f"Erro ao analisar dependências de {file_path}: {e}")
+            if target_file and target_file != file_path:
+                dependency = Dependency(
+                    source_file=file_path,
+                    target_file=target_file,
+                    dependency_type=DependencyType(dep_type),
+                    line_number=line_number,
+                    context=context,
+                    strength=self._calculate_dependency_strength(dep_type, context)
+                )
+                dependencies.append(dependency)
+        
+        return dependencies
+    
+    def _path_id(self, file_path: str) -> int:
+        """Obtém (ou cria) o identificador inteiro de um caminho."""
+        path_id = self._path_ids.get(file_path)
+        if path_id is None:
+            file_path = self._i(file_path)
+            path_id = len(self._paths)
+            self._path_ids[file_path] = path_id
+            self._paths.append(file_path)
+        return path_id
+    
+    def _store_dependencies(self, file_path: str, dependencies: List[Dependency]):
+        """Armazena as dependências de um arquivo nas colunas do analisador."""
+        source_id = self._path_id(file_path)
+        start = len(self._dep_src)
+        for dep in dependencies:
+            target_id = self._path_id(dep.target_file)
+            self._reverse_deps[target_id].append(len(self._dep_src))
+            self._dep_src.append(source_id)
+            self._dep_tgt.append(target_id)
+            self._dep_type.append(DEPENDENCY_TYPE_IDS[dep.dependency_type.value])
+            self._dep_line.append(dep.line_number if dep.line_number is not None else -1)
+            self._dep_strength.append(dep.strength)
+            self._dep_context.append(dep.context)
+        self._dep_ranges[source_id] = (start, len(self._dep_src))
+    
+    def _dependency_at(self, index: int) -> Dependency:
+        """Reconstrói a dependência armazenada na posição informada."""
+        line_number = self._dep_line[index]
+        return Dependency(
+            source_file=self._paths[self._dep_src[index]],
+            target_file=self._paths[self._dep_tgt[index]],
+            dependency_type=_DEPENDENCY_TYPES[self._dep_type[index]],
+            line_number=line_number if line_number >= 0 else None,
+            context=self._dep_context[index],
+            strength=self._dep_strength[index]
+        )
+    
+    def _dependency_range(self, file_path: str) -> range:
+        """Obtém as posições das dependências que partem do arquivo."""
+        path_id = self._path_ids.get(file_path)
+        start, end = self._dep_ranges.get(path_id, (0, 0))
+        return range(start, end)
+    
+    def _dependents_of(self, file_path: str) -> List[int]:
+        """Obtém as posições das dependências que apontam para o arquivo."""
+        return self._reverse_deps.get(self._path_ids.get(file_path), [])
+    
+    @property
+    def file_dependencies(self) -> Dict[str, List[Dependency]]:
+        """Dependências agrupadas por arquivo de origem (materializadas sob demanda)."""
+        return {
+            self._paths[source_id]: [self._dependency_at(index) for index in range(start, end)]
+            for source_id, (start, end) in self._dep_ranges.items()
+        }
     
     def _resolve_target_file(self, target: str, source_file: str) -> Optional[str]:
-        """Resolve o caminho do arquivo alvo."""
+        """Resolve o caminho do arquivo alvo, memorizando alvos já resolvidos."""
+        # O diretório de origem só influencia caminhos relativos
+        is_relative = target.startswith('./') or target.startswith('../')
+        key = (target, os.path.dirname(source_file) if is_relative else None)
+        if key not in self._resolve_cache:
+            target_file = self._lookup_target_file(target, source_file)
+            self._resolve_cache[key] = self._i(target_file) if target_file else None
+        return self._resolve_cache[key]
+    
+    def _lookup_target_file(self, target: str, source_file: str) -> Optional[str]:
+        """Procura o caminho do arquivo alvo no índice da base."""
         try:
             # Se é um caminho relativo
             if target.startswith('./') or target.startswith('../'):
@@ -220,54 +773,30 @@ class ImpactAnalyzer:
                 # Procura em todos os diretórios base
                 for base_path in self.base_paths:
                     potential_path = os.path.join(base_path, target)
-                    if os.path.exists(potential_path):
+                    if os.path.normpath(potential_path) in self._indexed_paths:
                         return potential_path
-                    
-                    # Procura recursivamente
-                    for root, dirs, files in os.walk(base_path):
-                        if target in files:
-                            return os.path.join(root, target)
+                
+                # Procura pelo nome em qualquer subdiretório
+                candidates = self._file_index.get(target)
+                if candidates:
+                    return candidates[0]
             
             # Se é uma referência por nome
             else:
                 # Procura arquivos com esse nome
-                for base_path in self.base_paths:
-                    for root, dirs, files in os.walk(base_path):
-                        for file in files:
-                            if file.lower().startswith(target.lower()) or target.lower() in file.lower():
-                                return os.path.join(root, file)
+                target_lower = target.lower()
+                for file_name, file_path in self._indexed_names:
+                    if target_lower in file_name:
+                        return file_path
             
         except Exception as e:
             logger.warning(f"Erro ao resolver target {target}: {e}")
         
         return None
     
-    def _get_line_number(self, content: str, position: int) -> Optional[int]:
-        """Obtém número da linha baseado na posição."""
-        try:
-            return content[:position].count('\n') + 1
-        except:
-            return None
-    
     def _calculate_dependency_strength(self, dep_type: str, context: str) -> float:
         """Calcula força da dependência (0.0 a 1.0)."""
-        base_strengths = {
-            'reference': 0.3,
-            'imports': 0.8,
-            'extends': 0.9,
-            'implements': 0.9,
-            'depends_on': 0.7
-        }
-        
-        base_strength = base_strengths.get(dep_type, 0.5)
-        
-        # Ajusta baseado no contexto
-        if 'critical' in context.lower() or 'essential' in context.lower():
-            base_strength *= 1.2
-        elif 'optional' in context.lower() or 'maybe' in context.lower():
-            base_strength *= 0.8
-        
-        return min(1.0, base_strength)
+        return _dependency_strength(dep_type, context)
     
     def analyze_impact(self, changed_file: str) -> ImpactAnalysis:
         """
@@ -281,6 +810,7 @@ class ImpactAnalyzer:
         """
         try:
             logger.info(f"Analisando impacto de mudança em: {changed_file}")
+            changed_file = self._i(changed_file)
             
             # Encontra arquivos afetados
             affected_files = self._find_affected_files(changed_file)
@@ -325,19 +855,22 @@ class ImpactAnalyzer:
         
         try:
             # Usa o grafo de dependências para encontrar arquivos afetados
-            if changed_file in self.dependency_graph:
+            path_id = self._path_ids.get(changed_file)
+            if path_id is not None:
                 # Encontra todos os nós que dependem do arquivo mudado
-                descendants = nx.descendants(self.dependency_graph, changed_file)
+                key = (self._graph_version, changed_file)
+                descendants = self._descendants_cache.get(key)
+                if descendants is None:
+                    descendants = self._descendants(path_id)
+                    self._descendants_cache[key] = descendants
                 affected_files.update(descendants)
                 
                 # Também inclui o próprio arquivo
                 affected_files.add(changed_file)
             
             # Busca por referências reversas
-            for file_path, deps in self.file_dependencies.items():
-                for dep in deps:
-                    if dep.target_file == changed_file:
-                        affected_files.add(file_path)
+            for index in self._dependents_of(changed_file):
+                affected_files.add(self._paths[self._dep_src[index]])
             
         except Exception as e:
             logger.error(f"Erro ao encontrar arquivos afetados: {e}")
@@ -350,7 +883,7 @@ class ImpactAnalyzer:
             # Fatores para cálculo de impacto
             num_affected = len(affected_files)
             file_type = self._get_file_type(changed_file)
-            dependency_count = len(self.file_dependencies.get(changed_file, []))
+            dependency_count = len(self._dependency_range(changed_file))
             
             # Pontuação base
             score = 0
@@ -415,13 +948,10 @@ class ImpactAnalyzer:
         dependencies = []
         
         # Dependências do arquivo mudado
-        dependencies.extend(self.file_dependencies.get(changed_file, []))
+        dependencies.extend(self._dependency_at(index) for index in self._dependency_range(changed_file))
         
         # Dependências que apontam para o arquivo mudado
-        for file_path, deps in self.file_dependencies.items():
-            for dep in deps:
-                if dep.target_file == changed_file:
-                    dependencies.append(dep)
+        dependencies.extend(self._dependency_at(index) for index in self._dependents_of(changed_file))
         
         return dependencies
     
@@ -476,7 +1006,8 @@ class ImpactAnalyzer:
     
     def get_impact_history(self, limit: int = 50) -> List[ImpactAnalysis]:
         """Obtém histórico de análises de impacto."""
-        return self.impact_history[-limit:]
+        start = max(0, len(self.impact_history) - limit)
+        return list(islice(self.impact_history, start, None))
     
     def get_dependency_stats(self) -> Dict[str, Any]:
         """Obtém estatísticas do grafo de dependências."""
@@ -496,17 +1027,15 @@ class ImpactAnalyzer:
         """Obtém as dependências mais fortes."""
         try:
             edges = self.dependency_graph.edges(data=True)
-            sorted_edges = sorted(edges, key=lambda x: x[2].get('weight', 0), reverse=True)
-            return [(u, v, d.get('weight', 0)) for u, v, d in sorted_edges[:10]]
+            top_edges = heapq.nlargest(10, edges, key=lambda x: x[2].get('weight', 0))
+            return [(u, v, d.get('weight', 0)) for u, v, d in top_edges]
         except:
             return []
     
     def _get_most_referenced_files(self) -> List[Tuple[str, int]]:
         """Obtém os arquivos mais referenciados."""
         try:
-            in_degrees = dict(self.dependency_graph.in_degree())
-            sorted_files = sorted(in_degrees.items(), key=lambda x: x[1], reverse=True)
-            return sorted_files[:10]
+            return heapq.nlargest(10, self.dependency_graph.in_degree(), key=lambda x: x[1])
         except:
             return []
     
@@ -0,0 +1,153 @@
+"""
+Leitura e extração de estrutura dos arquivos de código.
+Não depende da base vetorial, para que os processos de coleta paralela
+importem apenas este módulo.
+"""
+
+import os
+import re
+import mmap
+from typing import Dict, Any, Optional, Tuple, Union
+from pathlib import Path
+
+# Estrutura de código Kotlin (pacote, classes/interfaces e funções) extraída
+# em uma única passagem; o grupo nomeado que casou identifica o tipo.
+# O padrão opera sobre bytes (inclusive mmap); \x80-\xff cobre os bytes
+# UTF-8 de identificadores não ASCII
+_KOTLIN_STRUCTURE_RE = re.compile(
+    rb'package\s+(?P<package>[\w.\x80-\xff]+)'
+    rb'|(?:class|interface|data class|enum class)\s+(?P<class>[\w\x80-\xff]+)'
+    rb'|fun\s+(?P<function>[\w\x80-\xff]+)\s*\('
+)
+
+# Tipo de código conforme o diretório (camada da arquitetura hexagonal), em ordem
+# de precedência, com as variações de nome aceitas para cada diretório
+_CODE_TYPE_DIRECTORIES = (
+    ("domain", frozenset({"domain"})),
+    ("adapter", frozenset({"adapter", "adapters"})),
+    ("application", frozenset({"application"})),
+    ("port", frozenset({"port", "ports"}))
+)
+
+
+def _extract_kotlin_structure(content: Union[str, bytes, mmap.mmap], file_path: str) -> Dict[str, Any]:
+    """
+    Extrai informações estruturais do código Kotlin.
+    
+    Args:
+        content: Conteúdo do arquivo de código (texto, bytes UTF-8 ou mmap).
+        file_path: Caminho do arquivo.
+        
+    Returns:
+        Dicionário com informações estruturais do código.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    
+    # Extrai pacote, classes/interfaces e funções/métodos
+    package = None
+    classes = []
+    functions = []
+    for match in _KOTLIN_STRUCTURE_RE.finditer(content):
+        kind = match.lastgroup
+        if kind == "class":
+            classes.append(match.group("class").decode('utf-8', 'replace'))
+        elif kind == "function":
+            functions.append(match.group("function").decode('utf-8', 'replace'))
+        elif package is None:
+            # Mantém apenas a primeira declaração de pacote
+            package = match.group("package").decode('utf-8', 'replace')
+    
+    if package is None:
+        package = "unknown"
+    
+    # Identifica se é um arquivo de domínio, adaptador, etc. pelos componentes
+    # do caminho, evitando falsos positivos como "port" em "import" ou "support"
+    parts = {part.lower() for part in Path(file_path).parts}
+    file_type = next(
+        (code_type for code_type, names in _CODE_TYPE_DIRECTORIES if not parts.isdisjoint(names)),
+        "unknown"
+    )
+    
+    return {
+        "package": package,
+        "classes": classes,
+        "functions": functions,
+        "file_type": file_type
+    }
+
+
+def _code_document_id(file_path: str) -> str:
+    """
+    ID de um documento de código: o caminho relativo ao diretório de trabalho,
+    que distingue arquivos de mesmo nome em pacotes diferentes.
+    """
+    return os.path.relpath(file_path).replace(os.sep, "/")
+
+
+def _prepare_code_document(file_path: str, document_id: Optional[str] = None,
+                           is_file_verified: bool = False) -> Tuple[str, Dict[str, Any]]:
+    """
+    Lê um arquivo de código e monta seus metadados, sem acessar a base vetorial.
+    Por ser uma função de módulo, pode ser executada em processos separados.
+    
+    Args:
+        file_path: Caminho para o arquivo de código.
+        document_id: ID opcional para o documento. Se não fornecido, usa o caminho relativo.
+        is_file_verified: Indica que o arquivo já foi encontrado na varredura do diretório.
+        
+    Returns:
+        Tupla com o conteúdo do arquivo e os metadados do documento.
+    """
+    # Verifica se o arquivo existe
+    if not is_file_verified and not os.path.exists(file_path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+    
+    # Verifica se é um arquivo Kotlin
+    if not file_path.endswith(".kt"):
+        raise ValueError(f"Arquivo não é um arquivo Kotlin: {file_path}")
+    
+    with open(file_path, 'rb') as file:
+        # Arquivos vazios não podem ser mapeados em memória
+        if os.fstat(file.fileno()).st_size == 0:
+            content = ""
+            code_structure = _extract_kotlin_structure(b"", file_path)
+        else:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # Extrai informações estruturais direto do mapa e decodifica uma única vez
+                code_structure = _extract_kotlin_structure(mapped, file_path)
+                content = str(mapped, 'utf-8')
+    
+    # Normaliza quebras de linha como a leitura em modo texto
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    
+    # Extrai metadados do arquivo
+    file_name = os.path.basename(file_path)
+    
+    # Prepara metadados para o documento
+    metadata = {
+        "source": file_path,
+        "file_name": file_name,
+        "file_type": "kotlin",
+        "document_type": "code",
+        "document_id": document_id if document_id else _code_document_id(file_path),
+        "package": code_structure["package"],
+        "classes": ",".join(code_structure["classes"]),
+        "functions": ",".join(code_structure["functions"]),
+        "code_type": code_structure["file_type"]
+    }
+    
+    return content, metadata
+
+
+def _try_prepare_code_document(file_path: str,
+                               document_id: Optional[str] = None) -> Union[Tuple[str, Dict[str, Any]], Exception]:
+    """
+    Versão de _prepare_code_document para executor.map: a falha de um arquivo
+    é devolvida no lugar do resultado, sem interromper os demais.
+    """
+    try:
+        return _prepare_code_document(file_path, document_id, True)
+    except Exception as e:
+        return e
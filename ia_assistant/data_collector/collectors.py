@@ -5,12 +5,242 @@ Implementa coletores especializados para documentos, código-fonte e histórico
 
 import os
 import re
-import git
-from typing import List, Dict, Any, Optional, Tuple
-from pathlib import Path
+import asyncio
+import logging
+import multiprocessing
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 
 # Importa a base de dados vetorial
-from ia_assistant.database.vector_db import get_vector_database, VectorDatabase
+from ia_assistant.database.vector_db import (
+    get_vector_database, VectorDatabase, resolve_document_id, split_document
+)
+from ia_assistant.data_collector.code_parser import (
+    _code_document_id, _extract_kotlin_structure, _prepare_code_document, _try_prepare_code_document
+)
+
+logger = logging.getLogger(__name__)
+
+# Número do PR no nome do arquivo (ex.: pr_42.md)
+_PR_NUMBER_RE = re.compile(r'pr_(\d+)')
+
+# Abaixo deste número de arquivos a coleta de diretório é feita em série: ler e
+# extrair a estrutura de um arquivo custa menos que iniciar os processos
+PARALLEL_COLLECT_THRESHOLD = 64
+
+# Os processos de leitura não são criados com fork: o processo principal mantém
+# threads (cliente do ChromaDB, leituras antecipadas) que não sobrevivem à cópia
+_COLLECT_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Threads de leitura antecipada dos documentos em collect_all
+DOCUMENT_READ_WORKERS = 8
+
+# Número de chunks acumulados por coleção antes de cada inserção em lote
+BATCH_CHUNK_SIZE = 128
+
+# Lotes inseridos simultaneamente quando a base suporta inserção concorrente
+BATCH_CONCURRENCY = 4
+
+
+def _read_text(file_path: str) -> str:
+    """Lê o conteúdo de um arquivo de texto UTF-8."""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def _iter_files(directory_path: str, file_extension: str) -> Iterator[str]:
+    """
+    Percorre o diretório recursivamente com os.scandir, na mesma ordem do os.walk.
+    O tipo de cada entrada vem do próprio DirEntry, sem stat() adicional.
+    
+    Args:
+        directory_path: Caminho para o diretório.
+        file_extension: Extensão dos arquivos desejados.
+        
+    Yields:
+        Caminhos dos arquivos com a extensão informada.
+    """
+    subdirs = []
+    try:
+        with os.scandir(directory_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Assim como os.walk, não segue links simbólicos de diretórios
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(file_extension):
+                    yield entry.path
+    except OSError:
+        # Diretórios ilegíveis são ignorados, como no os.walk
+        return
+    
+    for subdir in subdirs:
+        yield from _iter_files(subdir, file_extension)
+
+
+class BatchedCollector:
+    """
+    Acumula chunks de vários documentos e os insere na base vetorial em lotes,
+    com uma única chamada a add_documents por lote e coleção.
+    
+    Uso:
+        with BatchedCollector(vector_db) as batch:
+            batch.add_document("codigo_fonte", content, metadata)
+    """
+    
+    def __init__(self, vector_db: VectorDatabase, chunksize: int = BATCH_CHUNK_SIZE,
+                 concurrency: int = 1):
+        """
+        Inicializa o acumulador de inserções.
+        
+        Args:
+            vector_db: Base de dados vetorial onde os lotes serão inseridos.
+            chunksize: Número de chunks por lote.
+            concurrency: Lotes completos acumulados e inseridos simultaneamente
+                (requer aadd_documents_many na base; 1 insere cada lote de imediato).
+        """
+        self.vector_db = vector_db
+        self.chunksize = chunksize
+        self.concurrency = concurrency if hasattr(vector_db, "aadd_documents_many") else 1
+        self._pending: Dict[str, Tuple[List[str], List[Dict[str, Any]], List[str]]] = {}
+        self._jobs: List[Tuple[str, List[str], List[Dict[str, Any]], List[str]]] = []
+        # Arquivos de origem (metadado "source") de lotes cuja inserção falhou -> erro
+        self.failures: Dict[str, str] = {}
+        # (coleção, document_id) -> IDs dos chunks enfileirados, para remover ao
+        # final os chunks que sobraram das versões anteriores dos documentos
+        self._documents: Dict[Tuple[str, str], List[str]] = {}
+        self._failed_documents: Set[Tuple[str, str]] = set()
+    
+    def __enter__(self) -> "BatchedCollector":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+        return False
+    
+    def add_document(self, collection_name: str, document: str, metadata: Dict[str, Any],
+                     document_id: Optional[str] = None) -> List[str]:
+        """
+        Divide um documento em chunks e os enfileira para inserção.
+        
+        Args:
+            collection_name: Nome da coleção onde os chunks serão adicionados.
+            document: Texto completo do documento.
+            metadata: Metadados base associados ao documento.
+            document_id: ID opcional do documento. Se não fornecido, um ID será gerado.
+            
+        Returns:
+            Lista de IDs dos chunks enfileirados.
+        """
+        document_id = resolve_document_id(metadata, document_id)
+        chunk_ids, chunks, metadatas = split_document(document, metadata, document_id)
+        self.insert(collection_name, chunks, metadatas, chunk_ids)
+        self._documents[(collection_name, document_id)] = chunk_ids
+        return chunk_ids
+    
+    def insert(self, collection_name: str, documents: List[str],
+               metadatas: List[Dict[str, Any]], ids: List[str]):
+        """
+        Enfileira chunks já preparados, inserindo os lotes que ficarem completos.
+        
+        Args:
+            collection_name: Nome da coleção.
+            documents: Textos dos chunks.
+            metadatas: Metadados de cada chunk.
+            ids: IDs de cada chunk.
+        """
+        pending = self._pending.setdefault(collection_name, ([], [], []))
+        
+        # IDs repetidos em uma mesma chamada são rejeitados pelo ChromaDB
+        if not set(ids).isdisjoint(pending[2]):
+            self._flush_collection(collection_name)
+            pending = self._pending.setdefault(collection_name, ([], [], []))
+        
+        pending[0].extend(documents)
+        pending[1].extend(metadatas)
+        pending[2].extend(ids)
+        
+        if len(pending[2]) >= self.chunksize:
+            self._flush_collection(collection_name)
+    
+    def flush(self):
+        """Insere todos os chunks pendentes e remove os chunks antigos dos documentos."""
+        for collection_name in list(self._pending):
+            self._flush_collection(collection_name)
+        self._run_jobs()
+        self._delete_stale_chunks()
+    
+    def _delete_stale_chunks(self):
+        """
+        Remove os chunks antigos dos documentos inseridos; documentos com lotes
+        que falharam mantêm a versão anterior.
+        """
+        documents, self._documents = self._documents, {}
+        failed, self._failed_documents = self._failed_documents, set()
+        delete_stale_chunks = getattr(self.vector_db, "delete_stale_chunks", None)
+        if delete_stale_chunks is None:
+            return
+        
+        for (collection_name, document_id), chunk_ids in documents.items():
+            if (collection_name, document_id) in failed:
+                continue
+            try:
+                delete_stale_chunks(collection_name, document_id, chunk_ids)
+            except Exception as e:
+                logger.warning("Erro ao remover chunks antigos de %s na coleção %s: %s",
+                               document_id, collection_name, e)
+    
+    def _flush_collection(self, collection_name: str):
+        """Insere os chunks pendentes de uma coleção em lotes de até chunksize."""
+        documents, metadatas, ids = self._pending.pop(collection_name, ([], [], []))
+        for start in range(0, len(ids), self.chunksize):
+            end = start + self.chunksize
+            self._jobs.append((collection_name, documents[start:end], metadatas[start:end], ids[start:end]))
+            if len(self._jobs) >= self.concurrency:
+                self._run_jobs()
+    
+    def _record_failure(self, job: Tuple[str, List[str], List[Dict[str, Any]], List[str]],
+                        error: Exception):
+        """Registra como falhos os arquivos de origem dos chunks de um lote não inserido."""
+        sources = {metadata.get("source") for metadata in job[2]}
+        self._failed_documents.update((job[0], metadata.get("document_id")) for metadata in job[2])
+        logger.warning("Erro ao inserir lote na coleção %s (%s): %s", job[0], ", ".join(map(str, sources)), error)
+        for source in sources:
+            self.failures.setdefault(source, str(error))
+    
+    def _run_jobs(self):
+        """
+        Insere os lotes acumulados, simultaneamente quando possível. Falhas não
+        são propagadas: os arquivos afetados ficam registrados em failures.
+        """
+        jobs, self._jobs = self._jobs, []
+        if not jobs:
+            return
+        
+        if len(jobs) > 1:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # Sem laço de eventos ativo: insere os lotes simultaneamente;
+                # cada lote traz seu resultado ou a exceção que o interrompeu
+                try:
+                    results = asyncio.run(self.vector_db.aadd_documents_many(jobs, self.concurrency))
+                except Exception as e:
+                    results = [e] * len(jobs)
+                for job, result in zip(jobs, results):
+                    if isinstance(result, Exception):
+                        self._record_failure(job, result)
+                return
+        
+        for job in jobs:
+            try:
+                self.vector_db.add_documents(*job)
+            except Exception as e:
+                self._record_failure(job, e)
+
 
 class BaseCollector:
     """Classe base para todos os coletores de dados."""
@@ -23,6 +253,22 @@ class BaseCollector:
             vector_db: Instância opcional da base de dados vetorial. Se não fornecida, uma nova será criada.
         """
         self.vector_db = vector_db if vector_db is not None else get_vector_database()
+        
+        # Quando definido, os documentos são enfileirados para inserção em lote
+        self.batch: Optional[BatchedCollector] = None
+    
+    def _add_document(self, collection_name: str, document: str, metadata: Dict[str, Any],
+                      document_id: Optional[str] = None) -> List[str]:
+        """Adiciona um documento à base, diretamente ou pelo lote ativo."""
+        if self.batch is not None:
+            return self.batch.add_document(collection_name, document, metadata, document_id)
+        
+        return self.vector_db.process_and_add_document(
+            collection_name=collection_name,
+            document=document,
+            metadata=metadata,
+            document_id=document_id
+        )
     
     def collect(self, *args, **kwargs):
         """
@@ -35,7 +281,7 @@ class DocumentCollector(BaseCollector):
     """Coletor especializado para documentos de texto (Markdown, etc.)."""
     
     def collect(self, file_path: str, collection_name: str = "decisoes_arquiteturais", 
-               document_id: Optional[str] = None) -> List[str]:
+               document_id: Optional[str] = None, content: Optional[str] = None) -> List[str]:
         """
         Coleta e processa um documento de texto.
         
@@ -43,17 +289,18 @@ class DocumentCollector(BaseCollector):
             file_path: Caminho para o arquivo de documento.
             collection_name: Nome da coleção onde o documento será armazenado.
             document_id: ID opcional para o documento. Se não fornecido, será gerado.
+            content: Conteúdo já lido do arquivo. Se não fornecido, o arquivo é lido.
             
         Returns:
             Lista de IDs dos chunks adicionados à base de dados.
         """
-        # Verifica se o arquivo existe
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-        
-        # Lê o conteúdo do arquivo
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
+        if content is None:
+            # Verifica se o arquivo existe
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+            
+            # Lê o conteúdo do arquivo
+            content = _read_text(file_path)
         
         # Extrai metadados do arquivo
         file_name = os.path.basename(file_path)
@@ -70,7 +317,7 @@ class DocumentCollector(BaseCollector):
         }
         
         # Processa e adiciona o documento à base de dados
-        return self.vector_db.process_and_add_document(
+        return self._add_document(
             collection_name=collection_name,
             document=content,
             metadata=metadata,
@@ -92,38 +339,10 @@ class CodeCollector(BaseCollector):
         Returns:
             Dicionário com informações estruturais do código.
         """
-        # Extrai o pacote
-        package_match = re.search(r'package\s+([\w.]+)', content)
-        package = package_match.group(1) if package_match else "unknown"
-        
-        # Extrai classes/interfaces
-        class_matches = re.finditer(r'(class|interface|data class|enum class)\s+(\w+)', content)
-        classes = [match.group(2) for match in class_matches]
-        
-        # Extrai funções/métodos
-        function_matches = re.finditer(r'fun\s+(\w+)\s*\(', content)
-        functions = [match.group(1) for match in function_matches]
-        
-        # Identifica se é um arquivo de domínio, adaptador, etc.
-        file_type = "unknown"
-        if "domain" in file_path:
-            file_type = "domain"
-        elif "adapter" in file_path:
-            file_type = "adapter"
-        elif "application" in file_path:
-            file_type = "application"
-        elif "port" in file_path:
-            file_type = "port"
-        
-        return {
-            "package": package,
-            "classes": classes,
-            "functions": functions,
-            "file_type": file_type
-        }
+        return _extract_kotlin_structure(content, file_path)
     
     def collect(self, file_path: str, collection_name: str = "codigo_fonte",
-               document_id: Optional[str] = None) -> List[str]:
+               document_id: Optional[str] = None, is_file_verified: bool = False) -> List[str]:
         """
         Coleta e processa um arquivo de código-fonte.
         
@@ -131,43 +350,15 @@ class CodeCollector(BaseCollector):
             file_path: Caminho para o arquivo de código.
             collection_name: Nome da coleção onde o código será armazenado.
             document_id: ID opcional para o documento. Se não fornecido, será gerado.
+            is_file_verified: Dispensa a verificação de existência (arquivo vindo da varredura).
             
         Returns:
             Lista de IDs dos chunks adicionados à base de dados.
         """
-        # Verifica se o arquivo existe
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-        
-        # Verifica se é um arquivo Kotlin
-        if not file_path.endswith(".kt"):
-            raise ValueError(f"Arquivo não é um arquivo Kotlin: {file_path}")
-        
-        # Lê o conteúdo do arquivo
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        # Extrai informações estruturais do código
-        code_structure = self._extract_code_structure(content, file_path)
-        
-        # Extrai metadados do arquivo
-        file_name = os.path.basename(file_path)
-        
-        # Prepara metadados para o documento
-        metadata = {
-            "source": file_path,
-            "file_name": file_name,
-            "file_type": "kotlin",
-            "document_type": "code",
-            "document_id": document_id if document_id else file_name,
-            "package": code_structure["package"],
-            "classes": ",".join(code_structure["classes"]),
-            "functions": ",".join(code_structure["functions"]),
-            "code_type": code_structure["file_type"]
-        }
+        content, metadata = _prepare_code_document(file_path, document_id, is_file_verified)
         
         # Processa e adiciona o documento à base de dados
-        return self.vector_db.process_and_add_document(
+        return self._add_document(
             collection_name=collection_name,
             document=content,
             metadata=metadata,
@@ -190,16 +381,41 @@ class CodeCollector(BaseCollector):
         results = {}
         
         # Percorre o diretório recursivamente
-        for root, _, files in os.walk(directory_path):
-            for file in files:
-                if file.endswith(file_extension):
-                    file_path = os.path.join(root, file)
-                    try:
-                        chunk_ids = self.collect(file_path, collection_name)
-                        results[file_path] = chunk_ids
-                    except Exception as e:
-                        print(f"Erro ao processar arquivo {file_path}: {e}")
-                        results[file_path] = [f"ERROR: {str(e)}"]
+        file_paths = list(_iter_files(directory_path, file_extension))
+        
+        workers = os.cpu_count() or 1
+        if len(file_paths) < PARALLEL_COLLECT_THRESHOLD or workers == 1:
+            for file_path in file_paths:
+                try:
+                    chunk_ids = self.collect(file_path, collection_name, is_file_verified=True)
+                    results[file_path] = chunk_ids
+                except Exception as e:
+                    logger.warning("Erro ao processar arquivo %s: %s", file_path, e, exc_info=True)
+                    results[file_path] = [f"ERROR: {str(e)}"]
+            return results
+        
+        # Leitura e extração de estrutura em paralelo, com os arquivos enviados aos
+        # processos em blocos (cerca de 4 por processo); a inserção na base vetorial
+        # permanece neste processo, que detém o cliente do ChromaDB
+        chunksize = max(1, len(file_paths) // (workers * 4))
+        # Os IDs são calculados aqui: o diretório de trabalho dos processos pode diferir
+        document_ids = [_code_document_id(file_path) for file_path in file_paths]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_COLLECT_POOL_CONTEXT) as executor:
+            prepared = executor.map(_try_prepare_code_document, file_paths, document_ids, chunksize=chunksize)
+            for file_path, document in zip(file_paths, prepared):
+                try:
+                    if isinstance(document, Exception):
+                        raise document
+                    content, metadata = document
+                    results[file_path] = self._add_document(
+                        collection_name=collection_name,
+                        document=content,
+                        metadata=metadata,
+                        document_id=None
+                    )
+                except Exception as e:
+                    logger.warning("Erro ao processar arquivo %s: %s", file_path, e, exc_info=True)
+                    results[file_path] = [f"ERROR: {str(e)}"]
         
         return results
 
@@ -207,25 +423,64 @@ class CodeCollector(BaseCollector):
 class GitCollector(BaseCollector):
     """Coletor especializado para histórico Git."""
     
-    def _format_commit_message(self, commit) -> str:
+    def _changed_files_by_commit(self, repo, rev: str, max_commits: int) -> Dict[str, List[str]]:
+        """
+        Obtém os arquivos alterados de cada commit com uma única execução de git log.
+        
+        Args:
+            repo: Repositório do GitPython.
+            rev: Revisão a partir da qual os commits são listados.
+            max_commits: Número máximo de commits.
+            
+        Returns:
+            Dicionário hash do commit -> arquivos alterados (vazio em caso de falha).
+        """
+        import git
+        
+        try:
+            # Merges são comparados ao primeiro pai, como em _format_commit_message;
+            # -z separa os nomes por NUL e %x01 marca o início de cada commit
+            output = repo.git.log(rev, f'-n{max_commits}', '-z', '--name-only',
+                                  '--diff-merges=first-parent', '--pretty=format:%x01%H')
+        except git.GitCommandError as e:
+            logger.warning("Erro ao listar arquivos alterados: %s", e)
+            return {}
+        
+        changed_files = {}
+        for record in output.split('\x01'):
+            sha, _, files = record.strip('\x00').partition('\n')
+            if sha:
+                changed_files[sha] = [file for file in files.split('\x00') if file]
+        return changed_files
+    
+    def _format_commit_message(self, commit, changed_files: Optional[List[str]] = None,
+                               committed_at: Optional[str] = None) -> str:
         """
         Formata a mensagem de commit para armazenamento.
         
         Args:
             commit: Objeto de commit do GitPython.
+            changed_files: Arquivos alterados já conhecidos. Se não fornecidos,
+                são obtidos pelo diff com o primeiro pai.
+            committed_at: Data do commit já formatada. Se não fornecida, é calculada.
             
         Returns:
             Mensagem formatada.
         """
+        if changed_files is None:
+            changed_files = (item.a_path for item in commit.diff(commit.parents[0] if commit.parents else None))
+        if committed_at is None:
+            committed_at = commit.committed_datetime.strftime('%Y-%m-%d %H:%M:%S')
+        
         return f"""
 Commit: {commit.hexsha}
 Autor: {commit.author.name} <{commit.author.email}>
-Data: {commit.committed_datetime.strftime('%Y-%m-%d %H:%M:%S')}
+Data: {committed_at}
 Mensagem:
 {commit.message}
 
 Arquivos alterados:
-{', '.join([item.a_path for item in commit.diff(commit.parents[0] if commit.parents else None)])}
+{', '.join(changed_files)}
 """
     
     def collect(self, repo_path: str, collection_name: str = "commits_historico",
@@ -245,19 +500,27 @@ Arquivos alterados:
         if not os.path.exists(os.path.join(repo_path, ".git")):
             raise ValueError(f"Diretório não é um repositório Git: {repo_path}")
         
+        # GitPython é importado apenas quando o histórico é de fato coletado
+        import git
+        
         # Abre o repositório
         repo = git.Repo(repo_path)
         
-        # Obtém os commits
-        commits = list(repo.iter_commits('main', max_count=max_commits))
+        changed_files_by_commit = self._changed_files_by_commit(repo, 'main', max_commits)
         
         all_chunk_ids = []
         
-        # Processa cada commit
-        for commit in commits:
+        # Processa os commits à medida que são lidos, sem materializar a lista;
+        # dentro de um lote, cada mensagem vai direto para a fila de inserção
+        for commit in repo.iter_commits('main', max_count=max_commits):
             try:
+                # Data formatada uma única vez para a mensagem e os metadados
+                committed_at = commit.committed_datetime.strftime('%Y-%m-%d %H:%M:%S')
+                
                 # Formata a mensagem do commit
-                commit_message = self._format_commit_message(commit)
+                commit_message = self._format_commit_message(
+                    commit, changed_files_by_commit.get(commit.hexsha), committed_at
+                )
                 
                 # Prepara metadados para o commit
                 metadata = {
@@ -265,13 +528,13 @@ Arquivos alterados:
                     "document_type": "git_commit",
                     "document_id": commit.hexsha,
                     "author": f"{commit.author.name} <{commit.author.email}>",
-                    "date": commit.committed_datetime.strftime('%Y-%m-%d %H:%M:%S'),
+                    "date": committed_at,
                     "commit_hash": commit.hexsha,
                     "commit_summary": commit.summary
                 }
                 
                 # Processa e adiciona o commit à base de dados
-                chunk_ids = self.vector_db.process_and_add_document(
+                chunk_ids = self._add_document(
                     collection_name=collection_name,
                     document=commit_message,
                     metadata=metadata,
@@ -280,7 +543,7 @@ Arquivos alterados:
                 
                 all_chunk_ids.extend(chunk_ids)
             except Exception as e:
-                print(f"Erro ao processar commit {commit.hexsha}: {e}")
+                logger.warning("Erro ao processar commit %s: %s", commit.hexsha, e, exc_info=True)
         
         return all_chunk_ids
     
@@ -305,22 +568,24 @@ Arquivos alterados:
         pr_dir = os.path.join(repo_path, ".github", "pull_requests")
         
         if not os.path.exists(pr_dir):
-            print(f"Diretório de PRs não encontrado: {pr_dir}")
+            logger.info("Diretório de PRs não encontrado: %s", pr_dir)
             return []
         
         all_chunk_ids = []
         
-        # Processa cada arquivo de PR
-        for file_name in os.listdir(pr_dir):
-            if file_name.endswith(".md"):
-                file_path = os.path.join(pr_dir, file_name)
+        # Processa cada arquivo de PR; o DirEntry já informa nome e tipo da entrada
+        with os.scandir(pr_dir) as entries:
+            for entry in entries:
+                if not (entry.name.endswith(".md") and entry.is_file()):
+                    continue
+                file_path = entry.path
                 
                 # Lê o conteúdo do arquivo
                 with open(file_path, 'r', encoding='utf-8') as file:
                     content = file.read()
                 
                 # Extrai o número do PR do nome do arquivo
-                pr_number_match = re.search(r'pr_(\d+)', file_name)
+                pr_number_match = _PR_NUMBER_RE.search(entry.name)
                 pr_number = pr_number_match.group(1) if pr_number_match else "unknown"
                 
                 # Prepara metadados para o PR
@@ -332,7 +597,7 @@ Arquivos alterados:
                 }
                 
                 # Processa e adiciona o PR à base de dados
-                chunk_ids = self.vector_db.process_and_add_document(
+                chunk_ids = self._add_document(
                     collection_name=collection_name,
                     document=content,
                     metadata=metadata,
@@ -378,31 +643,56 @@ class DataCollector:
             }
         }
         
-        # Coleta documentos
-        docs_dir = os.path.join(project_root)
-        for file in os.listdir(docs_dir):
-            if file.endswith(".md"):
-                file_path = os.path.join(docs_dir, file)
+        # Chunks de documentos, código e Git são inseridos em lotes compartilhados,
+        # dentro do modo de carga em massa da base quando disponível
+        collectors = (self.document_collector, self.code_collector, self.git_collector)
+        bulk_load = getattr(self.vector_db, "bulk_load", None)
+        with bulk_load() if bulk_load is not None else nullcontext(), \
+                BatchedCollector(self.vector_db, concurrency=BATCH_CONCURRENCY) as batch:
+            for collector in collectors:
+                collector.batch = batch
+            try:
+                # Coleta documentos, lendo os próximos arquivos em threads
+                # enquanto o atual é dividido e enfileirado
+                docs_dir = os.path.join(project_root)
+                doc_files = [file for file in os.listdir(docs_dir) if file.endswith(".md")]
+                with ThreadPoolExecutor(max_workers=DOCUMENT_READ_WORKERS) as reader:
+                    reads = [reader.submit(_read_text, os.path.join(docs_dir, file)) for file in doc_files]
+                    for file, read in zip(doc_files, reads):
+                        file_path = os.path.join(docs_dir, file)
+                        try:
+                            collection_name = "decisoes_arquiteturais" if "decisoes_arquiteturais" in file else "documentacao_ddd"
+                            chunk_ids = self.document_collector.collect(file_path, collection_name, content=read.result())
+                            results["documents"][file_path] = chunk_ids
+                        except Exception as e:
+                            logger.warning("Erro ao processar documento %s: %s", file_path, e, exc_info=True)
+                            results["documents"][file_path] = [f"ERROR: {str(e)}"]
+                
+                # Coleta código-fonte
+                src_dir = os.path.join(project_root, "src")
+                if os.path.exists(src_dir):
+                    results["code"] = self.code_collector.collect_directory(src_dir)
+                
+                # Coleta histórico Git
                 try:
-                    collection_name = "decisoes_arquiteturais" if "decisoes_arquiteturais" in file else "documentacao_ddd"
-                    chunk_ids = self.document_collector.collect(file_path, collection_name)
-                    results["documents"][file_path] = chunk_ids
+                    results["git"]["commits"] = self.git_collector.collect(project_root)
+                    results["git"]["pull_requests"] = self.git_collector.collect_pull_requests(project_root)
                 except Exception as e:
-                    print(f"Erro ao processar documento {file_path}: {e}")
-                    results["documents"][file_path] = [f"ERROR: {str(e)}"]
-        
-        # Coleta código-fonte
-        src_dir = os.path.join(project_root, "src")
-        if os.path.exists(src_dir):
-            results["code"] = self.code_collector.collect_directory(src_dir)
-        
-        # Coleta histórico Git
-        try:
-            results["git"]["commits"] = self.git_collector.collect(project_root)
-            results["git"]["pull_requests"] = self.git_collector.collect_pull_requests(project_root)
-        except Exception as e:
-            print(f"Erro ao processar histórico Git: {e}")
-            results["git"]["error"] = str(e)
+                    logger.warning("Erro ao processar histórico Git: %s", e, exc_info=True)
+                    results["git"]["error"] = str(e)
+            finally:
+                for collector in collectors:
+                    collector.batch = None
+        
+        # Os chunks são inseridos depois do retorno de cada coletor: arquivos com
+        # algum lote não inserido (inclusive na inserção final) são marcados como falhos
+        for source, error in batch.failures.items():
+            if source in results["documents"]:
+                results["documents"][source] = [f"ERROR: {error}"]
+            elif source in results["code"]:
+                results["code"][source] = [f"ERROR: {error}"]
+            else:
+                results["git"]["error"] = error
         
         return results
 
@@ -0,0 +1,155 @@
+"""
+Cache persistente de embeddings em SQLite.
+Associa o hash BLAKE2b de cada texto (e do modelo) ao vetor float32 gerado,
+evitando chamadas repetidas à API de embeddings ao reprocessar documentos.
+"""
+
+import os
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+import numpy as np
+
+# Hashes consultados por SELECT (abaixo do limite de variáveis do SQLite)
+LOOKUP_BATCH_SIZE = 500
+
+class EmbeddingCache:
+    """Cache de embeddings persistido em um banco SQLite (modo WAL)."""
+
+    def __init__(self, path: str, model: str):
+        """
+        Inicializa o cache. O banco só é aberto no primeiro uso.
+
+        Args:
+            path: Caminho do arquivo SQLite
+            model: Nome do modelo de embeddings (faz parte da chave)
+        """
+        self.path = path
+        self.model = model
+        self._prefix = f"{model}\0".encode("utf-8")
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre (uma única vez) a conexão com o banco do cache."""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def _hash(self, text: str) -> bytes:
+        """Calcula a chave de um texto para o modelo configurado."""
+        return hashlib.blake2b(self._prefix + text.encode("utf-8"), digest_size=16).digest()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Busca os embeddings já calculados.
+
+        Args:
+            texts: Textos a consultar
+
+        Returns:
+            Vetor float32 de cada texto, ou None quando ausente do cache
+        """
+        hashes = [self._hash(text) for text in texts]
+        found = {}
+        with self._lock:
+            connection = self._connect()
+            for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                batch = hashes[start:start + LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = connection.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE hash IN ({placeholders})", batch
+                )
+                for key, vec in rows:
+                    found[key] = np.frombuffer(vec, dtype=np.float32)
+        return [found.get(key) for key in hashes]
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Armazena embeddings recém-calculados.
+
+        Args:
+            texts: Textos de origem
+            vectors: Matriz float32 com um vetor por texto
+        """
+        rows = [
+            (self._hash(text), np.ascontiguousarray(vector, dtype=np.float32).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (hash, vec) VALUES (?, ?)", rows
+                )
+
+    @staticmethod
+    def _assemble(cached: List[Optional[np.ndarray]], missing: List[int],
+                  computed: np.ndarray) -> np.ndarray:
+        """Monta a matriz final na ordem original dos textos."""
+        for index, vector in zip(missing, computed):
+            cached[index] = vector
+        if not cached:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(cached)
+
+    def embed_documents(self, texts: Sequence[str],
+                        embed: Callable[[List[str]], List[List[float]]]) -> np.ndarray:
+        """
+        Obtém os embeddings, chamando embed apenas para os textos fora do cache.
+
+        Args:
+            texts: Textos a processar
+            embed: Função de embeddings (ex.: OpenAIEmbeddings.embed_documents)
+
+        Returns:
+            Matriz float32 com um vetor por texto, na ordem recebida
+        """
+        cached = self.get_many(texts)
+        missing = [index for index, vector in enumerate(cached) if vector is None]
+        computed = np.empty((0, 0), dtype=np.float32)
+        if missing:
+            missing_texts = [texts[index] for index in missing]
+            computed = np.asarray(embed(missing_texts), dtype=np.float32)
+            self.put_many(missing_texts, computed)
+        return self._assemble(cached, missing, computed)
+
+    async def aembed_documents(self, texts: Sequence[str],
+                               aembed: Callable[[List[str]], Awaitable[List[List[float]]]]) -> np.ndarray:
+        """
+        Versão assíncrona de embed_documents (acesso ao SQLite em thread separada).
+
+        Args:
+            texts: Textos a processar
+            aembed: Função assíncrona de embeddings (ex.: OpenAIEmbeddings.aembed_documents)
+
+        Returns:
+            Matriz float32 com um vetor por texto, na ordem recebida
+        """
+        cached = await asyncio.to_thread(self.get_many, texts)
+        missing = [index for index, vector in enumerate(cached) if vector is None]
+        computed = np.empty((0, 0), dtype=np.float32)
+        if missing:
+            missing_texts = [texts[index] for index in missing]
+            computed = np.asarray(await aembed(missing_texts), dtype=np.float32)
+            await asyncio.to_thread(self.put_many, missing_texts, computed)
+        return self._assemble(cached, missing, computed)
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco, se aberta."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,468 @@
+"""
+Backend FAISS para coleções vetoriais com muitas consultas e poucas escritas.
+Os vetores ficam em um índice HNSW do FAISS persistido em disco; textos e
+metadados ficam em SQLite. FaissClient e FaissCollection expõem o subconjunto
+da API do ChromaDB usado por VectorDatabase.
+
+O índice é gravado em flush/close (e ao encerrar o processo), não a cada
+inserção; registros sem vetor no índice gravado são descartados ao reabrir.
+"""
+
+import os
+import json
+import atexit
+import shutil
+import sqlite3
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# Vizinhos por nó do grafo HNSW
+HNSW_M = 32
+
+# Fator de busca extra quando há filtro de metadados (aplicado após a busca)
+FILTER_OVERSAMPLING = 10
+
+# O índice é reconstruído sem os rótulos descartados quando eles passam desta
+# fração do índice (e deste mínimo): cada descartado aumenta o k das consultas
+COMPACTION_RATIO = 0.25
+COMPACTION_MIN_REMOVED = 1000
+
+logger = logging.getLogger(__name__)
+
+# Clientes abertos, gravados ao encerrar o processo (sem impedir a coleta)
+_open_clients: "weakref.WeakSet[FaissClient]" = weakref.WeakSet()
+
+@atexit.register
+def _flush_open_clients() -> None:
+    """Grava os índices pendentes de todos os clientes abertos."""
+    for client in list(_open_clients):
+        client.flush()
+
+class FaissCollection:
+    """Coleção vetorial com índice FAISS (HNSW) e metadados em SQLite."""
+
+    def __init__(self, name: str, path: str, metadata: Optional[Dict[str, Any]] = None,
+                 quantized: bool = False):
+        """
+        Abre (ou cria) a coleção no diretório informado.
+
+        Args:
+            name: Nome da coleção
+            path: Diretório com o índice e o banco de metadados
+            metadata: Metadados da coleção (ex.: descrição)
+            quantized: Armazena os vetores de um novo índice em float16 (metade da
+                memória); índices já persistidos mantêm o formato em que foram criados
+        """
+        if not FAISS_AVAILABLE:
+            raise ImportError("faiss não está instalado (pip install faiss-cpu)")
+
+        self.name = name
+        self.path = path
+        self.metadata = metadata or {}
+        self.quantized = quantized
+        self._index_path = os.path.join(path, "index.faiss")
+        self._lock = threading.RLock()
+
+        os.makedirs(path, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(path, "store.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "label INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, "
+            "document TEXT, metadata TEXT NOT NULL, document_id)"
+        )
+        self._add_document_id_column()
+        # Rótulos removidos continuam no índice HNSW (que não suporta remoção)
+        # e são descartados nos resultados das consultas
+        self._db.execute("CREATE TABLE IF NOT EXISTS removed (label INTEGER PRIMARY KEY)")
+        self._db.commit()
+
+        self._index = faiss.read_index(self._index_path) if os.path.exists(self._index_path) else None
+        # Índice com inserções ou compactações ainda não gravadas em disco
+        self._dirty = False
+        self._reconcile_with_index()
+
+    def _add_document_id_column(self) -> None:
+        """
+        Garante a coluna indexada document_id (cópia do metadado de mesmo nome),
+        usada para localizar os chunks de um documento sem ler a tabela inteira.
+        Bancos criados antes da coluna são preenchidos a partir dos metadados.
+        """
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(chunks)")}
+        if "document_id" not in columns:
+            self._db.execute("ALTER TABLE chunks ADD COLUMN document_id")
+            self._db.executemany(
+                "UPDATE chunks SET document_id = ? WHERE label = ?",
+                [
+                    (json.loads(metadata).get("document_id"), label)
+                    for label, metadata in self._db.execute("SELECT label, metadata FROM chunks").fetchall()
+                ]
+            )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_document_id ON chunks (document_id)")
+
+    def _create_index(self, dimensions: int):
+        """Cria o índice HNSW com vetores float32 ou, se quantized, float16 (sem treinamento)."""
+        if self.quantized:
+            return faiss.IndexHNSWSQ(dimensions, faiss.ScalarQuantizer.QT_fp16, HNSW_M)
+        return faiss.IndexHNSWFlat(dimensions, HNSW_M)
+
+    def _indexed_labels(self) -> np.ndarray:
+        """Rótulos presentes no índice (vazio se ainda não houver índice)."""
+        if self._index is None:
+            return np.empty(0, dtype=np.int64)
+        return faiss.vector_to_array(self._index.id_map)
+
+    def _reconcile_with_index(self) -> None:
+        """
+        Alinha o SQLite ao índice gravado, que pode estar defasado se o processo
+        terminou antes de flush: registros sem vetor no índice são descartados
+        (voltam na próxima ingestão) e rótulos do índice sem registro passam a
+        ser tratados como descartados.
+        """
+        indexed = set(self._indexed_labels().tolist())
+        known = set()
+        for table in ("chunks", "removed"):
+            labels = {label for (label,) in self._db.execute(f"SELECT label FROM {table}")}
+            missing = [(label,) for label in labels - indexed]
+            if missing:
+                self._db.executemany(f"DELETE FROM {table} WHERE label = ?", missing)
+                if table == "chunks":
+                    logger.warning(f"Coleção '{self.name}': {len(missing)} registros sem vetor no índice descartados")
+            known |= labels
+        self._db.executemany(
+            "INSERT INTO removed (label) VALUES (?)", [(label,) for label in indexed - known]
+        )
+        self._db.commit()
+
+    def _compact(self) -> None:
+        """Reconstrói o índice apenas com os rótulos ativos, se houver descartados demais."""
+        removed = self._removed_count()
+        if removed < COMPACTION_MIN_REMOVED or removed < COMPACTION_RATIO * self._index.ntotal:
+            return
+
+        labels = self._indexed_labels()
+        vectors = self._index.index.reconstruct_n(0, self._index.ntotal)
+        removed_labels = np.array(
+            [label for (label,) in self._db.execute("SELECT label FROM removed")], dtype=np.int64
+        )
+        keep = ~np.isin(labels, removed_labels)
+
+        index = faiss.IndexIDMap2(self._create_index(vectors.shape[1]))
+        if keep.any():
+            index.add_with_ids(np.ascontiguousarray(vectors[keep]), labels[keep])
+        self._index = index
+        self._db.execute("DELETE FROM removed")
+        self._db.commit()
+        self._dirty = True
+
+    def flush(self) -> None:
+        """Grava o índice em disco, se houver alterações pendentes."""
+        with self._lock:
+            if self._dirty and self._index is not None:
+                faiss.write_index(self._index, self._index_path)
+                self._dirty = False
+
+    def _removed_count(self) -> int:
+        """Número de rótulos descartados que ainda estão no índice."""
+        return self._db.execute("SELECT COUNT(*) FROM removed").fetchone()[0]
+
+    def _remove_labels(self, labels: Sequence[int]) -> None:
+        """Remove as linhas e marca os rótulos como descartados no índice."""
+        rows = [(int(label),) for label in labels]
+        self._db.executemany("DELETE FROM chunks WHERE label = ?", rows)
+        self._db.executemany("INSERT OR IGNORE INTO removed (label) VALUES (?)", rows)
+
+    def upsert(self, ids: List[str], embeddings: Any, documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Insere ou substitui registros pelo ID.
+
+        Args:
+            ids: IDs dos registros
+            embeddings: Matriz (n, dimensão) de vetores
+            documents: Textos dos registros
+            metadatas: Metadados dos registros
+        """
+        if not ids:
+            return
+
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        documents = documents if documents is not None else [None] * len(ids)
+        metadatas = metadatas if metadatas is not None else [{}] * len(ids)
+
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(self._create_index(vectors.shape[1]))
+
+            placeholders = ",".join("?" * len(ids))
+            existing = self._db.execute(
+                f"SELECT label FROM chunks WHERE id IN ({placeholders})", list(ids)
+            ).fetchall()
+            self._remove_labels([label for (label,) in existing])
+
+            # Rótulos nunca são reutilizados (os descartados seguem no índice)
+            last_labels = [
+                self._db.execute(f"SELECT MAX(label) FROM {table}").fetchone()[0]
+                for table in ("chunks", "removed")
+            ]
+            first_label = max((label for label in last_labels if label is not None), default=-1) + 1
+            labels = np.arange(first_label, first_label + len(ids), dtype=np.int64)
+
+            self._db.executemany(
+                "INSERT INTO chunks (label, id, document, metadata, document_id) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (int(label), chunk_id, document, json.dumps(metadata, ensure_ascii=False),
+                     metadata.get("document_id"))
+                    for label, chunk_id, document, metadata in zip(labels, ids, documents, metadatas)
+                ]
+            )
+            self._index.add_with_ids(vectors, labels)
+            self._db.commit()
+            self._dirty = True
+            self._compact()
+
+    add = upsert
+
+    @staticmethod
+    def _matches(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+        """Filtro por igualdade de metadados (formato {"campo": valor})."""
+        if not where:
+            return True
+        return all(metadata.get(key) == value for key, value in where.items())
+
+    def _select(self, ids: Optional[List[str]], where: Optional[Dict[str, Any]]) -> List[tuple]:
+        """
+        Linhas (label, id, document, metadata) filtradas por ID e metadados, na
+        ordem de inserção. IDs e document_id são filtrados pelo SQLite (colunas
+        indexadas); os demais campos de where, em Python sobre as linhas restantes.
+
+        Args:
+            ids: IDs desejados
+            where: Filtro por igualdade de metadados
+
+        Returns:
+            Linhas com os metadados já convertidos em dicionário
+        """
+        if ids is not None and not ids:
+            return []
+
+        clauses, params = [], []
+        if ids is not None:
+            clauses.append(f"id IN ({','.join('?' * len(ids))})")
+            params.extend(ids)
+        remaining = dict(where or {})
+        if remaining.get("document_id") is not None:
+            clauses.append("document_id = ?")
+            params.append(remaining.pop("document_id"))
+
+        sql = "SELECT label, id, document, metadata FROM chunks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        rows = []
+        for label, chunk_id, document, metadata in self._db.execute(sql + " ORDER BY label", params):
+            metadata = json.loads(metadata)
+            if self._matches(metadata, remaining):
+                rows.append((label, chunk_id, document, metadata))
+        return rows
+
+    def query(self, query_embeddings: Any, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, List[List[Any]]]:
+        """
+        Busca os vizinhos mais próximos (distância L2, como no ChromaDB).
+
+        Args:
+            query_embeddings: Vetores de consulta
+            n_results: Número de resultados por consulta
+            where: Filtro opcional por igualdade de metadados
+
+        Returns:
+            Resultados no formato do ChromaDB (ids, documents, metadatas, distances)
+        """
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        with self._lock:
+            total = self._index.ntotal if self._index is not None else 0
+            if total == 0:
+                for key in results:
+                    results[key] = [[] for _ in range(len(queries))]
+                return results
+
+            k = n_results * FILTER_OVERSAMPLING if where else n_results
+            k = min(total, k + self._removed_count())
+            distances, labels = self._index.search(queries, k)
+
+            for row_distances, row_labels in zip(distances, labels):
+                found = [int(label) for label in row_labels if label != -1]
+                rows = {}
+                if found:
+                    placeholders = ",".join("?" * len(found))
+                    rows = {
+                        label: (chunk_id, document, json.loads(metadata))
+                        for label, chunk_id, document, metadata in self._db.execute(
+                            f"SELECT label, id, document, metadata FROM chunks WHERE label IN ({placeholders})",
+                            found
+                        )
+                    }
+
+                ids, documents, metadatas, kept = [], [], [], []
+                for distance, label in zip(row_distances, row_labels):
+                    row = rows.get(int(label))
+                    if row is None or not self._matches(row[2], where):
+                        continue
+                    ids.append(row[0])
+                    documents.append(row[1])
+                    metadatas.append(row[2])
+                    kept.append(float(distance))
+                    if len(ids) == n_results:
+                        break
+
+                results["ids"].append(ids)
+                results["documents"].append(documents)
+                results["metadatas"].append(metadatas)
+                results["distances"].append(kept)
+
+        return results
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            **kwargs) -> Dict[str, List[Any]]:
+        """
+        Retorna registros por ID e/ou filtro de metadados.
+
+        Args:
+            ids: IDs desejados
+            where: Filtro por igualdade de metadados
+
+        Returns:
+            IDs, textos e metadados dos registros
+        """
+        results = {"ids": [], "documents": [], "metadatas": []}
+        with self._lock:
+            rows = self._select(ids, where)
+        for _, chunk_id, document, metadata in rows:
+            results["ids"].append(chunk_id)
+            results["documents"].append(document)
+            results["metadatas"].append(metadata)
+        return results
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Remove registros por ID e/ou filtro de metadados.
+
+        Args:
+            ids: IDs a remover
+            where: Filtro por igualdade de metadados
+        """
+        with self._lock:
+            self._remove_labels([row[0] for row in self._select(ids, where)])
+            self._db.commit()
+            if self._index is not None:
+                self._compact()
+
+    def count(self) -> int:
+        """Número de registros da coleção."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def peek(self, limit: int = 10) -> Dict[str, List[Any]]:
+        """
+        Retorna os primeiros registros da coleção.
+
+        Args:
+            limit: Número máximo de registros
+
+        Returns:
+            IDs, textos e metadados dos registros
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, document, metadata FROM chunks ORDER BY label LIMIT ?", (limit,)
+            ).fetchall()
+        return {
+            "ids": [row[0] for row in rows],
+            "documents": [row[1] for row in rows],
+            "metadatas": [json.loads(row[2]) for row in rows]
+        }
+
+    def close(self) -> None:
+        """Grava o índice pendente e fecha o banco de metadados."""
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+class FaissClient:
+    """Cliente com a interface de coleções do ChromaDB sobre FaissCollection."""
+
+    def __init__(self, path: str, quantized: bool = False):
+        """
+        Inicializa o cliente.
+
+        Args:
+            path: Diretório base (um subdiretório por coleção)
+            quantized: Cria os novos índices com vetores quantizados (ver FaissCollection)
+        """
+        self.path = path
+        self.quantized = quantized
+        self._collections: Dict[str, FaissCollection] = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        _open_clients.add(self)
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> FaissCollection:
+        """Obtém a coleção, criando-a se não existir."""
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = FaissCollection(
+                    name, os.path.join(self.path, name), metadata, quantized=self.quantized
+                )
+            return self._collections[name]
+
+    create_collection = get_or_create_collection
+
+    def get_collection(self, name: str) -> FaissCollection:
+        """Obtém uma coleção existente."""
+        if name not in self._collections and not os.path.isdir(os.path.join(self.path, name)):
+            raise ValueError(f"Coleção '{name}' não encontrada.")
+        return self.get_or_create_collection(name)
+
+    def flush(self) -> None:
+        """Grava os índices pendentes de todas as coleções abertas."""
+        with self._lock:
+            collections = list(self._collections.values())
+        for collection in collections:
+            collection.flush()
+
+    def close(self) -> None:
+        """Grava os índices pendentes e fecha todas as coleções abertas."""
+        with self._lock:
+            collections = list(self._collections.values())
+            self._collections.clear()
+        for collection in collections:
+            collection.close()
+        _open_clients.discard(self)
+
+    def delete_collection(self, name: str) -> None:
+        """Remove a coleção e seus arquivos."""
+        with self._lock:
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                collection._dirty = False
+                collection.close()
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def list_collections(self) -> List[FaissCollection]:
+        """Lista as coleções persistidas."""
+        names = sorted(
+            entry.name for entry in os.scandir(self.path) if entry.is_dir()
+        )
+        return [self.get_or_create_collection(name) for name in names]
@@ -0,0 +1,198 @@
+"""
+Divisão de documentos em chunks de tamanho fixo com sobreposição.
+Procura as quebras ("\\n\\n", depois "\\n", depois " ") apenas no final de cada
+janela, em uma única passada; usa Numba para compilar o laço quando disponível
+(pip install numba). Sem Numba, as mesmas quebras são localizadas com
+str.rfind/str.find a partir do limite de cada janela, sem laço por caractere.
+"""
+
+from typing import List
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+NEWLINE = 10
+SPACE = 32
+
+def _find_breaks(codes, chunk_size, chunk_overlap, min_fill, bounds):
+    """
+    Calcula os limites [início, fim) de cada chunk.
+
+    Args:
+        codes: Códigos dos caracteres do texto
+        chunk_size: Tamanho máximo de cada chunk
+        chunk_overlap: Sobreposição desejada entre chunks consecutivos
+        min_fill: Tamanho mínimo do chunk antes de aceitar uma quebra
+        bounds: Saída com pares (início, fim) consecutivos
+
+    Returns:
+        Quantidade de chunks encontrados
+    """
+    n = codes.shape[0]
+    count = 0
+    start = 0
+    while start < n:
+        end = start + chunk_size
+        if end >= n:
+            end = n
+        else:
+            # Quebra preferencial: parágrafo, depois linha, depois palavra
+            lowest = start + min_fill
+            paragraph = -1
+            line = -1
+            word = -1
+            i = end
+            while i > lowest:
+                code = codes[i]
+                if code == NEWLINE:
+                    if codes[i - 1] == NEWLINE:
+                        paragraph = i - 1
+                        break
+                    if line == -1:
+                        line = i
+                elif code == SPACE and word == -1:
+                    word = i
+                i -= 1
+            if paragraph != -1:
+                end = paragraph
+            elif line != -1:
+                end = line
+            elif word != -1:
+                end = word
+
+        bounds[2 * count] = start
+        bounds[2 * count + 1] = end
+        count += 1
+        if end >= n:
+            break
+
+        # O próximo chunk recomeça no início de uma palavra dentro da sobreposição
+        next_start = end
+        i = end - chunk_overlap
+        if i < start + 1:
+            i = start + 1
+        while i < end:
+            if codes[i] == NEWLINE or codes[i] == SPACE:
+                next_start = i + 1
+                break
+            i += 1
+        start = next_start
+    return count
+
+def _find_breaks_str(text, chunk_size, chunk_overlap, min_fill):
+    """
+    Versão de _find_breaks sem Numba: as buscas por caractere rodam em C
+    (str.rfind/str.find), com o mesmo resultado do laço compilado.
+
+    Args:
+        text: Texto a ser dividido
+        chunk_size: Tamanho máximo de cada chunk
+        chunk_overlap: Sobreposição desejada entre chunks consecutivos
+        min_fill: Tamanho mínimo do chunk antes de aceitar uma quebra
+
+    Returns:
+        Lista com pares (início, fim) consecutivos
+    """
+    n = len(text)
+    bounds = []
+    start = 0
+    while start < n:
+        end = start + chunk_size
+        if end >= n:
+            end = n
+        else:
+            # Quebra preferencial: parágrafo, depois linha, depois palavra; a
+            # quebra fica entre start + min_fill e end (inclusive)
+            lowest = start + min_fill
+            paragraph = text.rfind("\n\n", lowest, end + 1)
+            if paragraph != -1:
+                end = paragraph
+            else:
+                line = text.rfind("\n", lowest + 1, end + 1)
+                if line != -1:
+                    end = line
+                else:
+                    word = text.rfind(" ", lowest + 1, end + 1)
+                    if word != -1:
+                        end = word
+
+        bounds.append(start)
+        bounds.append(end)
+        if end >= n:
+            break
+
+        # O próximo chunk recomeça no início de uma palavra dentro da sobreposição
+        first = max(end - chunk_overlap, start + 1)
+        space = text.find(" ", first, end)
+        newline = text.find("\n", first, end)
+        if space == -1:
+            space = newline
+        elif newline != -1 and newline < space:
+            space = newline
+        start = end if space == -1 else space + 1
+    return bounds
+
+if NUMBA_AVAILABLE:
+    # cache=True persiste o código compilado em __pycache__ entre execuções
+    _find_breaks_jit = njit(cache=True)(_find_breaks)
+
+class FastTextSplitter:
+    """
+    Divisor de texto por janelas de tamanho fixo, equivalente em propósito ao
+    RecursiveCharacterTextSplitter com separadores ["\\n\\n", "\\n", " ", ""].
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        """
+        Inicializa o divisor.
+
+        Args:
+            chunk_size: Tamanho máximo de cada chunk (em caracteres)
+            chunk_overlap: Sobreposição entre chunks consecutivos (em caracteres)
+        """
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap deve ser menor que chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        # Evita chunks pequenos quando a única quebra fica no começo da janela
+        self._min_fill = max(chunk_overlap + 1, chunk_size // 2)
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        Divide o texto em chunks.
+
+        Args:
+            text: Texto a ser dividido
+
+        Returns:
+            Chunks sem espaços nas bordas, na ordem do texto
+        """
+        if len(text) <= self.chunk_size:
+            stripped = text.strip()
+            return [stripped] if stripped else []
+
+        if not NUMBA_AVAILABLE:
+            bounds = _find_breaks_str(text, self.chunk_size, self.chunk_overlap, self._min_fill)
+            return self._slice(text, bounds, len(bounds) // 2)
+
+        # Cada passo avança ao menos min_fill - chunk_overlap caracteres
+        max_chunks = len(text) // (self._min_fill - self.chunk_overlap) + 1
+        # UTF-32 mantém um código por caractere, preservando as posições do str
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        bounds = np.empty(2 * max_chunks, dtype=np.int64)
+        count = _find_breaks_jit(codes, self.chunk_size, self.chunk_overlap, self._min_fill, bounds)
+        return self._slice(text, bounds, count)
+
+    @staticmethod
+    def _slice(text: str, bounds, count: int) -> List[str]:
+        """Recorta os chunks pelos limites calculados, descartando os vazios."""
+        chunks = []
+        for index in range(count):
+            chunk = text[bounds[2 * index]:bounds[2 * index + 1]].strip()
+            if chunk:
+                chunks.append(chunk)
+        return chunks
@@ -5,16 +5,140 @@ Implementa padrões de resiliência para garantir operações confiáveis.
 
 import os
 import time
+import random
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Callable
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Callable, Tuple
 from functools import wraps
 import chromadb
+import chromadb.errors
 from chromadb.config import Settings
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Falhas determinísticas (entrada inválida, coleção inexistente, IDs duplicados etc.),
+# que não se resolvem com nova tentativa; as demais continuam sendo repetidas
+NON_RETRYABLE_EXCEPTIONS = (ValueError, TypeError, KeyError, NotImplementedError) + tuple(
+    getattr(chromadb.errors, name)
+    for name in (
+        'InvalidArgumentError', 'InvalidDimensionException', 'InvalidUUIDError',
+        'DuplicateIDError', 'IDAlreadyExistsError', 'UniqueConstraintError',
+        'NotFoundError', 'AuthorizationError', 'ChromaAuthError',
+        'BatchSizeExceededError', 'QuotaError', 'VersionMismatchError'
+    )
+    if hasattr(chromadb.errors, name)
+)
+
+# Modo do ChromaDB: "embedded" mantém índice HNSW e SQLite no processo da
+# aplicação; "server" conecta a um serviço Chroma separado via HTTP
+CHROMA_MODE = os.getenv("CHROMA_MODE", "embedded")
+CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
+
+# Máximo de coleções consultadas simultaneamente em query_all_collections
+QUERY_CONCURRENCY = 8
+
+# Consultas distintas com embedding mantido em memória
+QUERY_EMBEDDING_CACHE_SIZE = 512
+
+# Validade (em segundos) das informações de coleção em cache
+COLLECTION_INFO_TTL = 30.0
+
+def embedding_function_key(embedding_function) -> Tuple:
+    """
+    Identifica a configuração de uma função de embedding, para que coleções
+    com a mesma função compartilhem o embedding da consulta.
+    
+    Args:
+        embedding_function: Função de embedding de uma coleção
+        
+    Returns:
+        Chave (tipo, configuração); funções sem configuração exportável
+        são identificadas pela própria instância
+    """
+    try:
+        return (type(embedding_function), repr(sorted(embedding_function.get_config().items())))
+    except Exception:
+        return (type(embedding_function), id(embedding_function))
+
+def create_chroma_client(persist_directory: str, settings: Settings):
+    """
+    Cria o cliente ChromaDB conforme CHROMA_MODE.
+    
+    Args:
+        persist_directory: Diretório de persistência (apenas no modo embarcado)
+        settings: Configurações do cliente
+        
+    Returns:
+        HttpClient no modo "server", PersistentClient nos demais casos
+    """
+    if CHROMA_MODE == "server":
+        return chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT, settings=settings)
+    return chromadb.PersistentClient(path=persist_directory, settings=settings)
+
+# PRAGMAs para ingestão com muitas escritas (cache_size negativo é em KiB: 256 MB)
+SQLITE_TUNING_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144"
+)
+
+def sqlite_connection(client):
+    """
+    Obtém a conexão SQLite do ChromaDB, disponível apenas nas versões com
+    persistência implementada em Python (anteriores à 1.0).
+    
+    Args:
+        client: Cliente ChromaDB
+        
+    Returns:
+        Conexão sqlite3 da thread atual, ou None se não houver acesso
+    """
+    try:
+        from chromadb.db.impl.sqlite import SqliteDB
+        sysdb = getattr(getattr(client, "_server", None), "_sysdb", None)
+        if isinstance(sysdb, SqliteDB):
+            return sysdb._conn_pool.connect()
+    except Exception:
+        pass
+    return None
+
+def tune_sqlite(client) -> bool:
+    """
+    Aplica SQLITE_TUNING_PRAGMAS à conexão SQLite do cliente quando
+    CHROMA_TUNE_SQLITE=1. O modo WAL fica gravado no arquivo do banco; os
+    demais valores valem para a conexão da thread atual.
+    
+    Args:
+        client: Cliente ChromaDB
+        
+    Returns:
+        True se os PRAGMAs foram aplicados
+    """
+    if os.getenv("CHROMA_TUNE_SQLITE") != "1":
+        return False
+    
+    connection = sqlite_connection(client)
+    if connection is None:
+        return False
+    
+    try:
+        for pragma in SQLITE_TUNING_PRAGMAS:
+            connection.execute(pragma)
+    except Exception as e:
+        logger.warning(f"Não foi possível ajustar o SQLite do ChromaDB: {e}")
+        return False
+    
+    logger.info("SQLite do ChromaDB ajustado para ingestão")
+    return True
+
 class RobustVectorDatabase:
     """
     Implementação robusta da base de dados vetorial com retry mechanism,
@@ -43,20 +167,52 @@ class RobustVectorDatabase:
         self.max_retry_delay = max_retry_delay
         self.backoff_factor = backoff_factor
         
+        # Delays de backoff exponencial por tentativa, calculados uma única vez
+        self._delays = tuple(
+            min(retry_delay * (backoff_factor ** attempt), max_retry_delay)
+            for attempt in range(max_retries)
+        )
+        
         # Garante que o diretório existe
         os.makedirs(persist_directory, exist_ok=True)
         
         # Inicializa a conexão com retry
         self.client = self._initialize_client_with_retry()
         
-        # Métricas de performance
+        # Coleções já resolvidas, reutilizadas entre operações
+        self._collection_cache: Dict[str, chromadb.Collection] = {}
+        
+        # Embeddings de consultas recentes: (função de embedding, texto normalizado) -> embedding
+        self._query_embeddings: "OrderedDict[Tuple, List[float]]" = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
+        
+        # Incrementado a cada escrita; permite a quem guarda resultados de consultas
+        # (ex.: a listagem de ADRs da CLI) detectar que a base mudou
+        self.version = 0
+        
+        # Carga em massa (bulk_load): contextos abertos e conexões SQLite com o
+        # fsync desativado, id(conexão) -> (conexão, valor anterior de synchronous)
+        self._bulk_load_depth = 0
+        self._bulk_load_connections: Dict[int, Tuple[Any, int]] = {}
+        self._bulk_load_lock = threading.Lock()
+        
+        # Informações por coleção: nome -> (instante do cálculo, versão da base, resultado)
+        self._info_cache: Dict[str, Tuple[float, int, Dict[str, Any]]] = {}
+        
+        # Threads das consultas paralelas de query_all_collections, reutilizadas
+        # entre chamadas (criadas sob demanda até QUERY_CONCURRENCY)
+        self._query_executor = ThreadPoolExecutor(max_workers=QUERY_CONCURRENCY,
+                                                  thread_name_prefix="chroma-query")
+        
+        # Métricas de performance; o tempo médio de resposta é calculado
+        # sob demanda em get_metrics a partir da soma acumulada
         self.operation_metrics = {
             'total_operations': 0,
             'successful_operations': 0,
             'failed_operations': 0,
-            'retry_operations': 0,
-            'average_response_time': 0.0
+            'retry_operations': 0
         }
+        self._total_response_time = 0.0
     
     def _initialize_client_with_retry(self) -> chromadb.Client:
         """
@@ -72,9 +228,9 @@ class RobustVectorDatabase:
             try:
                 logger.info(f"Tentativa {attempt + 1} de inicializar ChromaDB")
                 
-                client = chromadb.PersistentClient(
-                    path=self.persist_directory,
-                    settings=Settings(
+                client = create_chroma_client(
+                    self.persist_directory,
+                    Settings(
                         anonymized_telemetry=False,
                         allow_reset=True
                     )
@@ -82,6 +238,7 @@ class RobustVectorDatabase:
                 
                 # Testa a conexão
                 client.heartbeat()
+                tune_sqlite(client)
                 logger.info("ChromaDB inicializado com sucesso")
                 return client
                 
@@ -92,11 +249,23 @@ class RobustVectorDatabase:
                     logger.error("Falha ao inicializar ChromaDB após todas as tentativas")
                     raise Exception(f"Não foi possível inicializar ChromaDB: {e}")
                 
-                # Calcula delay com backoff exponencial
-                delay = min(self.retry_delay * (self.backoff_factor ** attempt), self.max_retry_delay)
-                logger.info(f"Aguardando {delay} segundos antes da próxima tentativa")
+                delay = self._retry_delay(attempt)
+                logger.info(f"Aguardando {delay:.2f} segundos antes da próxima tentativa")
                 time.sleep(delay)
     
+    def _retry_delay(self, attempt: int) -> float:
+        """
+        Obtém o delay antes da próxima tentativa, com jitter de ±50% para que
+        clientes concorrentes não repitam as tentativas em sincronia.
+        
+        Args:
+            attempt: Índice da tentativa que falhou
+            
+        Returns:
+            Delay em segundos, limitado a max_retry_delay
+        """
+        return min(self._delays[attempt] * (0.5 + random.random()), self.max_retry_delay)
+    
     def retry_operation(self, operation: Callable, *args, **kwargs) -> Any:
         """
         Executa uma operação com retry mechanism.
@@ -133,28 +302,27 @@ class RobustVectorDatabase:
                 
                 logger.warning(f"Falha na operação (tentativa {attempt + 1}): {e}")
                 
+                if isinstance(e, NON_RETRYABLE_EXCEPTIONS):
+                    # Falha determinística: repetir só adicionaria espera
+                    self._record_failure()
+                    logger.error("Operação falhou com erro não recuperável")
+                    raise
+                
                 if attempt == self.max_retries - 1:
                     # Registra falha apenas uma vez por operação
                     self._record_failure()
                     logger.error("Operação falhou após todas as tentativas")
                     raise last_exception
                 
-                # Calcula delay com backoff exponencial
-                delay = min(self.retry_delay * (self.backoff_factor ** attempt), self.max_retry_delay)
-                logger.info(f"Aguardando {delay} segundos antes da próxima tentativa")
+                delay = self._retry_delay(attempt)
+                logger.info(f"Aguardando {delay:.2f} segundos antes da próxima tentativa")
                 time.sleep(delay)
     
     def _record_success(self, response_time: float):
         """Registra uma operação bem-sucedida."""
         self.operation_metrics['total_operations'] += 1
         self.operation_metrics['successful_operations'] += 1
-        
-        # Atualiza tempo médio de resposta
-        total_successful = self.operation_metrics['successful_operations']
-        current_avg = self.operation_metrics['average_response_time']
-        self.operation_metrics['average_response_time'] = (
-            (current_avg * (total_successful - 1) + response_time) / total_successful
-        )
+        self._total_response_time += response_time
     
     def _record_failure(self):
         """Registra uma operação falhada."""
@@ -165,6 +333,66 @@ class RobustVectorDatabase:
         """Registra uma operação que precisou de retry."""
         self.operation_metrics['retry_operations'] += 1
     
+    @contextmanager
+    def bulk_load(self) -> Iterator["RobustVectorDatabase"]:
+        """
+        Contexto de carga em massa: desativa o fsync do SQLite (PRAGMA synchronous = OFF)
+        durante a ingestão e restaura a configuração anterior ao final.
+        
+        O pool do ChromaDB mantém uma conexão por thread, então o PRAGMA é aplicado
+        à conexão de cada thread que escreve durante o contexto (inclusive as de
+        aadd_documents_many) e restaurado em todas elas na saída.
+        
+        Troca segurança contra quedas por velocidade; adequado porque a ingestão
+        pode ser refeita. Sem acesso ao SQLite (ChromaDB 1.x, com armazenamento
+        em Rust) o contexto não altera nada.
+        """
+        with self._bulk_load_lock:
+            self._bulk_load_depth += 1
+        self._relax_sqlite_sync()
+        
+        try:
+            yield self
+        finally:
+            with self._bulk_load_lock:
+                self._bulk_load_depth -= 1
+                relaxed = {}
+                if not self._bulk_load_depth:
+                    relaxed, self._bulk_load_connections = self._bulk_load_connections, {}
+            
+            for connection, previous in relaxed.values():
+                try:
+                    connection.execute(f"PRAGMA synchronous = {int(previous)}")
+                except Exception as e:
+                    logger.warning(f"Erro ao restaurar configuração do SQLite: {e}")
+            if relaxed:
+                logger.info(f"Carga em massa finalizada: fsync do SQLite restaurado "
+                            f"em {len(relaxed)} conexão(ões)")
+    
+    def _relax_sqlite_sync(self) -> None:
+        """
+        Desativa o fsync na conexão SQLite da thread atual se houver uma carga
+        em massa em andamento e a conexão ainda não tiver sido ajustada.
+        """
+        if not self._bulk_load_depth:
+            return
+        
+        connection = sqlite_connection(self.client)
+        if connection is None:
+            return
+        
+        with self._bulk_load_lock:
+            if not self._bulk_load_depth or id(connection) in self._bulk_load_connections:
+                return
+            try:
+                previous = connection.execute("PRAGMA synchronous").fetchone()[0]
+                connection.execute("PRAGMA synchronous = OFF")
+            except Exception as e:
+                logger.warning(f"Não foi possível ativar a carga em massa: {e}")
+                return
+            self._bulk_load_connections[id(connection)] = (connection, previous)
+        logger.debug("Carga em massa: fsync do SQLite desativado na conexão da thread atual")
+    
     def get_or_create_collection(self, name: str, metadata: Optional[Dict] = None) -> chromadb.Collection:
         """
         Obtém ou cria uma coleção com retry mechanism.
@@ -176,13 +404,16 @@ class RobustVectorDatabase:
         Returns:
             Coleção ChromaDB
         """
+        collection = self._collection_cache.get(name)
+        if collection is not None:
+            return collection
+        
         def operation():
-            try:
-                return self.client.get_collection(name=name)
-            except Exception:
-                return self.client.create_collection(name=name, metadata=metadata or {})
+            return self.client.get_or_create_collection(name=name, metadata=metadata or None)
         
-        return self.retry_operation(operation)
+        collection = self.retry_operation(operation)
+        self._collection_cache[name] = collection
+        return collection
     
     def add_documents(self, 
                      collection_name: str,
@@ -190,7 +421,7 @@ class RobustVectorDatabase:
                      metadatas: List[Dict],
                      ids: List[str]) -> List[str]:
         """
-        Adiciona documentos a uma coleção com retry mechanism.
+        Adiciona (ou substitui, pelo ID) documentos em uma coleção com retry mechanism.
         
         Args:
             collection_name: Nome da coleção
@@ -201,22 +432,50 @@ class RobustVectorDatabase:
         Returns:
             Lista de IDs dos documentos adicionados
         """
+        self._relax_sqlite_sync()
+        collection = self.get_or_create_collection(collection_name)
+        
         def operation():
-            collection = self.get_or_create_collection(collection_name)
-            return collection.add(
+            return collection.upsert(
                 documents=documents,
                 metadatas=metadatas,
                 ids=ids
             )
         
-        return self.retry_operation(operation)
+        result = self.retry_operation(operation)
+        self.version += 1
+        return result
+    
+    async def aadd_documents_many(self,
+                                  jobs: List[Tuple[str, List[str], List[Dict], List[str]]],
+                                  concurrency: int = 4) -> List[Any]:
+        """
+        Adiciona vários lotes de documentos com até `concurrency` inserções simultâneas.
+        O cliente do ChromaDB é síncrono, então cada lote roda em uma thread.
+        
+        Args:
+            jobs: Lotes no formato (collection_name, documents, metadatas, ids)
+            concurrency: Número máximo de inserções em andamento
+            
+        Returns:
+            Resultados de add_documents na mesma ordem dos lotes; um lote que falhou
+            traz a exceção no lugar do resultado (os demais seguem até o fim)
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run(job):
+            async with semaphore:
+                return await asyncio.to_thread(self.add_documents, *job)
+        
+        return await asyncio.gather(*(run(job) for job in jobs), return_exceptions=True)
     
     def search(self, 
               collection_name: str,
-              query_texts: List[str],
+              query_texts: Optional[List[str]] = None,
               n_results: int = 5,
               where: Optional[Dict] = None,
-              where_document: Optional[Dict] = None) -> Dict[str, Any]:
+              where_document: Optional[Dict] = None,
+              query_embeddings: Optional[List[Any]] = None) -> Dict[str, Any]:
         """
         Realiza busca em uma coleção com retry mechanism.
         
@@ -226,14 +485,21 @@ class RobustVectorDatabase:
             n_results: Número de resultados
             where: Filtros de metadados
             where_document: Filtros de documento
+            query_embeddings: Embeddings já calculados (usados no lugar de query_texts)
             
         Returns:
             Resultados da busca
         """
+        collection = self.get_or_create_collection(collection_name)
+        
+        if query_embeddings is not None:
+            query = {'query_embeddings': query_embeddings}
+        else:
+            query = {'query_texts': query_texts}
+        
         def operation():
-            collection = self.get_or_create_collection(collection_name)
             return collection.query(
-                query_texts=query_texts,
+                **query,
                 n_results=n_results,
                 where=where,
                 where_document=where_document
@@ -241,7 +507,125 @@ class RobustVectorDatabase:
         
         return self.retry_operation(operation)
     
-    def delete_documents(self, 
+    def query(self,
+              collection_name: str,
+              query_text: str,
+              n_results: int = 5,
+              filter_criteria: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Consulta uma coleção a partir de um texto, com a mesma assinatura do
+        backend FAISS (usada pela CLI e pelo atualizador da base). O embedding
+        da consulta é reaproveitado como em query_all_collections.
+        
+        Args:
+            collection_name: Nome da coleção
+            query_text: Texto da consulta
+            n_results: Número de resultados
+            filter_criteria: Filtros de metadados
+            
+        Returns:
+            Resultados da busca
+        """
+        collection = self.get_or_create_collection(collection_name)
+        embedding_function = getattr(collection, '_embedding_function', None)
+        if embedding_function is None:
+            return self.search(collection_name, [query_text], n_results, where=filter_criteria)
+        
+        embedding = self._embed_query_with(embedding_function, query_text)
+        return self.search(collection_name, n_results=n_results, where=filter_criteria,
+                           query_embeddings=[embedding])
+    
+    def query_all_collections(self, query_text: str, n_results_per_collection: int = 3) -> Dict[str, Any]:
+        """
+        Realiza uma busca em todas as coleções. As coleções são consultadas em
+        paralelo; a latência passa a ser a da mais lenta.
+        
+        Args:
+            query_text: Texto da consulta
+            n_results_per_collection: Número de resultados por coleção
+            
+        Returns:
+            Resultados por coleção (na ordem de list_collections); coleções com
+            falha trazem {"error": mensagem}
+        """
+        names = self.list_collections()
+        if not names:
+            return {}
+        
+        # O embedding da consulta é calculado uma única vez por função de
+        # embedding e compartilhado pelas coleções que a utilizam
+        embedding_lock = threading.Lock()
+        
+        def search(name: str) -> Dict[str, Any]:
+            collection = self.get_or_create_collection(name)
+            embedding_function = getattr(collection, '_embedding_function', None)
+            if embedding_function is None:
+                return self.search(name, [query_text], n_results_per_collection)
+            
+            with embedding_lock:
+                embedding = self._embed_query_with(embedding_function, query_text)
+            return self.search(name, n_results=n_results_per_collection, query_embeddings=[embedding])
+        
+        all_results = {}
+        futures = {name: self._query_executor.submit(search, name) for name in names}
+        for name, future in futures.items():
+            try:
+                all_results[name] = future.result()
+            except Exception as e:
+                logger.error(f"Erro ao consultar coleção '{name}': {e}")
+                all_results[name] = {"error": str(e)}
+        
+        return all_results
+    
+    def _embed_query_with(self, embedding_function, query_text: str) -> List[float]:
+        """
+        Gera o embedding de uma consulta com a função informada, reaproveitando
+        consultas repetidas. O texto é normalizado (espaços nas bordas e caixa)
+        antes do cálculo; são mantidas até QUERY_EMBEDDING_CACHE_SIZE consultas.
+        
+        Args:
+            embedding_function: Função de embedding de uma coleção
+            query_text: Texto da consulta
+            
+        Returns:
+            Embedding da consulta
+        """
+        normalized_text = query_text.strip().lower()
+        key = (embedding_function_key(embedding_function), normalized_text)
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(key)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(key)
+                return embedding
+        
+        embedding = list(embedding_function([normalized_text])[0])
+        with self._query_embeddings_lock:
+            self._query_embeddings[key] = embedding
+            if len(self._query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embeddings.popitem(last=False)
+        return embedding
+    
+    def embed_query(self, query_text: str) -> List[float]:
+        """
+        Gera o embedding de uma consulta com a função de embedding das coleções
+        (no padrão do ChromaDB, um modelo local, sem chamada à OpenAI).
+        
+        Args:
+            query_text: Texto da consulta
+        
+        Returns:
+            Embedding da consulta
+        
+        Raises:
+            ValueError: Se nenhuma coleção tiver função de embedding
+        """
+        for name in self.list_collections():
+            embedding_function = getattr(self.get_or_create_collection(name), '_embedding_function', None)
+            if embedding_function is not None:
+                return self._embed_query_with(embedding_function, query_text)
+        raise ValueError("Nenhuma coleção com função de embedding para a consulta")
+    
+    def delete_documents(self,
                         collection_name: str,
                         ids: List[str]) -> None:
         """
@@ -251,11 +635,41 @@ class RobustVectorDatabase:
             collection_name: Nome da coleção
             ids: IDs dos documentos a remover
         """
+        self._relax_sqlite_sync()
+        collection = self.get_or_create_collection(collection_name)
+        
         def operation():
-            collection = self.get_or_create_collection(collection_name)
             collection.delete(ids=ids)
         
         self.retry_operation(operation)
+        self.version += 1
+    
+    def delete_stale_chunks(self,
+                            collection_name: str,
+                            document_id: str,
+                            chunk_ids: Iterable[str]) -> None:
+        """
+        Remove os chunks de um documento que não estão entre os IDs informados
+        (sobras de uma versão anterior do documento) com retry mechanism.
+        
+        Args:
+            collection_name: Nome da coleção
+            document_id: ID do documento
+            chunk_ids: IDs dos chunks da versão atual do documento
+        """
+        self._relax_sqlite_sync()
+        collection = self.get_or_create_collection(collection_name)
+        current = set(chunk_ids)
+        
+        def operation():
+            existing = collection.get(where={"document_id": document_id}, include=[])["ids"]
+            stale = [chunk_id for chunk_id in existing if chunk_id not in current]
+            if stale:
+                collection.delete(ids=stale)
+            return stale
+        
+        if self.retry_operation(operation):
+            self.version += 1
     
     def update_documents(self,
                         collection_name: str,
@@ -271,8 +685,10 @@ class RobustVectorDatabase:
             documents: Novos documentos
             metadatas: Novos metadados
         """
+        self._relax_sqlite_sync()
+        collection = self.get_or_create_collection(collection_name)
+        
         def operation():
-            collection = self.get_or_create_collection(collection_name)
             collection.update(
                 ids=ids,
                 documents=documents,
@@ -280,6 +696,7 @@ class RobustVectorDatabase:
             )
         
         self.retry_operation(operation)
+        self.version += 1
     
     def get_collection_info(self, collection_name: str) -> Dict[str, Any]:
         """
@@ -291,15 +708,53 @@ class RobustVectorDatabase:
         Returns:
             Informações da coleção
         """
+        # Reaproveita informações recentes enquanto a base não registrar escritas
+        # (count percorre a coleção)
+        cached = self._info_cache.get(collection_name)
+        if cached is not None and cached[1] == self.version and time.monotonic() - cached[0] < COLLECTION_INFO_TTL:
+            return cached[2]
+        
+        collection = self.get_or_create_collection(collection_name)
+        
         def operation():
-            collection = self.get_or_create_collection(collection_name)
             return {
                 'name': collection.name,
                 'count': collection.count(),
                 'metadata': collection.metadata
             }
         
-        return self.retry_operation(operation)
+        version = self.version
+        info = self.retry_operation(operation)
+        self._info_cache[collection_name] = (time.monotonic(), version, info)
+        return info
+    
+    def warm_up(self) -> int:
+        """
+        Executa uma busca mínima em cada coleção existente, carregando o modelo
+        de embeddings e os índices antes da primeira consulta real.
+        
+        Returns:
+            Número de coleções aquecidas com sucesso
+        """
+        try:
+            names = [col.name for col in self.client.list_collections()]
+        except Exception as e:
+            logger.warning(f"Aquecimento ignorado: {e}")
+            return 0
+        
+        def warm(name: str) -> bool:
+            try:
+                collection = self.get_or_create_collection(name)
+                collection.query(query_texts=["ping"], n_results=1)
+                return True
+            except Exception as e:
+                logger.debug(f"Falha ao aquecer coleção {name}: {e}")
+                return False
+        
+        with ThreadPoolExecutor(max_workers=len(names) or 1) as executor:
+            warmed = sum(executor.map(warm, names))
+        logger.info(f"{warmed} coleções aquecidas")
+        return warmed
     
     def list_collections(self) -> List[str]:
         """
@@ -324,6 +779,8 @@ class RobustVectorDatabase:
             self.client.delete_collection(name=collection_name)
         
         self.retry_operation(operation)
+        self._collection_cache.pop(collection_name, None)
+        self.version += 1
     
     def get_metrics(self) -> Dict[str, Any]:
         """
@@ -339,6 +796,7 @@ class RobustVectorDatabase:
         
         return {
             **self.operation_metrics,
+            'average_response_time': self._total_response_time / max(self.operation_metrics['successful_operations'], 1),
             'success_rate_percentage': success_rate,
             'retry_rate_percentage': (self.operation_metrics['retry_operations'] / max(total_ops, 1)) * 100
         }
@@ -377,9 +835,9 @@ class RobustVectorDatabase:
             'total_operations': 0,
             'successful_operations': 0,
             'failed_operations': 0,
-            'retry_operations': 0,
-            'average_response_time': 0.0
+            'retry_operations': 0
         }
+        self._total_response_time = 0.0
         logger.info("Métricas resetadas")
 
 def get_robust_vector_database(persist_directory: str = "./chroma_db") -> RobustVectorDatabase:
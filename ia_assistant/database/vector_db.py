@@ -5,19 +5,44 @@ para armazenamento e recuperação de conhecimento para a assistente de IA.
 """
 
 import os
-import chromadb
+import time
+import uuid
+import hashlib
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
+import numpy as np
+import openai
+import chromadb.errors
 from chromadb.config import Settings
 from langchain_openai import OpenAIEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
+
+from .embed_cache import EmbeddingCache
+from .fast_splitter import FastTextSplitter
+from .faiss_backend import FaissClient
+from .robust_vector_db import create_chroma_client, tune_sqlite
 
 # Configuração de diretórios
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_DIR = os.path.join(BASE_DIR, "chroma_db")
 os.makedirs(DB_DIR, exist_ok=True)
 
-# Configuração do ChromaDB
-client = chromadb.PersistentClient(path=DB_DIR, settings=Settings(allow_reset=True))
+# Configuração do ChromaDB (CHROMA_MODE=server usa um serviço Chroma separado)
+client = create_chroma_client(DB_DIR, Settings(allow_reset=True))
+
+# Backend vetorial: "chroma" (padrão) ou "faiss" (índice HNSW local, para alto volume de consultas)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+FAISS_DIR = os.path.join(BASE_DIR, "faiss_db")
+# Com FAISS_QUANTIZED=1, os índices FAISS são criados com vetores em float16 (IndexHNSWSQ)
+FAISS_QUANTIZED = os.getenv("FAISS_QUANTIZED", "0") == "1"
+
+# Falhas tratadas por coleção em query_all_collections; KeyboardInterrupt e
+# asyncio.CancelledError não são capturadas e interrompem a consulta
+EMBEDDING_ERRORS = (openai.OpenAIError, ValueError)
+QUERY_ERRORS = (chromadb.errors.ChromaError, ValueError, RuntimeError)
 
 # Definição das coleções conforme a arquitetura
 COLLECTIONS = {
@@ -31,41 +56,172 @@ COLLECTIONS = {
 
 # Configuração do modelo de embeddings
 embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+EMBEDDING_DIMENSIONS = 1536
+
+# Cache persistente de embeddings: reprocessar um texto não chama a API novamente
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(BASE_DIR, "embedding_cache.sqlite3"))
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, embeddings.model)
+
+# Máximo de textos enviados em cada requisição de embeddings
+EMBEDDING_BATCH_SIZE = 250
+
+# Requisições de embeddings simultâneas na ingestão assíncrona
+EMBEDDING_CONCURRENCY = 32
+
+# Consultas distintas com embedding mantido em memória
+QUERY_EMBEDDING_CACHE_SIZE = 512
 
-# Configuração do text splitter para chunking
-text_splitter = RecursiveCharacterTextSplitter(
+# Validade (em segundos) das estatísticas de coleção em cache
+STATS_CACHE_TTL = 30.0
+
+# Chunks acumulados antes de cada inserção no ChromaDB em aprocess_and_add_documents
+BATCH_SIZE = int(os.getenv("CHROMA_BATCH_SIZE", "128"))
+
+# Configuração do text splitter para chunking (quebras "\n\n", "\n", " " e corte direto)
+text_splitter = FastTextSplitter(
     chunk_size=1000,
-    chunk_overlap=200,
-    length_function=len,
-    separators=["\n\n", "\n", " ", ""]
+    chunk_overlap=200
 )
 
+@lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+def _embed_query_cached(normalized_text: str) -> Tuple[float, ...]:
+    """Gera (uma única vez por texto normalizado) o embedding de uma consulta."""
+    return tuple(embeddings.embed_query(normalized_text))
+
+
+def embed_query(query_text: str) -> List[float]:
+    """
+    Obtém o embedding de uma consulta, reaproveitando consultas repetidas.
+    O texto é normalizado (espaços nas bordas e caixa) antes do cálculo.
+    
+    Args:
+        query_text: Texto da consulta.
+        
+    Returns:
+        Embedding da consulta.
+    """
+    return list(_embed_query_cached(query_text.strip().lower()))
+
+
+def _stack_embeddings(batches: List[np.ndarray]) -> np.ndarray:
+    """Junta lotes de embeddings float32 em uma única matriz."""
+    if len(batches) == 1:
+        return batches[0]
+    if not batches:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.concatenate(batches)
+
+
+def resolve_document_id(metadata: Dict[str, Any], document_id: Optional[str] = None) -> str:
+    """
+    Determina o ID de um documento: o informado, o dos metadados ou um novo.
+    
+    Args:
+        metadata: Metadados base associados ao documento.
+        document_id: ID opcional do documento.
+        
+    Returns:
+        ID do documento.
+    """
+    if document_id is None:
+        document_id = metadata.get("document_id")
+        if document_id is None:
+            document_id = uuid.uuid4().hex
+    return document_id
+
+
+def split_document(document: str, metadata: Dict[str, Any],
+                   document_id: Optional[str] = None) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+    """
+    Divide um documento em chunks com seus IDs e metadados.
+    Os IDs derivam do documento e do hash BLAKE2b de cada chunk, de modo que
+    reprocessar o mesmo conteúdo gera os mesmos IDs (reingestão idempotente).
+    
+    Args:
+        document: Texto completo do documento.
+        metadata: Metadados base associados ao documento.
+        document_id: ID opcional do documento. Se não fornecido, usa o
+            document_id dos metadados ou gera um novo.
+        
+    Returns:
+        Tupla (IDs, textos, metadados) dos chunks.
+    """
+    # Divide o documento em chunks
+    chunks = text_splitter.split_text(document)
+    chunk_count = len(chunks)
+    document_id = resolve_document_id(metadata, document_id)
+    
+    # Prepara metadados para cada chunk (document_id permite remover o documento)
+    metadatas = [
+        {"document_id": document_id, **metadata, "chunk_index": i, "chunk_count": chunk_count}
+        for i in range(chunk_count)
+    ]
+    
+    # Chunks repetidos no mesmo documento recebem o número da ocorrência
+    chunk_ids = []
+    occurrences: Dict[str, int] = {}
+    for chunk in chunks:
+        digest = hashlib.blake2b(chunk.encode("utf-8"), digest_size=12).hexdigest()
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        chunk_id = f"{document_id}_{digest}"
+        chunk_ids.append(chunk_id if occurrence == 0 else f"{chunk_id}_{occurrence}")
+    
+    return chunk_ids, chunks, metadatas
+
+
+@dataclass
+class _PendingBatch:
+    """Chunks aguardando inserção em uma coleção (listas paralelas)."""
+    ids: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+
+
 class VectorDatabase:
-    """Classe para gerenciar a base de dados vetorial."""
+    """
+    Classe para gerenciar a base de dados vetorial com embeddings da OpenAI
+    calculados pela própria classe. Usada apenas com VECTOR_BACKEND=faiss (ver
+    get_vector_database); no padrão, VectorDatabase é a RobustVectorDatabase, em
+    que o ChromaDB calcula os embeddings. Os lotes de embed_documents, os vetores
+    float32 e os caches de embeddings (SQLite e LRU de consultas) valem apenas aqui.
+    """
     
-    def __init__(self):
-        """Inicializa a base de dados vetorial e cria as coleções necessárias."""
-        self.client = client
+    def __init__(self, client=None):
+        """
+        Inicializa a base de dados vetorial e cria as coleções necessárias.
+        
+        Args:
+            client: Cliente opcional com a API de coleções do ChromaDB
+                (ex.: FaissClient). Se não fornecido, usa o cliente ChromaDB padrão.
+        """
+        self.client = client if client is not None else globals()["client"]
         self.collections = {}
+        # Estatísticas por coleção: (instante do cálculo, resultado)
+        self._stats_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Incrementado a cada escrita; permite a quem guarda resultados de consultas
+        # (ex.: a listagem de ADRs da CLI) detectar que a base mudou
+        self.version = 0
+        tune_sqlite(self.client)
         self._initialize_collections()
     
     def _initialize_collections(self):
         """Inicializa as coleções definidas na arquitetura."""
         for collection_name, description in COLLECTIONS.items():
-            try:
-                # Tenta obter a coleção se já existir
-                collection = self.client.get_collection(name=collection_name)
-                print(f"Coleção '{collection_name}' já existe.")
-            except:
-                # Cria a coleção se não existir
-                collection = self.client.create_collection(
-                    name=collection_name,
-                    metadata={"description": description}
-                )
-                print(f"Coleção '{collection_name}' criada com sucesso.")
+            # Obtém ou cria a coleção em uma única chamada
+            collection = self.client.get_or_create_collection(
+                name=collection_name,
+                metadata={"description": description}
+            )
+            print(f"Coleção '{collection_name}' disponível.")
             
             self.collections[collection_name] = collection
     
+    def _mark_changed(self, collection_name: str) -> None:
+        """Registra uma escrita na coleção: descarta suas estatísticas e avança a versão."""
+        self._stats_cache.pop(collection_name, None)
+        self.version += 1
+    
     def add_documents(self, collection_name: str, texts: List[str], 
                      metadatas: List[Dict[str, Any]], ids: Optional[List[str]] = None) -> List[str]:
         """
@@ -85,21 +241,28 @@ class VectorDatabase:
         
         collection = self.collections[collection_name]
         
-        # Gera embeddings para os textos
-        embeddings_list = [embeddings.embed_query(text) for text in texts]
+        # Gera embeddings para os textos em lotes, uma requisição por lote apenas
+        # para os textos fora do cache; os vetores ficam em float32
+        embedding_batches = []
+        remaining = iter(texts)
+        batch = list(islice(remaining, EMBEDDING_BATCH_SIZE))
+        while batch:
+            embedding_batches.append(embedding_cache.embed_documents(batch, embeddings.embed_documents))
+            batch = list(islice(remaining, EMBEDDING_BATCH_SIZE))
+        embeddings_array = _stack_embeddings(embedding_batches)
         
         # Se IDs não foram fornecidos, gera IDs únicos
         if ids is None:
-            import uuid
             ids = [str(uuid.uuid4()) for _ in range(len(texts))]
         
-        # Adiciona os documentos à coleção
-        collection.add(
-            embeddings=embeddings_list,
+        # Insere ou substitui os documentos (IDs determinísticos tornam a reingestão idempotente)
+        collection.upsert(
+            embeddings=embeddings_array,
             documents=texts,
             metadatas=metadatas,
             ids=ids
         )
+        self._mark_changed(collection_name)
         
         return ids
     
@@ -117,26 +280,105 @@ class VectorDatabase:
         Returns:
             Lista de IDs dos chunks adicionados.
         """
-        # Divide o documento em chunks
-        chunks = text_splitter.split_text(document)
-        
-        # Prepara metadados para cada chunk
-        metadatas = []
-        for i, chunk in enumerate(chunks):
-            chunk_metadata = metadata.copy()
-            chunk_metadata["chunk_index"] = i
-            chunk_metadata["chunk_count"] = len(chunks)
-            metadatas.append(chunk_metadata)
-        
-        # Gera IDs para os chunks baseados no document_id
-        if document_id is None:
-            import uuid
-            document_id = str(uuid.uuid4())
+        document_id = resolve_document_id(metadata, document_id)
+        chunk_ids, chunks, metadatas = split_document(document, metadata, document_id)
+        
+        # Adiciona os chunks à coleção (lotes com vários documentos: ver BatchedCollector)
+        # e remove os que sobraram da versão anterior do documento
+        if chunk_ids:
+            self.add_documents(collection_name, chunks, metadatas, chunk_ids)
+        self.delete_stale_chunks(collection_name, document_id, chunk_ids)
+        return chunk_ids
+    
+    async def aprocess_and_add_documents(self, collection_name: str,
+                                         documents: Iterable[Tuple[str, Dict[str, Any], Optional[str]]]) -> List[str]:
+        """
+        Processa vários documentos e os adiciona à coleção de forma assíncrona.
+        Os embeddings são solicitados em paralelo (limitados por
+        EMBEDDING_CONCURRENCY) enquanto uma tarefa escritora insere no ChromaDB
+        os lotes já prontos, sobrepondo as duas etapas de rede.
         
-        chunk_ids = [f"{document_id}_chunk_{i}" for i in range(len(chunks))]
+        Args:
+            collection_name: Nome da coleção onde os chunks serão adicionados.
+            documents: Tuplas (texto, metadados, ID opcional) dos documentos.
+            
+        Returns:
+            Lista de IDs dos chunks adicionados.
+        """
+        if collection_name not in self.collections:
+            raise ValueError(f"Coleção '{collection_name}' não encontrada.")
         
-        # Adiciona os chunks à coleção
-        return self.add_documents(collection_name, chunks, metadatas, chunk_ids)
+        collection = self.collections[collection_name]
+        
+        ids: List[str] = []
+        texts: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        document_chunk_ids: Dict[str, List[str]] = {}
+        for document, metadata, document_id in documents:
+            document_id = resolve_document_id(metadata, document_id)
+            chunk_ids, chunks, chunk_metadatas = split_document(document, metadata, document_id)
+            document_chunk_ids[document_id] = chunk_ids
+            ids.extend(chunk_ids)
+            texts.extend(chunks)
+            metadatas.extend(chunk_metadatas)
+        
+        semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+        # Fila limitada: embeddings prontos aguardam o escritor sem acumular sem limite
+        queue: asyncio.Queue = asyncio.Queue(maxsize=EMBEDDING_CONCURRENCY)
+        
+        async def embed(start: int) -> None:
+            end = start + EMBEDDING_BATCH_SIZE
+            async with semaphore:
+                vectors = await embedding_cache.aembed_documents(texts[start:end], embeddings.aembed_documents)
+            await queue.put((ids[start:end], texts[start:end], metadatas[start:end], vectors))
+        
+        async def write() -> None:
+            batch = _PendingBatch()
+            vectors: List[np.ndarray] = []
+            while True:
+                item = await queue.get()
+                if item is not None:
+                    batch.ids.extend(item[0])
+                    batch.texts.extend(item[1])
+                    batch.metadatas.extend(item[2])
+                    vectors.append(item[3])
+                if batch.ids and (item is None or len(batch.ids) >= BATCH_SIZE):
+                    await asyncio.to_thread(
+                        collection.upsert,
+                        embeddings=_stack_embeddings(vectors),
+                        documents=batch.texts,
+                        metadatas=batch.metadatas,
+                        ids=batch.ids
+                    )
+                    batch = _PendingBatch()
+                    vectors = []
+                if item is None:
+                    return
+        
+        async def produce() -> None:
+            await asyncio.gather(*(embed(start) for start in range(0, len(texts), EMBEDDING_BATCH_SIZE)))
+            await queue.put(None)
+        
+        writer = asyncio.create_task(write())
+        producer = asyncio.create_task(produce())
+        try:
+            # Uma falha do escritor interrompe os produtores (que ficariam presos na fila)
+            await asyncio.wait({writer, producer}, return_when=asyncio.FIRST_EXCEPTION)
+            if writer.done():
+                writer.result()
+            await producer
+            await writer
+            
+            # Remove os chunks que sobraram das versões anteriores dos documentos
+            for document_id, chunk_ids in document_chunk_ids.items():
+                await asyncio.to_thread(self.delete_stale_chunks, collection_name, document_id, chunk_ids)
+        finally:
+            for task in (producer, writer):
+                if not task.done():
+                    task.cancel()
+            self._mark_changed(collection_name)
+        
+        return ids
     
     def query(self, collection_name: str, query_text: str, n_results: int = 5, 
              filter_criteria: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -155,10 +397,19 @@ class VectorDatabase:
         if collection_name not in self.collections:
             raise ValueError(f"Coleção '{collection_name}' não encontrada.")
         
-        collection = self.collections[collection_name]
-        
         # Gera embedding para a consulta
-        query_embedding = embeddings.embed_query(query_text)
+        query_embedding = self.embed_query(query_text)
+        
+        return self._query_with_embedding(collection_name, query_embedding, n_results, filter_criteria)
+    
+    def embed_query(self, query_text: str) -> List[float]:
+        """Obtém o embedding da consulta (ver a função embed_query do módulo)."""
+        return embed_query(query_text)
+    
+    def _query_with_embedding(self, collection_name: str, query_embedding: List[float], n_results: int,
+                              filter_criteria: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Consulta uma coleção a partir de um embedding já calculado."""
+        collection = self.collections[collection_name]
         
         # Realiza a consulta
         results = collection.query(
@@ -181,14 +432,29 @@ class VectorDatabase:
             Dicionário com os resultados da consulta por coleção.
         """
         all_results = {}
+        collection_names = list(self.collections)
         
-        for collection_name in self.collections:
-            try:
-                results = self.query(collection_name, query_text, n_results_per_collection)
-                all_results[collection_name] = results
-            except Exception as e:
-                print(f"Erro ao consultar coleção '{collection_name}': {e}")
-                all_results[collection_name] = {"error": str(e)}
+        # Um único embedding da consulta é compartilhado por todas as coleções
+        try:
+            query_embedding = self.embed_query(query_text)
+        except EMBEDDING_ERRORS as e:
+            print(f"Erro ao gerar embedding da consulta: {e}")
+            return {collection_name: {"error": str(e)} for collection_name in collection_names}
+        
+        # As coleções são consultadas em paralelo; a latência passa a ser a da mais lenta
+        with ThreadPoolExecutor(max_workers=max(1, len(collection_names))) as executor:
+            futures = {
+                collection_name: executor.submit(
+                    self._query_with_embedding, collection_name, query_embedding, n_results_per_collection
+                )
+                for collection_name in collection_names
+            }
+            for collection_name, future in futures.items():
+                try:
+                    all_results[collection_name] = future.result()
+                except QUERY_ERRORS as e:
+                    print(f"Erro ao consultar coleção '{collection_name}': {e}")
+                    all_results[collection_name] = {"error": str(e)}
         
         return all_results
     
@@ -207,6 +473,29 @@ class VectorDatabase:
         
         # Remove todos os chunks associados ao document_id
         collection.delete(where={"document_id": document_id})
+        self._mark_changed(collection_name)
+    
+    def delete_stale_chunks(self, collection_name: str, document_id: str, chunk_ids: Iterable[str]) -> None:
+        """
+        Remove os chunks de um documento que não estão entre os IDs informados,
+        tornando a reingestão de um documento editado idempotente.
+        
+        Args:
+            collection_name: Nome da coleção.
+            document_id: ID do documento.
+            chunk_ids: IDs dos chunks da versão atual do documento.
+        """
+        if collection_name not in self.collections:
+            raise ValueError(f"Coleção '{collection_name}' não encontrada.")
+        
+        collection = self.collections[collection_name]
+        
+        current = set(chunk_ids)
+        existing = collection.get(where={"document_id": document_id}, include=[])["ids"]
+        stale = [chunk_id for chunk_id in existing if chunk_id not in current]
+        if stale:
+            collection.delete(ids=stale)
+            self._mark_changed(collection_name)
     
     def reset_collection(self, collection_name: str) -> None:
         """
@@ -218,7 +507,8 @@ class VectorDatabase:
         if collection_name not in self.collections:
             raise ValueError(f"Coleção '{collection_name}' não encontrada.")
         
-        # Recria a coleção
+        # Descarta as estatísticas e recria a coleção
+        self._mark_changed(collection_name)
         self.client.delete_collection(collection_name)
         collection = self.client.create_collection(
             name=collection_name,
@@ -240,6 +530,11 @@ class VectorDatabase:
         if collection_name not in self.collections:
             raise ValueError(f"Coleção '{collection_name}' não encontrada.")
         
+        # Reaproveita estatísticas recentes (count e peek percorrem a coleção)
+        cached = self._stats_cache.get(collection_name)
+        if cached is not None and time.monotonic() - cached[0] < STATS_CACHE_TTL:
+            return cached[1]
+        
         collection = self.collections[collection_name]
         
         # Obtém contagem de documentos
@@ -248,12 +543,34 @@ class VectorDatabase:
         # Obtém alguns metadados de exemplo
         sample = collection.peek(10)
         
-        return {
+        stats = {
             "name": collection_name,
             "description": COLLECTIONS[collection_name],
             "document_count": count,
             "sample": sample
         }
+        self._stats_cache[collection_name] = (time.monotonic(), stats)
+        return stats
+    
+    def warm_up(self) -> int:
+        """
+        Executa uma consulta mínima em cada coleção para carregar seus índices,
+        evitando que a primeira pergunta do usuário pague esse custo.
+        
+        Returns:
+            Número de coleções aquecidas com sucesso.
+        """
+        probe = [[0.0] * EMBEDDING_DIMENSIONS]
+        
+        def warm(collection) -> bool:
+            try:
+                collection.query(query_embeddings=probe, n_results=1)
+                return True
+            except Exception:
+                return False
+        
+        with ThreadPoolExecutor(max_workers=len(self.collections) or 1) as executor:
+            return sum(executor.map(warm, self.collections.values()))
     
     def get_all_collections_stats(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -314,17 +631,31 @@ class VectorDatabase:
             logger.error(f"Erro ao carregar documentos para {collection_name}: {e}")
 
 
+# Implementação com embeddings próprios, usada com o backend FAISS
+_EmbeddingVectorDatabase = VectorDatabase
+
 # Importa a versão robusta
 from .robust_vector_db import get_robust_vector_database, RobustVectorDatabase
 
 # Função para criar uma instância da base de dados vetorial
-def get_vector_database() -> VectorDatabase:
+def get_vector_database(quantized: Optional[bool] = None) -> VectorDatabase:
     """
-    Cria e retorna uma instância robusta da base de dados vetorial.
+    Cria e retorna uma instância da base de dados vetorial: a versão robusta
+    sobre ChromaDB ou, com VECTOR_BACKEND=faiss, coleções em índices FAISS.
+    
+    Args:
+        quantized: Com o backend FAISS, cria os novos índices com vetores em
+            float16; se None, usa FAISS_QUANTIZED. A quantização vale apenas na
+            criação do índice, então a ingestão precisa usar o mesmo valor. O
+            ChromaDB não oferece quantização e ignora a opção.
     
     Returns:
-        Instância robusta da base de dados vetorial.
+        Instância da base de dados vetorial.
     """
+    if VECTOR_BACKEND == "faiss":
+        if quantized is None:
+            quantized = FAISS_QUANTIZED
+        return _EmbeddingVectorDatabase(client=FaissClient(FAISS_DIR, quantized=quantized))
     return get_robust_vector_database()
 
 # Mantém compatibilidade com a interface anterior
@@ -6,85 +6,359 @@ Implementa uma interface de linha de comando (CLI) para realizar consultas
 
 import os
 import sys
+import atexit
+import importlib.util
 import argparse
 import re
-from typing import List, Dict, Any, Optional, Union, Tuple
+import time
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING, List, Dict, Any, AsyncIterator, Callable, Iterator, Optional, Union, Tuple
 import json
-from langchain_openai import OpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-
-# Importa a base de dados vetorial
-from ia_assistant.database.vector_db import get_vector_database, VectorDatabase
-from ia_assistant.interface.prompt_templates import prompt_optimizer, QueryType
-from ia_assistant.cache.intelligent_cache import intelligent_cache, CacheStrategy
+from functools import lru_cache
+
+# langchain_community (caches em SQLite e Redis) e redis são importados apenas
+# ao ativar o cache (ver _configure_llm_cache)
+SQLITE_LLM_CACHE_AVAILABLE = importlib.util.find_spec("langchain_community") is not None
+REDIS_AVAILABLE = importlib.util.find_spec("redis") is not None
+
+# A base vetorial (ChromaDB, cliente e embeddings), o LangChain e o cliente da
+# OpenAI são importados ao criar o QueryProcessor e o modelo, para que --help e
+# erros de argumentos respondam imediatamente
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from ia_assistant.database.vector_db import VectorDatabase
+from ia_assistant.interface.semantic_cache import SemanticCache
+from ia_assistant.cache.intelligent_cache import intelligent_cache
 from ia_assistant.monitoring.change_detector import KnowledgeBaseMonitor, change_detector
 from ia_assistant.proactive.suggestion_engine import ProactiveSuggestionEngine, suggestion_engine
 
+logger = logging.getLogger(__name__)
+
 # Configuração de modelos da OpenAI
-GPT_3_5_MODEL = "gpt-3.5-turbo-instruct"  # Modelo mais econômico
+# Modelos de chat: o endpoint de completions (gpt-3.5-turbo-instruct) não aceita
+# lotes nem reaproveita o prefixo estático dos prompts (cache de prefixo da OpenAI)
+GPT_4O_MINI_MODEL = "gpt-4o-mini"  # Modelo mais econômico
 GPT_4_MODEL = "gpt-4"  # Modelo mais avançado
 
-# Templates de prompts
-QUERY_PROMPT_TEMPLATE = """
+# Intervalo (segundos) entre verificações do status de um lote
+BATCH_POLL_INTERVAL = 30
+
+# Tempo máximo (segundos) de espera por um lote; depois dele o lote é cancelado
+# e as consultas pendentes são respondidas uma a uma
+BATCH_TIMEOUT = float(os.getenv("BATCH_TIMEOUT", "3600"))
+
+# Consultas simultâneas em batch_process (dentro do limite de taxa da OpenAI)
+LLM_CONCURRENCY = 8
+
+# Entradas mantidas no histórico do modo interativo
+READLINE_HISTORY_LENGTH = 1000
+
+# Limites (em caracteres) do contexto enviado ao modelo: por documento e no total,
+# dividido igualmente entre as coleções com resultados. Menos tokens de entrada
+# reduzem o custo e o tempo até o primeiro token da resposta
+CONTEXT_MAX_CHARS_PER_DOC = 1500
+CONTEXT_MAX_CHARS = 12000
+
+# Tempo (segundos) em que listagem e detalhes de ADRs são reaproveitados
+ADR_CACHE_TTL = 300.0
+
+# Cache semântico de respostas, persistido ao encerrar o processo
+SEMANTIC_CACHE_PATH = os.getenv(
+    "SEMANTIC_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "semantic_cache.pkl")
+)
+
+# Validade (segundos) das respostas do cache semântico: a base de conhecimento
+# pode mudar, então respostas antigas não são reaproveitadas indefinidamente
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "300"))
+
+# Cache de prompts exatos do LangChain (chave: prompt + modelo + parâmetros, incluindo temperatura)
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.sqlite3")
+)
+
+# Backend do cache de prompts exatos: "sqlite" (padrão), "memory" (apenas o processo
+# atual), "redis" (compartilhado entre processos, em REDIS_URL) ou "none"
+LLM_CACHE_BACKEND = os.getenv("IA_LLM_CACHE", "sqlite").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Só respostas geradas com temperatura até este valor (quase determinísticas) são reaproveitadas
+SEMANTIC_CACHE_MAX_TEMPERATURE = 0.2
+
+@lru_cache(maxsize=16)
+def _get_llm(model_name: str, max_tokens: int, temperature: float = 0.2) -> "ChatOpenAI":
+    """
+    Obtém o modelo de linguagem para a configuração informada, reaproveitando
+    a instância (e o pool de conexões HTTP) entre processadores e trocas de modelo.
+    
+    Args:
+        model_name: Nome do modelo da OpenAI.
+        max_tokens: Limite de tokens da resposta.
+        temperature: Temperatura de amostragem.
+        
+    Returns:
+        Instância compartilhada do modelo.
+    """
+    from langchain_openai import ChatOpenAI
+    
+    return ChatOpenAI(model=model_name, temperature=temperature, max_tokens=max_tokens)
+
+# Caches semânticos por arquivo: processadores com o mesmo arquivo compartilham
+# o cache, que é salvo uma única vez ao encerrar o processo
+_semantic_caches: Dict[str, SemanticCache] = {}
+_semantic_caches_lock = threading.Lock()
+
+def _get_semantic_cache(path: Optional[str], embed: Callable[[str], List[float]]) -> SemanticCache:
+    """
+    Obtém o cache semântico persistido em path, criando-o (e registrando seu
+    salvamento ao encerrar) apenas na primeira vez.
+    
+    Args:
+        path: Arquivo do cache; sem arquivo, o cache é exclusivo e não é salvo.
+        embed: Função de embedding das consultas (usada se o cache for criado aqui).
+        
+    Returns:
+        Cache semântico.
+    """
+    if not path:
+        return SemanticCache(embed, ttl=SEMANTIC_CACHE_TTL)
+    
+    with _semantic_caches_lock:
+        cache = _semantic_caches.get(path)
+        if cache is None:
+            cache = SemanticCache(embed, path=path, ttl=SEMANTIC_CACHE_TTL)
+            atexit.register(cache.save)
+            _semantic_caches[path] = cache
+        return cache
+
+# Padrões para detectar consultas de listagem de recursos
+_LISTING_RE = re.compile("|".join([
+    r"quais\s+(são\s+)?(os|as)?\s*adr",
+    r"listar?\s+(os|as)?\s*adr",
+    r"mostrar?\s+(os|as)?\s*adr",
+    r"exibir?\s+(os|as)?\s*adr",
+    r"quais\s+decisões\s+arquiteturais",
+    r"quais\s+documentos\s+temos",
+    r"listar?\s+documentos",
+    r"listar?\s+decisões",
+]), re.IGNORECASE)
+
+# Padrões para detectar consultas sobre ADRs específicos
+_ADR_QUERY_RE = re.compile("|".join([
+    r"adr[- ]?(\d+)",
+    r"adr[- ]?([a-zA-Z0-9_-]+)",
+    r"sobre\s+a\s+adr",
+    r"sobre\s+o\s+adr",
+    r"detalhes\s+(d[ao])?\s+adr",
+    r"explicar?\s+(a|o)?\s+adr",
+    r"conteúdo\s+(d[ao])?\s+adr",
+    r"informações\s+(d[ao])?\s+adr",
+    r"me\s+d[êe]\s+informações\s+sobre\s+a\s+adr",
+    r"quero\s+saber\s+sobre\s+a\s+adr",
+    r"fale\s+sobre\s+a\s+adr",
+]), re.IGNORECASE)
+
+# Primeiro título ("# ...") entre as 5 primeiras linhas de um documento, em uma
+# única varredura do mecanismo de regex (sem percorrer as linhas em Python)
+_TITLE_RE = re.compile(r"(?:[^\n]*\n){0,4}?# ([^\n]*)")
+
+# Menção a ADR em qualquer posição da consulta
+_ADR_MENTION_RE = re.compile("adr", re.IGNORECASE)
+
+# Rotas de process_query
+ROUTE_ADR_LISTING = "adr_listing"
+ROUTE_SPECIFIC_ADR = "specific_adr"
+ROUTE_GENERAL = "general"
+
+# Padrões para extrair o identificador de um recurso, em ordem de prioridade
+_RESOURCE_ID_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"adr[- ]?(\d+)",
+    r"adr[- ]?([a-zA-Z0-9_-]+)",
+    r"decisão[- ]?(\d+)",
+    r"decisao[- ]?(\d+)",
+))
+
+# Nomes de arquivo de ADR: prefixo "adr-"/"ADR-" ou numeração ("001-...")
+_ADR_FILENAME_RE = re.compile(r"adr-|ADR-|[0-9]")
+
+def _iter_headings(text: str, max_lines: int) -> Iterator[str]:
+    """
+    Percorre os títulos ("# ...") entre as primeiras linhas do texto, sem
+    dividir o documento inteiro em linhas.
+    
+    Args:
+        text: Conteúdo do documento.
+        max_lines: Número de linhas iniciais examinadas.
+        
+    Yields:
+        Linhas de título, com o prefixo "# ".
+    """
+    start = 0
+    for _ in range(max_lines):
+        end = text.find("\n", start)
+        line_end = len(text) if end == -1 else end
+        if text.startswith("# ", start, line_end):
+            yield text[start:line_end]
+        if end == -1:
+            return
+        start = end + 1
+
+@lru_cache(maxsize=256)
+def _find_resource_id(query: str) -> Optional[str]:
+    """
+    Extrai o identificador de recurso citado na consulta (em minúsculas). Memorizado:
+    a mesma consulta é analisada para o escopo do cache e novamente na rota de ADRs.
+    """
+    # Os padrões são testados em ordem de prioridade (não pela posição na consulta)
+    for pattern in _RESOURCE_ID_PATTERNS:
+        match = pattern.search(query)
+        if match:
+            return match.group(1).lower()
+    return None
+
+def _extract_title(text: str) -> str:
+    """Obtém o primeiro título ("# ...") entre as 5 primeiras linhas do documento, ou ""."""
+    match = _TITLE_RE.match(text)
+    return match.group(1).strip() if match else ""
+
+def _configure_llm_cache() -> bool:
+    """
+    Ativa, uma única vez por processo, o cache de prompts exatos do LangChain
+    no backend de LLM_CACHE_BACKEND: prompts repetidos não geram nova chamada à OpenAI.
+    
+    Returns:
+        True se o cache estiver ativo.
+    """
+    from langchain_core.globals import get_llm_cache, set_llm_cache
+    
+    if get_llm_cache() is not None:
+        return True
+    
+    backend = LLM_CACHE_BACKEND
+    if backend == "none":
+        return False
+    if backend == "memory":
+        from langchain_core.caches import InMemoryCache
+        set_llm_cache(InMemoryCache())
+        return True
+    
+    if not SQLITE_LLM_CACHE_AVAILABLE:
+        return False
+    if backend == "redis" and not REDIS_AVAILABLE:
+        print("Cache de LLM em Redis indisponível (pip install redis); usando SQLite.")
+        backend = "sqlite"
+    
+    if backend == "redis":
+        import redis
+        from langchain_community.cache import RedisCache
+        set_llm_cache(RedisCache(redis.Redis.from_url(REDIS_URL)))
+    else:
+        if backend != "sqlite":
+            print(f"Backend de cache de LLM desconhecido: {backend}; usando SQLite.")
+        from langchain_community.cache import SQLiteCache
+        set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+    return True
+
+def _llm_cache_entry(chain, inputs: Dict[str, Any]) -> Optional[Tuple[Any, str, str]]:
+    """
+    Localiza a entrada de uma chain (prompt | llm | parser) no cache de prompts
+    exatos, com a mesma chave usada pelo LangChain em invoke. O streaming
+    (stream/astream) não consulta nem preenche esse cache.
+    
+    Args:
+        chain: Chain cujo modelo gera a resposta.
+        inputs: Variáveis do prompt.
+        
+    Returns:
+        (cache, prompt, parâmetros do modelo), ou None sem cache ativo.
+    """
+    from langchain_core.globals import get_llm_cache
+    from langchain_core.load import dumps
+    
+    llm_cache = get_llm_cache()
+    steps = getattr(chain, "steps", ())
+    if llm_cache is None or len(steps) < 2 or not hasattr(steps[1], "_get_llm_string"):
+        return None
+    llm = steps[1]
+    if llm.cache is False:
+        return None
+    messages = steps[0].invoke(inputs).to_messages()
+    return llm_cache, dumps(messages), llm._get_llm_string()
+
+def _llm_cache_value(response: str) -> List[Any]:
+    """Gerações armazenadas no cache de prompts exatos para uma resposta transmitida."""
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration
+    
+    return [ChatGeneration(message=AIMessage(content=response))]
+
+# Templates de prompts. As instruções fixas ficam na mensagem de sistema, no
+# início do prompt, e o conteúdo variável vem depois, na mensagem do usuário:
+# o prefixo idêntico entre chamadas é reaproveitado pelo cache de prefixo da OpenAI
+QUERY_SYSTEM_PROMPT = """
 Você é uma assistente de IA especializada no projeto de e-commerce que utiliza arquitetura hexagonal, 
 Domain Driven Design (DDD), Kotlin e outras tecnologias modernas. Sua função é responder perguntas 
 sobre o projeto com base no conhecimento que você tem.
 
-Contexto relevante do projeto:
-{context}
-
-Pergunta do usuário: {query}
-
 Responda de forma clara, direta e técnica. Se o contexto fornecido não for suficiente para responder 
 à pergunta completamente, indique quais informações estão faltando e sugira como o usuário poderia 
 refinar sua pergunta.
+"""
 
-Resposta:
+QUERY_PROMPT_TEMPLATE = """
+Contexto relevante do projeto:
+{context}
+
+Pergunta do usuário: {query}
 """
 
 # Template específico para listagem de recursos
-LIST_RESOURCES_PROMPT_TEMPLATE = """
+LIST_RESOURCES_SYSTEM_PROMPT = """
 Você é uma assistente de IA especializada no projeto de e-commerce. Sua tarefa atual é apresentar uma lista
 concisa dos recursos solicitados pelo usuário.
 
-Recursos disponíveis:
-{resources}
-
-Pergunta do usuário: {query}
-
 Apresente uma lista organizada dos recursos disponíveis, incluindo seus identificadores e títulos.
 Explique brevemente que o usuário pode solicitar detalhes específicos sobre qualquer um desses recursos
 mencionando seu identificador ou título em uma nova pergunta.
+"""
 
-Resposta:
+LIST_RESOURCES_PROMPT_TEMPLATE = """
+Recursos disponíveis:
+{resources}
+
+Pergunta do usuário: {query}
 """
 
 # Template específico para consulta de ADR específica
-ADR_DETAIL_PROMPT_TEMPLATE = """
+ADR_DETAIL_SYSTEM_PROMPT = """
 Você é uma assistente de IA especializada no projeto de e-commerce. Sua tarefa atual é apresentar informações
 detalhadas sobre um Architecture Decision Record (ADR) específico.
 
-ADR solicitado:
-{adr_content}
-
-Pergunta do usuário: {query}
-
 Apresente as informações do ADR de forma clara e estruturada, destacando o contexto da decisão, a decisão em si,
 as consequências e alternativas consideradas. Certifique-se de incluir todos os detalhes importantes do ADR,
 sem omitir nenhuma seção relevante. Sua resposta deve ser completa e abrangente, fornecendo o máximo de detalhes possível.
 
 IMPORTANTE: Não corte sua resposta no meio de uma frase ou parágrafo. Certifique-se de que todas as seções
 do ADR sejam apresentadas integralmente, especialmente as seções de Contexto, Decisão, Consequências e Alternativas.
+"""
+
+# O conteúdo do ADR precede a pergunta: perguntas sobre o mesmo ADR compartilham o prefixo
+ADR_DETAIL_PROMPT_TEMPLATE = """
+ADR solicitado:
+{adr_content}
 
-Resposta:
+Pergunta do usuário: {query}
 """
 
+# Papéis das mensagens do LangChain na API de chat da OpenAI
+_CHAT_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
 class QueryProcessor:
     """Processador de consultas para a assistente de IA."""
     
-    def __init__(self, vector_db: Optional[VectorDatabase] = None, 
-                model_name: str = GPT_3_5_MODEL):
+    def __init__(self, vector_db: Optional["VectorDatabase"] = None, 
+                model_name: str = GPT_4O_MINI_MODEL):
         """
         Inicializa o processador de consultas.
         
@@ -92,14 +366,20 @@ class QueryProcessor:
             vector_db: Instância opcional da base de dados vetorial. Se não fornecida, uma nova será criada.
             model_name: Nome do modelo da OpenAI a ser utilizado.
         """
+        from ia_assistant.database.vector_db import get_vector_database, EMBEDDING_ERRORS
+        from langchain_core.prompts import ChatPromptTemplate
+        
         self.vector_db = vector_db if vector_db is not None else get_vector_database()
         self.model_name = model_name
         
+        # Respostas para prompts idênticos vêm do cache local
+        _configure_llm_cache()
+        
         # Inicializa o modelo de linguagem com configurações padrão
-        self.llm = OpenAI(model_name=model_name, temperature=0.2, max_tokens=500)
+        self.llm = _get_llm(model_name, 500)
         
         # Inicializa o modelo específico para ADRs com limite de tokens maior
-        self.adr_llm = OpenAI(model_name=model_name, temperature=0.2, max_tokens=2000)
+        self.adr_llm = _get_llm(model_name, 2000)
         
         # Inicializa os templates de prompt
         
@@ -109,25 +389,37 @@ class QueryProcessor:
         # Inicializa motor de sugestões proativas
         self._initialize_suggestion_engine()
         
-        self.prompt_template = PromptTemplate(
-            input_variables=["context", "query"],
-            template=QUERY_PROMPT_TEMPLATE
-        )
-        
-        self.list_resources_template = PromptTemplate(
-            input_variables=["resources", "query"],
-            template=LIST_RESOURCES_PROMPT_TEMPLATE
-        )
-        
-        self.adr_detail_template = PromptTemplate(
-            input_variables=["adr_content", "query"],
-            template=ADR_DETAIL_PROMPT_TEMPLATE
-        )
-        
-        # Inicializa as chains de processamento
-        self.chain = LLMChain(llm=self.llm, prompt=self.prompt_template)
-        self.list_resources_chain = LLMChain(llm=self.llm, prompt=self.list_resources_template)
-        self.adr_detail_chain = LLMChain(llm=self.adr_llm, prompt=self.adr_detail_template)
+        self.prompt_template = ChatPromptTemplate.from_messages([
+            ("system", QUERY_SYSTEM_PROMPT),
+            ("human", QUERY_PROMPT_TEMPLATE)
+        ])
+        
+        self.list_resources_template = ChatPromptTemplate.from_messages([
+            ("system", LIST_RESOURCES_SYSTEM_PROMPT),
+            ("human", LIST_RESOURCES_PROMPT_TEMPLATE)
+        ])
+        
+        self.adr_detail_template = ChatPromptTemplate.from_messages([
+            ("system", ADR_DETAIL_SYSTEM_PROMPT),
+            ("human", ADR_DETAIL_PROMPT_TEMPLATE)
+        ])
+        
+        # Inicializa as chains de processamento (reaproveitadas nas trocas de modelo)
+        self._chains_by_model: Dict[str, Tuple[Any, Any, Any]] = {}
+        self.chain, self.list_resources_chain, self.adr_detail_chain = self._get_chains(model_name)
+        
+        # Resultados das consultas de ADRs: chave -> (instante, versão da base, resultado)
+        self._adr_cache: Dict[Tuple, Tuple[float, Any, Any]] = {}
+        
+        # Cache semântico: consultas reformuladas reaproveitam a resposta anterior.
+        # O embedding vem da própria base vetorial (no ChromaDB, a função de
+        # embedding das coleções, sem chamada adicional à OpenAI)
+        self.semantic_cache = _get_semantic_cache(SEMANTIC_CACHE_PATH, self.vector_db.embed_query)
+        self._embedding_errors = EMBEDDING_ERRORS
+        
+        # Versão da base vetorial (atributo version, se existir) das respostas em
+        # cache; uma escrita na base descarta as respostas guardadas
+        self._semantic_cache_version = getattr(self.vector_db, "version", None)
     
     def _is_listing_query(self, query: str) -> bool:
         """
@@ -139,27 +431,7 @@ class QueryProcessor:
         Returns:
             True se for uma consulta de listagem, False caso contrário.
         """
-        # Padrões para detectar consultas de listagem
-        listing_patterns = [
-            r"quais\s+(são\s+)?(os|as)?\s*adr",
-            r"listar?\s+(os|as)?\s*adr",
-            r"mostrar?\s+(os|as)?\s*adr",
-            r"exibir?\s+(os|as)?\s*adr",
-            r"quais\s+decisões\s+arquiteturais",
-            r"quais\s+documentos\s+temos",
-            r"listar?\s+documentos",
-            r"listar?\s+decisões",
-        ]
-        
-        # Converte a consulta para minúsculas para comparação case-insensitive
-        query_lower = query.lower()
-        
-        # Verifica se a consulta corresponde a algum dos padrões
-        for pattern in listing_patterns:
-            if re.search(pattern, query_lower):
-                return True
-        
-        return False
+        return _LISTING_RE.search(query) is not None
     
     def _is_specific_adr_query(self, query: str) -> bool:
         """
@@ -171,30 +443,24 @@ class QueryProcessor:
         Returns:
             True se for uma consulta sobre um ADR específico, False caso contrário.
         """
-        # Padrões para detectar consultas sobre ADRs específicos
-        adr_patterns = [
-            r"adr[- ]?(\d+)",
-            r"adr[- ]?([a-zA-Z0-9_-]+)",
-            r"sobre\s+a\s+adr",
-            r"sobre\s+o\s+adr",
-            r"detalhes\s+(d[ao])?\s+adr",
-            r"explicar?\s+(a|o)?\s+adr",
-            r"conteúdo\s+(d[ao])?\s+adr",
-            r"informações\s+(d[ao])?\s+adr",
-            r"me\s+d[êe]\s+informações\s+sobre\s+a\s+adr",
-            r"quero\s+saber\s+sobre\s+a\s+adr",
-            r"fale\s+sobre\s+a\s+adr",
-        ]
-        
-        # Converte a consulta para minúsculas para comparação case-insensitive
-        query_lower = query.lower()
-        
-        # Verifica se a consulta corresponde a algum dos padrões
-        for pattern in adr_patterns:
-            if re.search(pattern, query_lower):
-                return True
+        return _ADR_QUERY_RE.search(query) is not None
+    
+    def _classify_query(self, query: str) -> str:
+        """
+        Define a rota da consulta. Os padrões são verificados em ordem de
+        prioridade (listagem antes de ADR específico), parando no primeiro acerto.
         
-        return False
+        Args:
+            query: Texto da consulta.
+            
+        Returns:
+            ROUTE_ADR_LISTING, ROUTE_SPECIFIC_ADR ou ROUTE_GENERAL.
+        """
+        if _LISTING_RE.search(query) and _ADR_MENTION_RE.search(query):
+            return ROUTE_ADR_LISTING
+        if _ADR_QUERY_RE.search(query):
+            return ROUTE_SPECIFIC_ADR
+        return ROUTE_GENERAL
     
     def _get_resource_type_from_query(self, query: str) -> str:
         """
@@ -227,22 +493,7 @@ class QueryProcessor:
         Returns:
             Identificador do recurso ou None se não for encontrado.
         """
-        # Padrões para detectar referências a recursos específicos
-        patterns = [
-            r"adr[- ]?(\d+)",
-            r"adr[- ]?([a-zA-Z0-9_-]+)",
-            r"decisão[- ]?(\d+)",
-            r"decisao[- ]?(\d+)",
-        ]
-        
-        query_lower = query.lower()
-        
-        for pattern in patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                return match.group(1)
-        
-        return None
+        return _find_resource_id(query)
     
     def _format_adr_listing(self, adrs: List[Dict[str, str]]) -> str:
         """
@@ -277,9 +528,43 @@ class QueryProcessor:
         
         return "\n".join(lines)
     
+    def _cached_adr_lookup(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Reaproveita o resultado de uma consulta de ADRs por ADR_CACHE_TTL segundos,
+        ou até a base vetorial registrar uma escrita (atributo version, se existir).
+        
+        Args:
+            key: Identificador da consulta.
+            compute: Função que executa a consulta na base vetorial.
+            
+        Returns:
+            Resultado em cache ou recém-calculado.
+        """
+        version = getattr(self.vector_db, "version", None)
+        cached = self._adr_cache.get(key)
+        if cached is not None and cached[1] == version and time.monotonic() - cached[0] < ADR_CACHE_TTL:
+            return cached[2]
+        
+        result = compute()
+        self._adr_cache[key] = (time.monotonic(), version, result)
+        return result
+    
+    def invalidate_adr_cache(self) -> None:
+        """Descarta as consultas de ADRs em cache (ex.: após ingerir novos documentos)."""
+        self._adr_cache.clear()
+    
     def _get_adr_listing(self) -> List[Dict[str, str]]:
         """
-        Obtém uma listagem de ADRs do projeto.
+        Obtém uma listagem de ADRs do projeto (reaproveitada por ADR_CACHE_TTL segundos).
+        
+        Returns:
+            Lista de dicionários com informações sobre os ADRs.
+        """
+        return self._cached_adr_lookup(("listing",), self._query_adr_listing)
+    
+    def _query_adr_listing(self) -> List[Dict[str, str]]:
+        """
+        Consulta a base vetorial para montar a listagem de ADRs do projeto.
         
         Returns:
             Lista de dicionários com informações sobre os ADRs.
@@ -295,11 +580,11 @@ class QueryProcessor:
             n_results=15  # Aumentamos para pegar mais ADRs
         )
         
-        # Lista para armazenar os ADRs encontrados
-        adrs = []
+        # ADRs encontrados, um por arquivo (chunks do mesmo arquivo são agrupados)
+        adrs_by_source: Dict[str, Dict[str, str]] = {}
         
-        # Conjunto para rastrear ADRs já processados (evitar duplicatas)
-        processed_adrs = set()
+        # Arquivos cuja entrada ainda usa o título genérico
+        untitled_sources = set()
         
         if "documents" in results and results["documents"]:
             for i, doc in enumerate(results["documents"][0]):
@@ -311,49 +596,43 @@ class QueryProcessor:
                 # Extrai informações do documento
                 source = metadata.get("source", "")
                 
-                # Verifica se é um ADR pelo caminho do arquivo
-                is_adr = False
-                if "/docs/adrs/" in source.lower():
-                    is_adr = True
+                # Se não for um ADR pelo caminho do arquivo, ignora
+                if "/docs/adrs/" not in source.lower():
+                    continue
                 
-                # Se não for um ADR pelo caminho, ignora
-                if not is_adr:
+                # Arquivo já listado com título: os demais chunks são ignorados
+                if source in adrs_by_source and source not in untitled_sources:
                     continue
                 
-                # Extrai o ID e título do ADR
-                adr_id = ""
-                title = ""
+                # Tenta extrair o título do conteúdo
+                title = _extract_title(doc)
                 
-                # Tenta extrair do nome do arquivo
+                if source in adrs_by_source:
+                    # Outro chunk do mesmo arquivo traz o título que faltava
+                    if title:
+                        adrs_by_source[source].update(title=title, content=doc)
+                        untitled_sources.discard(source)
+                    continue
+                
+                # Extrai o ID do nome do arquivo
+                adr_id = ""
                 filename = os.path.basename(source)
-                if filename.startswith(("adr-", "ADR-", "0", "1", "2", "3", "4", "5", "6", "7", "8", "9")):
+                if _ADR_FILENAME_RE.match(filename):
                     adr_id = os.path.splitext(filename)[0]
                 
-                # Tenta extrair o título do conteúdo
-                lines = doc.split("\n")
-                for line in lines[:5]:
-                    if line.startswith("# "):
-                        title = line[2:].strip()
-                        break
-                
                 # Se não encontrou título, usa um genérico
                 if not title:
                     title = f"ADR {adr_id}"
+                    untitled_sources.add(source)
                 
-                # Cria um identificador único para evitar duplicatas
-                unique_id = f"{adr_id}_{title}"
-                
-                # Adiciona à lista se ainda não foi processado
-                if unique_id not in processed_adrs:
-                    adrs.append({
-                        "id": adr_id,
-                        "title": title,
-                        "source": source,
-                        "content": doc
-                    })
-                    processed_adrs.add(unique_id)
+                adrs_by_source[source] = {
+                    "id": adr_id,
+                    "title": title,
+                    "source": source,
+                    "content": doc
+                }
         
-        return adrs
+        return list(adrs_by_source.values())
     
     def _extract_essential_adr_content(self, content: str) -> str:
         """
@@ -439,7 +718,19 @@ class QueryProcessor:
     
     def _get_specific_adr(self, adr_id: str) -> Optional[Dict[str, str]]:
         """
-        Obtém informações sobre um ADR específico.
+        Obtém informações sobre um ADR específico (reaproveitadas por ADR_CACHE_TTL segundos).
+        
+        Args:
+            adr_id: Identificador do ADR.
+            
+        Returns:
+            Dicionário com informações sobre o ADR ou None se não for encontrado.
+        """
+        return self._cached_adr_lookup(("adr", adr_id), lambda: self._query_specific_adr(adr_id))
+    
+    def _query_specific_adr(self, adr_id: str) -> Optional[Dict[str, str]]:
+        """
+        Consulta a base vetorial em busca de um ADR específico.
         
         Args:
             adr_id: Identificador do ADR.
@@ -463,103 +754,62 @@ class QueryProcessor:
             return None
         
         # Procura pelo ADR específico
-        for i, doc in enumerate(results["documents"][0]):
-            # Verifica se há metadados disponíveis
-            metadata = {}
-            if "metadatas" in results and results["metadatas"][0] and i < len(results["metadatas"][0]):
-                metadata = results["metadatas"][0][i]
-            
-            # Extrai informações do documento
-            source = metadata.get("source", "")
+        adr = self._find_adr_in_results(results, adr_id)
+        if adr is not None:
+            return adr
+        
+        # Se não encontrou o ADR específico, tenta uma busca mais ampla
+        # Consulta todas as coleções
+        all_results = self.vector_db.query_all_collections(query_text, n_results_per_collection=10)
+        
+        for collection_name, results in all_results.items():
+            if "error" in results:
+                continue
             
-            # Verifica se é o ADR correto pelo caminho ou conteúdo
-            is_target_adr = False
+            adr = self._find_adr_in_results(results, adr_id)
+            if adr is not None:
+                return adr
+        
+        return None
+    
+    def _find_adr_in_results(self, results: Dict[str, Any], adr_id: str) -> Optional[Dict[str, str]]:
+        """
+        Procura um ADR entre os documentos de um resultado de consulta, pelo
+        caminho do arquivo ou pelos títulos das primeiras linhas.
+        
+        Args:
+            results: Resultado de uma consulta à base vetorial.
+            adr_id: Identificador do ADR.
             
-            # Verifica pelo caminho
-            if "/docs/adrs/" in source.lower() and adr_id.lower() in source.lower():
-                is_target_adr = True
+        Returns:
+            Dicionário com informações sobre o ADR ou None se não for encontrado.
+        """
+        if "documents" not in results or not results["documents"]:
+            return None
+        
+        adr_id_lower = adr_id.lower()
+        metadatas = results["metadatas"][0] if "metadatas" in results and results["metadatas"][0] else []
+        
+        for i, doc in enumerate(results["documents"][0]):
+            metadata = metadatas[i] if i < len(metadatas) else {}
+            source = metadata.get("source", "")
+            source_lower = source.lower()
             
-            # Verifica pelo conteúdo
-            if not is_target_adr:
-                lines = doc.split("\n")
-                for line in lines[:10]:
-                    if line.startswith("# ") and adr_id.lower() in line.lower():
-                        is_target_adr = True
-                        break
+            # Verifica se é o ADR correto pelo caminho ou pelo conteúdo
+            is_target_adr = (
+                ("/docs/adrs/" in source_lower and adr_id_lower in source_lower)
+                or any(adr_id_lower in line.lower() for line in _iter_headings(doc, 10))
+            )
             
-            # Se for o ADR correto, extrai as informações
+            # Se for o ADR correto, extrai o título e o conteúdo essencial
             if is_target_adr:
-                # Extrai o título
-                title = ""
-                lines = doc.split("\n")
-                for line in lines[:5]:
-                    if line.startswith("# "):
-                        title = line[2:].strip()
-                        break
-                
-                # Extrai o conteúdo essencial
-                essential_content = self._extract_essential_adr_content(doc)
-                
                 return {
                     "id": adr_id,
-                    "title": title,
+                    "title": _extract_title(doc),
                     "source": source,
-                    "content": essential_content
+                    "content": self._extract_essential_adr_content(doc)
                 }
         
-        # Se não encontrou o ADR específico, tenta uma busca mais ampla
-        # Consulta todas as coleções
-        all_results = self.vector_db.query_all_collections(query_text, n_results=10)
-        
-        for collection_name, results in all_results.items():
-            if "error" in results:
-                continue
-                
-            if "documents" in results and results["documents"]:
-                for i, doc in enumerate(results["documents"][0]):
-                    # Verifica se há metadados disponíveis
-                    metadata = {}
-                    if "metadatas" in results and results["metadatas"][0] and i < len(results["metadatas"][0]):
-                        metadata = results["metadatas"][0][i]
-                    
-                    # Extrai informações do documento
-                    source = metadata.get("source", "")
-                    
-                    # Verifica se é o ADR correto pelo caminho ou conteúdo
-                    is_target_adr = False
-                    
-                    # Verifica pelo caminho
-                    if "/docs/adrs/" in source.lower() and adr_id.lower() in source.lower():
-                        is_target_adr = True
-                    
-                    # Verifica pelo conteúdo
-                    if not is_target_adr:
-                        lines = doc.split("\n")
-                        for line in lines[:10]:
-                            if line.startswith("# ") and adr_id.lower() in line.lower():
-                                is_target_adr = True
-                                break
-                    
-                    # Se for o ADR correto, extrai as informações
-                    if is_target_adr:
-                        # Extrai o título
-                        title = ""
-                        lines = doc.split("\n")
-                        for line in lines[:5]:
-                            if line.startswith("# "):
-                                title = line[2:].strip()
-                                break
-                        
-                        # Extrai o conteúdo essencial
-                        essential_content = self._extract_essential_adr_content(doc)
-                        
-                        return {
-                            "id": adr_id,
-                            "title": title,
-                            "source": source,
-                            "content": essential_content
-                        }
-        
         return None
     
     def _get_relevant_context(self, query: str, n_results: int = 5) -> str:
@@ -587,27 +837,33 @@ class QueryProcessor:
             # Consulta normal para todas as coleções
             all_results = self.vector_db.query_all_collections(query, n_results)
         
-        # Formata os resultados em um contexto
+        # Formata os resultados em um contexto (um único texto por documento)
         context_parts = []
         
-        for collection_name, results in all_results.items():
-            if "error" in results:
-                continue
-                
-            if "documents" in results and results["documents"]:
-                context_parts.append(f"\n--- Informações de {collection_name} ---\n")
-                
-                for i, doc in enumerate(results["documents"][0]):
-                    # Adiciona metadados relevantes
-                    if "metadatas" in results and results["metadatas"][0]:
-                        metadata = results["metadatas"][0][i]
-                        if "source" in metadata:
-                            context_parts.append(f"Fonte: {metadata['source']}")
-                        if "document_type" in metadata:
-                            context_parts.append(f"Tipo: {metadata['document_type']}")
-                    
-                    # Adiciona o conteúdo do documento
-                    context_parts.append(f"Conteúdo: {doc}\n")
+        found = [
+            (collection_name, results) for collection_name, results in all_results.items()
+            if "error" not in results and results.get("documents")
+        ]
+        collection_budget = CONTEXT_MAX_CHARS // max(1, len(found))
+        
+        for collection_name, results in found:
+            docs = results["documents"][0]
+            metadatas = results.get("metadatas")
+            metas = metadatas[0] if metadatas and metadatas[0] else None
+            
+            context_parts.append(f"\n--- Informações de {collection_name} ---\n")
+            
+            # Documentos em ordem de relevância, truncados até esgotar o limite da coleção
+            entries = zip(docs, metas) if metas is not None else ((doc, None) for doc in docs)
+            remaining = collection_budget
+            for doc, metadata in entries:
+                if remaining <= 0:
+                    break
+                doc = doc[:min(CONTEXT_MAX_CHARS_PER_DOC, remaining)]
+                remaining -= len(doc)
+                context_parts.append(
+                    f"Conteúdo: {doc}\n" if metadata is None else self._format_context_entry(doc, metadata)
+                )
         
         # Se não houver resultados, retorna uma mensagem
         if not context_parts:
@@ -615,31 +871,86 @@ class QueryProcessor:
         
         return "\n".join(context_parts)
     
-    def process_query(self, query: str) -> str:
+    @staticmethod
+    def _format_context_entry(doc: str, metadata: Dict[str, Any]) -> str:
         """
-        Processa uma consulta e retorna uma resposta contextualizada.
+        Formata um documento do contexto com seus metadados relevantes.
+        
+        Args:
+            doc: Conteúdo do documento.
+            metadata: Metadados do documento.
+            
+        Returns:
+            Texto do documento para o contexto.
+        """
+        # Uma única consulta ao dicionário por campo (o ChromaDB não armazena valores None)
+        header = ""
+        source = metadata.get("source")
+        if source is not None:
+            header = f"Fonte: {source}\n"
+        document_type = metadata.get("document_type")
+        if document_type is not None:
+            header += f"Tipo: {document_type}\n"
+        
+        return f"{header}Conteúdo: {doc}\n"
+    
+    def _run_chain(self, chain, inputs: Dict[str, Any],
+                   on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Executa uma chain, transmitindo os trechos da resposta conforme chegam.
+        
+        Args:
+            chain: Chain (prompt | llm | parser) a ser executada.
+            inputs: Variáveis do prompt.
+            on_token: Função opcional chamada com cada trecho gerado.
+            
+        Returns:
+            Resposta completa.
+        """
+        if on_token is None:
+            return chain.invoke(inputs)
+        
+        # Resposta já no cache de prompts exatos: invoke a obtém sem chamar a OpenAI
+        entry = _llm_cache_entry(chain, inputs)
+        if entry is not None and entry[0].lookup(entry[1], entry[2]) is not None:
+            response = chain.invoke(inputs)
+            on_token(response)
+            return response
+        
+        parts = []
+        for chunk in chain.stream(inputs):
+            on_token(chunk)
+            parts.append(chunk)
+        response = "".join(parts)
+        if entry is not None:
+            entry[0].update(entry[1], entry[2], _llm_cache_value(response))
+        return response
+    
+    def _prepare_query(self, query: str) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Identifica o tipo da consulta e obtém o conteúdo necessário para respondê-la.
         
         Args:
             query: Texto da consulta.
             
         Returns:
-            Resposta contextualizada.
+            Chain e variáveis do prompt.
         """
+        route = self._classify_query(query)
+        
         # Verifica se é uma consulta de listagem de ADRs
-        if self._is_listing_query(query) and "adr" in query.lower():
+        if route == ROUTE_ADR_LISTING:
             # Obtém a listagem de ADRs
             adrs = self._get_adr_listing()
             
             # Formata a listagem
             resources_list = self._format_adr_listing(adrs)
             
-            # Executa a chain de processamento para listagem
-            response = self.list_resources_chain.run(resources=resources_list, query=query)
-            
-            return response
+            # Chain de processamento para listagem
+            return self.list_resources_chain, {"resources": resources_list, "query": query}
         
         # Verifica se é uma consulta sobre um ADR específico
-        elif self._is_specific_adr_query(query):
+        elif route == ROUTE_SPECIFIC_ADR:
             # Tenta extrair o ID do ADR da consulta
             adr_id = self._get_specific_resource_id(query)
             
@@ -651,7 +962,8 @@ class QueryProcessor:
                 # Procura por correspondências no título
                 query_lower = query.lower()
                 for adr in adrs:
-                    if adr["title"].lower() in query_lower or query_lower in adr["title"].lower():
+                    title_lower = adr["title"].lower()
+                    if title_lower in query_lower or query_lower in title_lower:
                         adr_id = adr["id"]
                         break
                 
@@ -664,119 +976,207 @@ class QueryProcessor:
                 adr = self._get_specific_adr(adr_id)
                 
                 if adr:
-                    # Executa a chain de processamento para detalhes do ADR
-                    # Usa o modelo com limite de tokens maior
-                    response = self.adr_detail_chain.run(adr_content=adr["content"], query=query)
-                    return response
+                    # Chain de detalhes do ADR, com o modelo de limite de tokens maior
+                    return self.adr_detail_chain, {"adr_content": adr["content"], "query": query}
             
             # Se não encontrou o ADR específico, usa a abordagem padrão
             context = self._get_relevant_context(query, n_results=2)  # Reduz para evitar excesso de tokens
-            response = self.chain.run(context=context, query=query)
-            return response
+            return self.chain, {"context": context, "query": query}
         
-        # Consulta normal
-        else:
-            return self._process_optimized_query(query)
+        # Consulta normal, com o contexto das coleções
+        context = self._get_relevant_context(query)
+        return self.chain, {"context": context, "query": query}
     
-    def _process_optimized_query(self, query: str) -> str:
+    def process_query(self, query: str, on_token: Optional[Callable[[str], None]] = None) -> str:
         """
-        Processa consulta com otimização de prompts e cache inteligente.
+        Processa uma consulta e retorna uma resposta contextualizada.
         
         Args:
-            query: Consulta do usuário
+            query: Texto da consulta.
+            on_token: Função opcional chamada com cada trecho da resposta assim
+                que gerado pelo modelo (respostas em cache não são transmitidas).
             
         Returns:
-            Resposta otimizada
+            Resposta contextualizada.
+        """
+        scope = self._semantic_cache_scope(query)
+        cached = self._get_cached_response(query, scope)
+        if cached is not None:
+            return cached
+        
+        chain, inputs = self._prepare_query(query)
+        response = self._run_chain(chain, inputs, on_token)
+        self._cache_response(query, scope, chain, response)
+        return response
+    
+    async def aprocess_query(self, query: str) -> str:
         """
-        import time
+        Versão assíncrona de process_query. A busca na base vetorial roda em
+        thread separada e a chamada ao modelo é assíncrona, liberando o event
+        loop para outras consultas enquanto aguarda a OpenAI.
         
-        start_time = time.time()
+        Args:
+            query: Texto da consulta.
+            
+        Returns:
+            Resposta contextualizada.
+        """
+        scope = self._semantic_cache_scope(query)
+        cached = await asyncio.to_thread(self._get_cached_response, query, scope)
+        if cached is not None:
+            return cached
+        
+        chain, inputs = await asyncio.to_thread(self._prepare_query, query)
+        response = await chain.ainvoke(inputs)
+        await asyncio.to_thread(self._cache_response, query, scope, chain, response)
+        return response
+    
+    def _semantic_cache_scope(self, query: str) -> Tuple:
+        """
+        Escopo das respostas no cache semântico: consultas semelhantes só
+        compartilham a resposta se citam o mesmo recurso e usam o mesmo modelo.
+        A versão da base vetorial não entra no escopo, pois é um contador do
+        processo e o cache é persistido; escritas na base são tratadas por
+        _check_semantic_cache_version e respostas salvas expiram pelo TTL.
         
-        try:
-            # Detecta tipo de consulta
-            query_type = prompt_optimizer.detect_query_type(query)
-            
-            # Otimiza prompt
-            prompt_data = prompt_optimizer.optimize_prompt(query, query_type)
-            
-            # Tenta obter do cache primeiro
-            cache_result = intelligent_cache.get(
-                query=query,
-                query_type=query_type.value,
-                prompt_template=prompt_data['system_prompt'],
-                strategy=CacheStrategy.ADAPTIVE
-            )
+        Args:
+            query: Texto da consulta.
             
-            cache_hit = cache_result is not None
+        Returns:
+            Tupla (modelo, ID do recurso citado).
+        """
+        return (self.model_name, self._get_specific_resource_id(query))
+    
+    def _check_semantic_cache_version(self) -> None:
+        """Descarta as respostas do cache semântico se a base vetorial mudou desde a última consulta."""
+        version = getattr(self.vector_db, "version", None)
+        if version != self._semantic_cache_version:
+            self._semantic_cache_version = version
+            self.semantic_cache.clear()
+    
+    def _get_cached_response(self, query: str, scope: Tuple) -> Optional[str]:
+        """
+        Busca no cache semântico a resposta de uma consulta equivalente.
+        
+        Args:
+            query: Texto da consulta.
+            scope: Escopo da consulta (ver _semantic_cache_scope); só casa com o mesmo escopo.
             
-            if cache_result:
-                response, cache_metadata = cache_result
-                logger.info(f"Cache hit: {cache_metadata['cache_type']} - Tokens saved: {cache_metadata['tokens_saved']}")
-                
-                # Registra consulta para análise proativa
-                if suggestion_engine:
-                    response_time = (time.time() - start_time) * 1000  # ms
-                    suggestion_engine.record_query(
-                        query=query,
-                        response_time=response_time,
-                        cache_hit=True,
-                        query_type=query_type.value,
-                        tokens_used=cache_metadata.get('tokens_saved', 0)
-                    )
-                
-                return response
+        Returns:
+            Resposta armazenada ou None.
+        """
+        self._check_semantic_cache_version()
+        try:
+            return self.semantic_cache.get(query, scope)
+        except self._embedding_errors as e:
+            print(f"Cache semântico indisponível: {e}")
+            return None
+    
+    def _cache_response(self, query: str, scope: Tuple, chain, response: str) -> None:
+        """
+        Armazena a resposta no cache semântico se o modelo da chain for (quase) determinístico.
+        
+        Args:
+            query: Texto da consulta.
+            scope: Escopo da consulta.
+            chain: Chain (prompt | llm | parser) que gerou a resposta.
+            response: Resposta gerada.
+        """
+        temperature = next(
+            (step.temperature for step in getattr(chain, "steps", ()) if hasattr(step, "temperature")), None
+        )
+        if temperature is None or temperature > SEMANTIC_CACHE_MAX_TEMPERATURE:
+            return
+        self._check_semantic_cache_version()
+        try:
+            self.semantic_cache.put(query, response, scope)
+        except self._embedding_errors as e:
+            print(f"Cache semântico indisponível: {e}")
+    
+    async def astream_response(self, query: str) -> AsyncIterator[str]:
+        """
+        Versão de aprocess_query que entrega a resposta em trechos, à medida
+        que o modelo os gera. Respostas do cache semântico e do cache de prompts
+        exatos chegam em um único trecho.
+        
+        Args:
+            query: Texto da consulta.
             
-            # Se não encontrou no cache, processa normalmente
-            logger.info("Cache miss - processando consulta...")
+        Yields:
+            Trechos da resposta.
+        """
+        scope = self._semantic_cache_scope(query)
+        cached = await asyncio.to_thread(self._get_cached_response, query, scope)
+        if cached is not None:
+            yield cached
+            return
+        
+        chain, inputs = await asyncio.to_thread(self._prepare_query, query)
+        
+        # Resposta já no cache de prompts exatos: ainvoke a obtém sem chamar a OpenAI
+        entry = _llm_cache_entry(chain, inputs)
+        if entry is not None and await entry[0].alookup(entry[1], entry[2]) is not None:
+            response = await chain.ainvoke(inputs)
+            yield response
+            await asyncio.to_thread(self._cache_response, query, scope, chain, response)
+            return
+        
+        parts = []
+        async for chunk in chain.astream(inputs):
+            parts.append(chunk)
+            yield chunk
+        response = "".join(parts)
+        if entry is not None:
+            await entry[0].aupdate(entry[1], entry[2], _llm_cache_value(response))
+        await asyncio.to_thread(self._cache_response, query, scope, chain, response)
+    
+    async def batch_process(self, queries: List[str],
+                            max_concurrency: int = LLM_CONCURRENCY) -> List[Union[str, Exception]]:
+        """
+        Processa várias consultas concorrentemente: enquanto uma aguarda o
+        modelo, as seguintes já buscam seu contexto na base vetorial.
+        
+        Args:
+            queries: Consultas a serem processadas.
+            max_concurrency: Máximo de consultas em andamento (limite de taxa da OpenAI).
             
-            # Cria o modelo com parâmetros otimizados
-            optimized_llm = OpenAI(
-                model_name=self.model_name,
-                temperature=prompt_data['temperature'],
-                max_tokens=prompt_data['max_tokens']
-            )
+        Returns:
+            Respostas na mesma ordem das consultas; uma consulta que falhou traz
+            a exceção no lugar da resposta (as demais seguem até o fim).
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def process(query: str) -> str:
+            async with semaphore:
+                return await self.aprocess_query(query)
+        
+        return await asyncio.gather(*(process(query) for query in queries), return_exceptions=True)
+    
+    def _get_chains(self, model_name: str) -> Tuple[Any, Any, Any]:
+        """
+        Obtém as chains de consulta, listagem e detalhes de ADR para um modelo,
+        montando-as apenas na primeira vez.
+        
+        Args:
+            model_name: Nome do modelo da OpenAI.
             
-            # Cria as mensagens
-            messages = [
-                SystemMessage(content=prompt_data['system_prompt']),
-                HumanMessage(content=prompt_data['user_prompt'])
-            ]
+        Returns:
+            Tupla (chain, list_resources_chain, adr_detail_chain).
+        """
+        chains = self._chains_by_model.get(model_name)
+        if chains is None:
+            from langchain_core.output_parsers import StrOutputParser
             
-            # Executa a consulta
-            response = optimized_llm.invoke(messages)
-            
-            # Estima tokens e custo (aproximação)
-            estimated_tokens = len(response.content.split()) * 1.3  # Aproximação
-            estimated_cost = estimated_tokens * 0.000002  # Custo aproximado por token
-            
-            # Armazena no cache
-            intelligent_cache.put(
-                query=query,
-                response=response.content,
-                query_type=query_type.value,
-                prompt_template=prompt_data['system_prompt'],
-                tokens_used=int(estimated_tokens),
-                cost_estimate=estimated_cost
+            llm = _get_llm(model_name, 500)
+            adr_llm = _get_llm(model_name, 2000)
+            # O modelo de chat devolve mensagens; as chains entregam apenas o texto
+            chains = (
+                self.prompt_template | llm | StrOutputParser(),
+                self.list_resources_template | llm | StrOutputParser(),
+                self.adr_detail_template | adr_llm | StrOutputParser()
             )
-            
-            # Registra consulta para análise proativa
-            if suggestion_engine:
-                response_time = (time.time() - start_time) * 1000  # ms
-                suggestion_engine.record_query(
-                    query=query,
-                    response_time=response_time,
-                    cache_hit=False,
-                    query_type=query_type.value,
-                    tokens_used=int(estimated_tokens)
-                )
-            
-            return response.content
-            
-        except Exception as e:
-            # Fallback para o método original em caso de erro
-            context = self._get_relevant_context(query)
-            response = self.chain.run(context=context, query=query)
-            return response
+            self._chains_by_model[model_name] = chains
+        return chains
     
     def switch_model(self, model_name: str) -> None:
         """
@@ -785,22 +1185,132 @@ class QueryProcessor:
         Args:
             model_name: Nome do modelo a ser utilizado.
         """
-        if model_name not in [GPT_3_5_MODEL, GPT_4_MODEL]:
+        if model_name not in [GPT_4O_MINI_MODEL, GPT_4_MODEL]:
             raise ValueError(f"Modelo não suportado: {model_name}")
         
         self.model_name = model_name
         
         # Atualiza os modelos com os mesmos parâmetros
-        self.llm = OpenAI(model_name=model_name, temperature=0.2, max_tokens=500)
-        self.adr_llm = OpenAI(model_name=model_name, temperature=0.2, max_tokens=2000)
+        self.llm = _get_llm(model_name, 500)
+        self.adr_llm = _get_llm(model_name, 2000)
         
-        # Atualiza as chains
-        self.chain = LLMChain(llm=self.llm, prompt=self.prompt_template)
-        self.list_resources_chain = LLMChain(llm=self.llm, prompt=self.list_resources_template)
-        self.adr_detail_chain = LLMChain(llm=self.adr_llm, prompt=self.adr_detail_template)
+        # Atualiza as chains (montadas uma única vez por modelo)
+        self.chain, self.list_resources_chain, self.adr_detail_chain = self._get_chains(model_name)
         
         print(f"Modelo alterado para: {model_name}")
     
+    def process_queries_batch(self, queries: List[str],
+                              poll_interval: float = BATCH_POLL_INTERVAL,
+                              timeout: float = BATCH_TIMEOUT) -> List[str]:
+        """
+        Processa várias consultas pela Batch API da OpenAI (custo reduzido,
+        conclusão em até 24h). Usado no modo não interativo. Consultas com
+        resposta no cache semântico ou no cache de prompts exatos e consultas
+        sobre ADRs são respondidas antes, sem entrar no lote; as respostas do
+        lote preenchem os dois caches.
+        
+        Args:
+            queries: Consultas a serem processadas.
+            poll_interval: Intervalo entre verificações do status do lote.
+            timeout: Tempo máximo de espera pelo lote; esgotado, o lote é
+                cancelado e as consultas restantes seguem pelo caminho síncrono.
+            
+        Returns:
+            Respostas na mesma ordem das consultas.
+        """
+        answers: List[Optional[str]] = [None] * len(queries)
+        
+        # Consultas ainda sem resposta: (posição, consulta, escopo, chain, variáveis, entrada no cache)
+        pending = []
+        for index, query in enumerate(queries):
+            scope = self._semantic_cache_scope(query)
+            cached = self._get_cached_response(query, scope)
+            if cached is not None:
+                answers[index] = cached
+                continue
+            
+            chain, inputs = self._prepare_query(query)
+            entry = _llm_cache_entry(chain, inputs)
+            if chain is not self.chain or (entry is not None and entry[0].lookup(entry[1], entry[2]) is not None):
+                answers[index] = self._run_chain(chain, inputs)
+                self._cache_response(query, scope, chain, answers[index])
+                continue
+            pending.append((index, query, scope, chain, inputs, entry))
+        
+        if not pending:
+            return answers
+        
+        from openai import OpenAI as OpenAIClient
+        
+        client = OpenAIClient()
+        
+        # Uma requisição de chat por consulta, já com o contexto relevante
+        requests = []
+        for index, query, scope, chain, inputs, entry in pending:
+            messages = self.prompt_template.format_messages(**inputs)
+            requests.append(json.dumps({
+                "custom_id": f"consulta-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.llm.model_name,
+                    "messages": [
+                        {"role": _CHAT_ROLES[message.type], "content": message.content} for message in messages
+                    ],
+                    "temperature": self.llm.temperature,
+                    "max_tokens": self.llm.max_tokens
+                }
+            }, ensure_ascii=False))
+        
+        input_file = client.files.create(
+            file=("consultas.jsonl", "\n".join(requests).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        
+        deadline = time.monotonic() + timeout
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                client.batches.cancel(batch.id)
+                print(f"Lote {batch.id} não concluído em {timeout:.0f}s; respondendo as consultas uma a uma.")
+                for index, query, scope, chain, inputs, entry in pending:
+                    answers[index] = self._run_chain(chain, inputs)
+                    self._cache_response(query, scope, chain, answers[index])
+                return answers
+            time.sleep(min(poll_interval, remaining))
+            batch = client.batches.retrieve(batch.id)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Lote {batch.id} não concluído: {batch.status}")
+        
+        # Resultados chegam fora de ordem; custom_id identifica cada consulta
+        results = {}
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if line.strip():
+                result = json.loads(line)
+                results[result["custom_id"]] = result
+        
+        for index, query, scope, chain, inputs, entry in pending:
+            result = results.get(f"consulta-{index}")
+            if result is None:
+                answers[index] = "Consulta sem resposta no lote."
+                continue
+            body = (result.get("response") or {}).get("body") or {}
+            if not body.get("choices"):
+                answers[index] = f"Erro ao processar consulta: {result.get('error') or body.get('error')}"
+                continue
+            answers[index] = body["choices"][0]["message"]["content"]
+            if entry is not None:
+                entry[0].update(entry[1], entry[2], _llm_cache_value(answers[index]))
+            self._cache_response(query, scope, chain, answers[index])
+        
+        return answers
+    
     def _initialize_change_detector(self):
         """Inicializa o detector de mudanças."""
         global change_detector
@@ -856,6 +1366,28 @@ class CLI:
             query_processor: Processador de consultas opcional. Se não fornecido, um novo será criado.
         """
         self.query_processor = query_processor if query_processor is not None else QueryProcessor()
+        
+        # Aquece as coleções em segundo plano enquanto o usuário digita
+        self._warm_up_thread = threading.Thread(target=self._warm_up, daemon=True)
+        self._warm_up_thread.start()
+        
+        # Tabela de comandos: cada handler retorna False quando a aplicação deve sair
+        self._commands: Dict[str, Callable[[], bool]] = {
+            "!ajuda": self._cmd_help,
+            "!modelo": self._cmd_toggle_model,
+            "!sair": self._cmd_exit
+        }
+    
+    def _warm_up(self):
+        """Carrega os índices das coleções antes da primeira consulta."""
+        warm_up = getattr(self.query_processor.vector_db, "warm_up", None)
+        if warm_up is None:
+            return
+        try:
+            warm_up()
+        except Exception:
+            # O aquecimento é apenas uma otimização; falhas não afetam a CLI
+            pass
     
     def _print_header(self):
         """
@@ -867,7 +1399,7 @@ class CLI:
         print("\nModelo atual:", self.query_processor.model_name)
         print("\nComandos disponíveis:")
         print("  !ajuda     - Exibe esta mensagem de ajuda")
-        print("  !modelo    - Alterna entre os modelos GPT-3.5 e GPT-4")
+        print("  !modelo    - Alterna entre os modelos GPT-4o mini e GPT-4")
         print("  !sair      - Sai da aplicação")
         print("\nDigite sua pergunta ou um comando:")
         print("-"*80)
@@ -882,29 +1414,73 @@ class CLI:
         Returns:
             True se a aplicação deve continuar, False se deve sair.
         """
-        if command == "!ajuda":
-            self._print_header()
-            return True
-        
-        elif command == "!modelo":
-            # Alterna entre os modelos
-            new_model = GPT_4_MODEL if self.query_processor.model_name == GPT_3_5_MODEL else GPT_3_5_MODEL
-            self.query_processor.switch_model(new_model)
-            return True
+        handler = self._commands.get(command)
+        if handler is not None:
+            return handler()
         
-        elif command == "!sair":
-            print("\nObrigado por utilizar a Assistente de IA. Até logo!")
-            return False
+        print(f"Comando desconhecido: {command}")
+        print("Digite !ajuda para ver os comandos disponíveis.")
+        return True
+    
+    def _cmd_help(self) -> bool:
+        """Exibe a mensagem de ajuda."""
+        self._print_header()
+        return True
+    
+    def _cmd_toggle_model(self) -> bool:
+        """Alterna entre os modelos GPT-4o mini e GPT-4."""
+        new_model = GPT_4_MODEL if self.query_processor.model_name == GPT_4O_MINI_MODEL else GPT_4O_MINI_MODEL
+        self.query_processor.switch_model(new_model)
+        return True
+    
+    def _cmd_exit(self) -> bool:
+        """Encerra a aplicação."""
+        print("\nObrigado por utilizar a Assistente de IA. Até logo!")
+        return False
+    
+    async def _print_response(self, query: str) -> None:
+        """
+        Exibe a resposta de uma consulta à medida que é gerada.
         
-        else:
-            print(f"Comando desconhecido: {command}")
-            print("Digite !ajuda para ver os comandos disponíveis.")
-            return True
+        Args:
+            query: Texto da consulta.
+        """
+        async for token in self.query_processor.astream_response(query):
+            sys.stdout.write(token)
+            sys.stdout.flush()
+        print()
     
     def run(self):
         """
-        Executa a interface de linha de comando.
+        Executa a interface de linha de comando. Com a entrada redirecionada
+        (pipe ou arquivo), as consultas são lidas da entrada padrão e respondidas em lote.
+        """
+        # Um único event loop para toda a sessão: o cliente assíncrono da
+        # OpenAI (e seu pool de conexões) fica associado a ele
+        loop = asyncio.new_event_loop()
+        
+        try:
+            if sys.stdin.isatty():
+                self._run_interactive(loop)
+            else:
+                self._run_piped(loop)
+        finally:
+            loop.close()
+    
+    def _run_interactive(self, loop: asyncio.AbstractEventLoop):
+        """
+        Lê e responde consultas digitadas pelo usuário.
+        
+        Args:
+            loop: Event loop da sessão.
         """
+        # Edição de linha e histórico no input() (indisponível em alguns sistemas)
+        try:
+            import readline
+            readline.set_history_length(READLINE_HISTORY_LENGTH)
+        except ImportError:
+            pass
+        
         self._print_header()
         
         while True:
@@ -918,14 +1494,10 @@ class CLI:
                         break
                     continue
                 
-                # Processa a consulta
-                print("\nProcessando sua consulta. Isso pode levar alguns segundos...\n")
-                response = self.query_processor.process_query(user_input)
-                
-                # Exibe a resposta
+                # Processa a consulta, exibindo a resposta à medida que é gerada
                 print("\nResposta:")
                 print("-"*80)
-                print(response)
+                loop.run_until_complete(self._print_response(user_input))
                 print("-"*80)
                 
             except KeyboardInterrupt:
@@ -935,6 +1507,56 @@ class CLI:
             except Exception as e:
                 print(f"\nErro ao processar consulta: {e}")
     
+    def _run_piped(self, loop: asyncio.AbstractEventLoop):
+        """
+        Responde as consultas da entrada padrão, uma por linha. Consultas
+        consecutivas são processadas concorrentemente; comandos (ex.: !modelo)
+        são executados na ordem em que aparecem.
+        
+        Args:
+            loop: Event loop da sessão.
+        """
+        pending = []
+        for line in sys.stdin:
+            user_input = line.strip()
+            if not user_input:
+                continue
+            
+            if user_input.startswith("!"):
+                self._answer_batch(loop, pending)
+                pending = []
+                if not self._process_command(user_input):
+                    return
+                continue
+            
+            pending.append(user_input)
+        
+        self._answer_batch(loop, pending)
+    
+    def _answer_batch(self, loop: asyncio.AbstractEventLoop, queries: List[str]):
+        """
+        Processa um lote de consultas com batch_process e exibe as respostas em ordem.
+        Uma consulta que falhou exibe o erro sem afetar as respostas das demais.
+        
+        Args:
+            loop: Event loop da sessão.
+            queries: Consultas do lote.
+        """
+        if not queries:
+            return
+        
+        responses = loop.run_until_complete(self.query_processor.batch_process(queries))
+        
+        for query, response in zip(queries, responses):
+            print(f"\n> {query}")
+            if isinstance(response, Exception):
+                print(f"\nErro ao processar consulta: {response}")
+                continue
+            print("\nResposta:")
+            print("-"*80)
+            print(response)
+            print("-"*80)
+    
     @staticmethod
     def parse_args():
         """
@@ -944,9 +1566,11 @@ class CLI:
             Argumentos analisados.
         """
         parser = argparse.ArgumentParser(description="Assistente de IA para o Projeto E-commerce")
-        parser.add_argument("--modelo", choices=["gpt-3.5", "gpt-4"], default="gpt-3.5",
+        parser.add_argument("--modelo", choices=["gpt-4o-mini", "gpt-4"], default="gpt-4o-mini",
                            help="Modelo da OpenAI a ser utilizado")
         parser.add_argument("--consulta", type=str, help="Consulta a ser processada (modo não interativo)")
+        parser.add_argument("--arquivo-consultas", type=str,
+                           help="Arquivo com uma consulta por linha, processadas pela Batch API (modo não interativo)")
         
         return parser.parse_args()
 
@@ -958,7 +1582,7 @@ def main():
     args = CLI.parse_args()
     
     # Define o modelo a ser utilizado
-    model_name = GPT_4_MODEL if args.modelo == "gpt-4" else GPT_3_5_MODEL
+    model_name = GPT_4_MODEL if args.modelo == "gpt-4" else GPT_4O_MINI_MODEL
     
     # Cria o processador de consultas
     query_processor = QueryProcessor(model_name=model_name)
@@ -967,12 +1591,23 @@ def main():
     cli = CLI(query_processor)
     
     # Verifica se é modo não interativo
-    if args.consulta:
-        print(f"Processando consulta: {args.consulta}")
-        response = query_processor.process_query(args.consulta)
+    if args.arquivo_consultas:
+        with open(args.arquivo_consultas, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+        
+        print(f"Enviando {len(queries)} consultas em lote. O processamento pode levar alguns minutos...")
+        responses = query_processor.process_queries_batch(queries)
+        for query, response in zip(queries, responses):
+            print(f"\nConsulta: {query}")
+            print("Resposta:")
+            print("-"*80)
+            print(response)
+            print("-"*80)
+    elif args.consulta:
+        print(f"Consulta: {args.consulta}")
         print("\nResposta:")
         print("-"*80)
-        print(response)
+        asyncio.run(cli._print_response(args.consulta))
         print("-"*80)
     else:
         # Modo interativo
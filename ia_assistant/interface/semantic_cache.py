@@ -0,0 +1,194 @@
+"""
+Cache semântico de respostas da assistente.
+Guarda o embedding normalizado de cada consulta respondida e reaproveita a
+resposta quando uma nova consulta é semelhante o bastante (similaridade de
+cosseno acima do limiar), evitando a busca na base vetorial e a chamada ao modelo.
+Entradas expiram após ttl segundos; acima do limite, sai a usada há mais tempo.
+"""
+
+import os
+import pickle
+import threading
+import time
+from typing import Callable, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+# Similaridade de cosseno mínima para considerar duas consultas equivalentes
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+# Número máximo de respostas guardadas (as usadas há mais tempo são descartadas)
+DEFAULT_MAX_ENTRIES = 1000
+
+class SemanticCache:
+    """Cache de respostas indexado pelo embedding da consulta."""
+
+    def __init__(self, embed: Callable[[str], Sequence[float]],
+                 threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 path: Optional[str] = None,
+                 ttl: Optional[float] = None):
+        """
+        Inicializa o cache, carregando as entradas salvas em path, se existirem.
+
+        Args:
+            embed: Função que gera o embedding de uma consulta
+            threshold: Similaridade mínima para reaproveitar uma resposta
+            max_entries: Número máximo de entradas
+            path: Arquivo (pickle) onde o cache é persistido
+            ttl: Validade (segundos) de cada resposta; None para não expirar
+        """
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        self.ttl = ttl
+        self._matrix: Optional[np.ndarray] = None
+        self._responses: List[str] = []
+        self._scopes: List[Hashable] = []
+        # Instantes (time.time) de criação e de último uso de cada entrada
+        self._created = np.empty(0)
+        self._last_used = np.empty(0)
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def _normalized_embedding(self, query: str) -> np.ndarray:
+        """Embedding da consulta com norma unitária (produto interno = cosseno)."""
+        vector = np.asarray(self.embed(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expired(self, now: float) -> np.ndarray:
+        """Máscara das entradas com validade vencida."""
+        if self.ttl is None:
+            return np.zeros(len(self._responses), dtype=bool)
+        return now - self._created > self.ttl
+
+    def _remove(self, indices: np.ndarray) -> None:
+        """Remove as entradas nas posições informadas (chamado com o lock)."""
+        keep = np.ones(len(self._responses), dtype=bool)
+        keep[indices] = False
+        self._matrix = self._matrix[keep]
+        self._responses = [response for response, kept in zip(self._responses, keep) if kept]
+        self._scopes = [scope for scope, kept in zip(self._scopes, keep) if kept]
+        self._created = self._created[keep]
+        self._last_used = self._last_used[keep]
+
+    def get(self, query: str, scope: Hashable = None) -> Optional[str]:
+        """
+        Busca a resposta de uma consulta semelhante.
+
+        Args:
+            query: Texto da consulta
+            scope: Restringe a busca a entradas do mesmo escopo (ex.: ID do ADR citado),
+                evitando confundir consultas quase idênticas sobre recursos diferentes
+
+        Returns:
+            Resposta armazenada ou None
+        """
+        with self._lock:
+            if not self._responses:
+                return None
+
+        vector = self._normalized_embedding(query)
+        now = time.time()
+
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                return None
+            similarities = self._matrix @ vector
+            expired = self._expired(now)
+            for index in np.argsort(similarities)[::-1]:
+                if similarities[index] < self.threshold:
+                    break
+                if self._scopes[index] == scope and not expired[index]:
+                    self._last_used[index] = now
+                    return self._responses[index]
+        return None
+
+    def put(self, query: str, response: str, scope: Hashable = None) -> None:
+        """
+        Armazena a resposta de uma consulta.
+
+        Args:
+            query: Texto da consulta
+            response: Resposta gerada
+            scope: Escopo da entrada (ver get)
+        """
+        vector = self._normalized_embedding(query)
+        now = time.time()
+
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                self._matrix = vector[np.newaxis, :]
+                self._responses = [response]
+                self._scopes = [scope]
+                self._created = np.array([now])
+                self._last_used = np.array([now])
+                return
+
+            self._remove(np.flatnonzero(self._expired(now)))
+            self._matrix = np.vstack([self._matrix, vector])
+            self._responses.append(response)
+            self._scopes.append(scope)
+            self._created = np.append(self._created, now)
+            self._last_used = np.append(self._last_used, now)
+
+            overflow = len(self._responses) - self.max_entries
+            if overflow > 0:
+                self._remove(np.argsort(self._last_used, kind="stable")[:overflow])
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._matrix = None
+            self._responses = []
+            self._scopes = []
+            self._created = np.empty(0)
+            self._last_used = np.empty(0)
+
+    def save(self) -> None:
+        """Persiste o cache em path (sem efeito se não configurado ou vazio)."""
+        if not self.path:
+            return
+
+        with self._lock:
+            if self._matrix is None:
+                return
+            state = {
+                "matrix": self._matrix,
+                "responses": list(self._responses),
+                "scopes": list(self._scopes),
+                "created": self._created.copy(),
+                "last_used": self._last_used.copy()
+            }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+
+    def load(self) -> None:
+        """Carrega o cache salvo em path; um arquivo inválido é ignorado."""
+        try:
+            with open(self.path, "rb") as file:
+                state = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+
+        # Arquivos salvos sem os instantes contam como criados agora
+        now = np.full(len(state["responses"]), time.time())
+        with self._lock:
+            self._matrix = state["matrix"]
+            self._responses = state["responses"]
+            self._scopes = state["scopes"]
+            self._created = state.get("created", now)
+            self._last_used = state.get("last_used", now)
@@ -6,7 +6,7 @@ Este script fornece uma interface simples para inicializar e executar a assisten
 import os
 import sys
 import argparse
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Adiciona o diretório raiz ao path para importações relativas
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -16,12 +16,13 @@ from ia_assistant.database.vector_db import get_vector_database
 from ia_assistant.knowledge_processor.updater import get_update_manager
 from ia_assistant.interface.cli import CLI, QueryProcessor
 
-def initialize_assistant(project_root: str) -> Dict[str, Any]:
+def initialize_assistant(project_root: str, quantized: Optional[bool] = None) -> Dict[str, Any]:
     """
     Inicializa a assistente de IA.
     
     Args:
         project_root: Caminho raiz do projeto.
+        quantized: Cria os índices FAISS com vetores em float16 (ver get_vector_database).
         
     Returns:
         Resultados da inicialização.
@@ -29,7 +30,7 @@ def initialize_assistant(project_root: str) -> Dict[str, Any]:
     print("\n=== Inicializando Assistente de IA ===")
     
     # Cria a base de dados vetorial
-    vector_db = get_vector_database()
+    vector_db = get_vector_database(quantized=quantized)
     
     # Cria o gerenciador de atualização
     update_manager = get_update_manager(project_root, vector_db)
@@ -53,34 +54,36 @@ def main():
                        help="Caminho raiz do projeto")
     parser.add_argument("--initialize", action="store_true",
                        help="Inicializar a base de conhecimento")
-    parser.add_argument("--modelo", choices=["gpt-3.5", "gpt-4"], default="gpt-3.5",
+    parser.add_argument("--modelo", choices=["gpt-4o-mini", "gpt-4"], default="gpt-4o-mini",
                        help="Modelo da OpenAI a ser utilizado")
     parser.add_argument("--update", action="store_true",
                        help="Atualizar a base de conhecimento")
     parser.add_argument("--update-interval", type=int, default=0,
                        help="Intervalo em segundos para atualizações periódicas (0 = desativado)")
+    parser.add_argument("--quantizado", action="store_true", default=None,
+                       help="Com VECTOR_BACKEND=faiss, cria os índices com vetores em float16 (padrão: FAISS_QUANTIZED)")
     
     args = parser.parse_args()
     
     # Define o modelo a ser utilizado
-    model_name = "gpt-4" if args.modelo == "gpt-4" else "gpt-3.5-turbo-instruct"
+    model_name = "gpt-4" if args.modelo == "gpt-4" else "gpt-4o-mini"
     
     # Inicializa a base de conhecimento se solicitado
     if args.initialize:
-        initialize_assistant(args.project_root)
+        initialize_assistant(args.project_root, quantized=args.quantizado)
     
     # Atualiza a base de conhecimento se solicitado
     if args.update:
-        update_manager = get_update_manager(args.project_root)
+        update_manager = get_update_manager(args.project_root, get_vector_database(quantized=args.quantizado))
         update_manager.update_knowledge_base()
     
     # Configura atualizações periódicas se solicitado
     if args.update_interval > 0:
-        update_manager = get_update_manager(args.project_root)
+        update_manager = get_update_manager(args.project_root, get_vector_database(quantized=args.quantizado))
         update_manager.schedule_periodic_update(interval_seconds=args.update_interval)
     else:
         # Cria o processador de consultas
-        query_processor = QueryProcessor(model_name=model_name)
+        query_processor = QueryProcessor(get_vector_database(quantized=args.quantizado), model_name=model_name)
         
         # Cria e executa a CLI
         cli = CLI(query_processor)
@@ -14,7 +14,8 @@ import git
 # Adiciona o diretório raiz ao path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ia_assistant.data_collector.collectors import DocumentCollector, CodeCollector, GitCollector, DataCollector
+from ia_assistant.data_collector.collectors import DocumentCollector, CodeCollector, GitCollector, DataCollector, BatchedCollector
+from ia_assistant.database.vector_db import split_document
 
 class TestDataCollection(unittest.TestCase):
     """Testes para a coleta de dados."""
@@ -195,6 +196,169 @@ Adotaremos a **Arquitetura Hexagonal** como padrão arquitetural para o projeto.
             # Verifica se pelo menos um arquivo foi processado
             self.assertGreater(len(results), 0)
     
+    def test_code_collector_parallel_directory_scanning(self):
+        """Testa a coleta de diretório com extração em paralelo."""
+        vector_db = MagicMock()
+        vector_db.process_and_add_document.return_value = ["chunk1"]
+        collector = CodeCollector(vector_db)
+        src_dir = os.path.join(self.temp_dir, "src")
+        source = os.path.join(src_dir, "Product.kt")
+        with open(source, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for i in range(5):
+            with open(os.path.join(src_dir, f"Product{i}.kt"), 'w', encoding='utf-8') as f:
+                f.write(content)
+        # Arquivo inválido: a falha fica restrita a ele
+        invalid = os.path.join(src_dir, "Invalido.kt")
+        with open(invalid, 'wb') as f:
+            f.write(b"\xff\xfe")
+        
+        with patch('ia_assistant.data_collector.collectors.PARALLEL_COLLECT_THRESHOLD', 2), \
+                patch('ia_assistant.data_collector.collectors.os.cpu_count', return_value=2):
+            results = collector.collect_directory(src_dir, file_extension=".kt")
+        
+        # Todos os arquivos são inseridos pelo processo principal
+        self.assertEqual(len(results), 7)
+        self.assertTrue(results[invalid][0].startswith("ERROR"))
+        self.assertEqual(vector_db.process_and_add_document.call_count, 6)
+        metadata = vector_db.process_and_add_document.call_args[1]['metadata']
+        self.assertIn("Product", metadata['classes'])
+        self.assertIn("updateStock", metadata['functions'])
+    
+    def test_code_parser_does_not_import_vector_db(self):
+        """Testa que os processos de coleta não carregam a base vetorial."""
+        import subprocess
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        script = (
+            "import sys\n"
+            "import ia_assistant.data_collector.code_parser\n"
+            "print('ia_assistant.database.vector_db' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "False")
+    
+    def test_batched_collector_groups_inserts(self):
+        """Testa a inserção em lotes de chunks de vários documentos."""
+        vector_db = MagicMock()
+        
+        with BatchedCollector(vector_db, chunksize=3) as batch:
+            ids_a = batch.add_document("codigo_fonte", "conteudo a", {"source": "a.kt"}, "a")
+            ids_b = batch.add_document("codigo_fonte", "conteudo b", {"source": "b.kt"}, "b")
+            batch.add_document("commits_historico", "commit", {"source": "repo"}, "c")
+            
+            # Nada é inserido antes de completar um lote
+            vector_db.add_documents.assert_not_called()
+        
+        # IDs determinísticos: documento + hash do conteúdo do chunk
+        self.assertEqual(len(ids_a), 1)
+        self.assertTrue(ids_a[0].startswith("a_"))
+        self.assertTrue(ids_b[0].startswith("b_"))
+        self.assertEqual(split_document("conteudo a", {"source": "a.kt"}, "a")[0], ids_a)
+        
+        # Uma chamada por coleção ao sair do contexto
+        self.assertEqual(vector_db.add_documents.call_count, 2)
+        collection_name, documents, metadatas, ids = vector_db.add_documents.call_args_list[0][0]
+        self.assertEqual(collection_name, "codigo_fonte")
+        self.assertEqual(documents, ["conteudo a", "conteudo b"])
+        self.assertEqual(ids, ids_a + ids_b)
+        self.assertEqual(metadatas[1]["chunk_count"], 1)
+        self.assertEqual(metadatas[1]["document_id"], "b")
+    
+    def test_batched_insert_failure_marks_source_files(self):
+        """Testa que a falha de um lote marca apenas os arquivos daquele lote."""
+        with open(os.path.join(self.temp_dir, "visao.md"), 'w', encoding='utf-8') as f:
+            f.write("# Visão do projeto")
+        
+        vector_db = MagicMock(spec=["add_documents", "process_and_add_document"])
+        
+        def add_documents(collection_name, documents, metadatas, ids):
+            if collection_name == "documentacao_ddd":
+                raise RuntimeError("falha na inserção")
+            return ids
+        vector_db.add_documents.side_effect = add_documents
+        
+        # A inserção final (ao sair do lote) não propaga a falha
+        results = DataCollector(vector_db).collect_all(self.temp_dir)
+        
+        decisions = os.path.join(self.temp_dir, "decisoes_arquiteturais_iniciais.md")
+        self.assertEqual(results["documents"][os.path.join(self.temp_dir, "visao.md")],
+                         ["ERROR: falha na inserção"])
+        self.assertFalse(results["documents"][decisions][0].startswith("ERROR"))
+        self.assertFalse(any(ids[0].startswith("ERROR") for ids in results["code"].values()))
+    
+    def test_concurrent_batches_report_failures_per_job(self):
+        """Testa que, na inserção simultânea, só os arquivos do lote que falhou são registrados."""
+        vector_db = MagicMock()
+        
+        async def aadd_documents_many(jobs, concurrency):
+            return [RuntimeError("falha") if job[0] == "b" else job[3] for job in jobs]
+        vector_db.aadd_documents_many.side_effect = aadd_documents_many
+        
+        with BatchedCollector(vector_db, chunksize=1, concurrency=2) as batch:
+            batch.add_document("a", "conteudo a", {"source": "a.kt"}, "a")
+            batch.add_document("b", "conteudo b", {"source": "b.kt"}, "b")
+        
+        self.assertEqual(batch.failures, {"b.kt": "falha"})
+    
+    def test_batched_collector_deletes_stale_chunks(self):
+        """Testa que a reingestão remove os chunks antigos, exceto de documentos com lote falho."""
+        vector_db = MagicMock()
+        
+        def add_documents(collection_name, documents, metadatas, ids):
+            if metadatas[0]["document_id"] == "b":
+                raise RuntimeError("falha")
+            return ids
+        vector_db.add_documents.side_effect = add_documents
+        
+        with BatchedCollector(vector_db, chunksize=1) as batch:
+            ids_a = batch.add_document("codigo_fonte", "conteudo a", {"source": "a.kt"}, "a")
+            batch.add_document("codigo_fonte", "conteudo b", {"source": "b.kt"}, "b")
+            ids_vazio = batch.add_document("codigo_fonte", "", {"source": "c.kt", "document_id": "c"})
+        
+        self.assertEqual(ids_vazio, [])
+        self.assertEqual(vector_db.delete_stale_chunks.call_args_list, [
+            (("codigo_fonte", "a", ids_a),),
+            (("codigo_fonte", "c", []),)
+        ])
+    
+    def test_code_document_id_is_relative_path(self):
+        """Testa que arquivos de mesmo nome em pacotes diferentes têm IDs distintos."""
+        vector_db = MagicMock()
+        vector_db.process_and_add_document.return_value = ["chunk1"]
+        collector = CodeCollector(vector_db)
+        source = os.path.join(self.temp_dir, "src", "Product.kt")
+        other = os.path.join(self.temp_dir, "outro", "Product.kt")
+        os.makedirs(os.path.dirname(other))
+        shutil.copy(source, other)
+        
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            collector.collect(source)
+            collector.collect(other)
+        finally:
+            os.chdir(cwd)
+        
+        document_ids = [
+            call[1]['metadata']['document_id'] for call in vector_db.process_and_add_document.call_args_list
+        ]
+        self.assertEqual(document_ids, ["src/Product.kt", "outro/Product.kt"])
+    
+    def test_split_document_deterministic_ids(self):
+        """Testa que os IDs dos chunks são estáveis e únicos por documento."""
+        # Texto periódico: chunks consecutivos com conteúdo idêntico
+        document = " ".join(["produto"] * 1000)
+        
+        ids, chunks, metadatas = split_document(document, {"source": "a.md"}, "doc")
+        
+        self.assertEqual(split_document(document, {"source": "a.md"}, "doc")[0], ids)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(chunks[0], chunks[1])
+        self.assertEqual(ids[1], f"{ids[0]}_1")
+        self.assertTrue(all(m["document_id"] == "doc" for m in metadatas))
+    
     def test_git_collector_initialization(self):
         """Testa a inicialização do coletor Git."""
         try:
@@ -0,0 +1,72 @@
+"""
+Testes para o cache persistente de embeddings.
+Valida que apenas textos fora do cache são enviados à função de embeddings.
+"""
+
+import os
+import sys
+import unittest
+import asyncio
+import tempfile
+import shutil
+from unittest.mock import MagicMock, AsyncMock
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ia_assistant.database.embed_cache import EmbeddingCache
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Testes para o EmbeddingCache."""
+    
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "cache", "embeddings.sqlite3")
+        self.cache = EmbeddingCache(self.path, "modelo-teste")
+        self.embed = MagicMock(side_effect=lambda texts: [[float(len(t)), 1.0] for t in texts])
+    
+    def tearDown(self):
+        """Limpeza após os testes."""
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def test_only_misses_are_embedded(self):
+        """Testa que textos já em cache não geram nova chamada."""
+        first = self.cache.embed_documents(["a", "bb"], self.embed)
+        second = self.cache.embed_documents(["ccc", "a", "bb"], self.embed)
+        
+        self.assertEqual(self.embed.call_args_list[1][0][0], ["ccc"])
+        self.assertEqual(second.dtype, np.float32)
+        np.testing.assert_array_equal(second, [[3.0, 1.0], [1.0, 1.0], [2.0, 1.0]])
+        np.testing.assert_array_equal(first, second[1:])
+    
+    def test_cache_persists_across_instances(self):
+        """Testa que o cache sobrevive à reabertura do banco."""
+        self.cache.embed_documents(["a"], self.embed)
+        self.cache.close()
+        
+        reopened = EmbeddingCache(self.path, "modelo-teste")
+        reopened.embed_documents(["a"], self.embed)
+        self.assertEqual(self.embed.call_count, 1)
+        
+        # Outro modelo não reaproveita os vetores
+        other_model = EmbeddingCache(self.path, "outro-modelo")
+        self.assertEqual(other_model.get_many(["a"]), [None])
+        reopened.close()
+        other_model.close()
+    
+    def test_async_embed_documents(self):
+        """Testa a variante assíncrona usando o mesmo cache."""
+        self.cache.embed_documents(["a"], self.embed)
+        aembed = AsyncMock(side_effect=lambda texts: [[9.0, 9.0] for _ in texts])
+        
+        result = asyncio.run(self.cache.aembed_documents(["a", "novo"], aembed))
+        
+        aembed.assert_awaited_once_with(["novo"])
+        np.testing.assert_array_equal(result, [[1.0, 1.0], [9.0, 9.0]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Testes para o backend FAISS das coleções vetoriais.
+Valida inserção, substituição, remoção, filtros e persistência em disco.
+"""
+
+import os
+import sys
+import unittest
+import tempfile
+import shutil
+from unittest.mock import patch
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ia_assistant.database.faiss_backend import FaissClient, FAISS_AVAILABLE
+
+@unittest.skipUnless(FAISS_AVAILABLE, "faiss não instalado")
+class TestFaissBackend(unittest.TestCase):
+    """Testes para FaissClient e FaissCollection."""
+    
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.client = FaissClient(self.temp_dir)
+        self.collection = self.client.get_or_create_collection("codigo_fonte")
+        self.vectors = np.eye(4, dtype=np.float32)
+        self.collection.upsert(
+            ids=["a", "b", "c"],
+            embeddings=self.vectors[:3],
+            documents=["doc a", "doc b", "doc c"],
+            metadatas=[{"document_id": "x"}, {"document_id": "x"}, {"document_id": "y"}]
+        )
+    
+    def tearDown(self):
+        """Limpeza após os testes."""
+        self.client.delete_collection("codigo_fonte")
+        shutil.rmtree(self.temp_dir)
+    
+    def test_query_nearest_neighbors(self):
+        """Testa a busca dos vizinhos mais próximos com filtro de metadados."""
+        results = self.collection.query(query_embeddings=self.vectors[1:2], n_results=2)
+        self.assertEqual(results["ids"][0][0], "b")
+        self.assertEqual(results["documents"][0][0], "doc b")
+        self.assertEqual(len(results["ids"][0]), 2)
+        
+        filtered = self.collection.query(query_embeddings=self.vectors[1:2], n_results=3,
+                                         where={"document_id": "y"})
+        self.assertEqual(filtered["ids"], [["c"]])
+    
+    def test_upsert_and_delete(self):
+        """Testa que substituições e remoções não aparecem nas consultas."""
+        self.collection.upsert(ids=["a"], embeddings=self.vectors[3:4], documents=["novo a"],
+                               metadatas=[{"document_id": "x"}])
+        results = self.collection.query(query_embeddings=self.vectors[3:4], n_results=1)
+        self.assertEqual(results["documents"], [["novo a"]])
+        self.assertEqual(self.collection.count(), 3)
+        
+        self.collection.delete(where={"document_id": "x"})
+        self.assertEqual(self.collection.count(), 1)
+        results = self.collection.query(query_embeddings=self.vectors[3:4], n_results=3)
+        self.assertEqual(results["ids"], [["c"]])
+    
+    def test_get_by_metadata(self):
+        """Testa a leitura de registros por ID e por filtro de metadados."""
+        self.assertEqual(self.collection.get(where={"document_id": "x"}, include=[])["ids"], ["a", "b"])
+        
+        results = self.collection.get(ids=["c", "z"])
+        self.assertEqual(results["ids"], ["c"])
+        self.assertEqual(results["documents"], ["doc c"])
+        self.assertEqual(results["metadatas"], [{"document_id": "y"}])
+    
+    def test_document_filter_uses_index(self):
+        """Testa que o filtro por document_id é resolvido pelo índice do SQLite."""
+        plan = self.collection._db.execute(
+            "EXPLAIN QUERY PLAN SELECT label FROM chunks WHERE document_id = ?", ("x",)
+        ).fetchall()
+        self.assertIn("chunks_document_id", " ".join(str(row[-1]) for row in plan))
+        
+        # Demais campos de where continuam filtrados sobre as linhas do documento
+        self.collection.upsert(ids=["d"], embeddings=self.vectors[3:4], documents=["doc d"],
+                               metadatas=[{"document_id": "x", "tipo": "teste"}])
+        self.assertEqual(self.collection.get(where={"document_id": "x", "tipo": "teste"})["ids"], ["d"])
+        self.assertEqual(self.collection.get(ids=[])["ids"], [])
+        
+        self.collection.delete(ids=["a", "d"], where={"document_id": "x"})
+        self.assertEqual(self.collection.get(where={"document_id": "x"})["ids"], ["b"])
+    
+    def test_document_id_column_added_to_existing_store(self):
+        """Testa que bancos anteriores à coluna document_id são migrados ao abrir."""
+        self.client.flush()
+        db = self.collection._db
+        db.execute("DROP INDEX chunks_document_id")
+        db.execute("ALTER TABLE chunks DROP COLUMN document_id")
+        db.commit()
+        
+        reopened = FaissClient(self.temp_dir).get_or_create_collection("codigo_fonte")
+        self.assertEqual(reopened.get(where={"document_id": "x"})["ids"], ["a", "b"])
+        self.assertEqual(reopened.get(where={"document_id": "y"})["ids"], ["c"])
+        reopened.close()
+    
+    def test_persistence(self):
+        """Testa que índice e metadados são recarregados do disco após flush."""
+        self.client.flush()
+        reopened = FaissClient(self.temp_dir).get_or_create_collection("codigo_fonte")
+        self.assertEqual(reopened.count(), 3)
+        self.assertEqual(reopened.peek(1)["ids"], ["a"])
+        results = reopened.query(query_embeddings=self.vectors[2:3], n_results=1)
+        self.assertEqual(results["ids"], [["c"]])
+        reopened.close()
+    
+    def test_unflushed_records_discarded_on_reopen(self):
+        """Testa que registros sem vetor no índice gravado são descartados ao reabrir."""
+        self.collection.flush()
+        self.collection.upsert(ids=["d"], embeddings=self.vectors[3:4], documents=["doc d"])
+        self.collection.delete(ids=["a"])
+        
+        reopened = FaissClient(self.temp_dir).get_or_create_collection("codigo_fonte")
+        self.assertEqual(reopened.count(), 2)
+        
+        # O vetor de "a" segue no índice gravado e não volta nas consultas
+        results = reopened.query(query_embeddings=self.vectors[0:1], n_results=3)
+        self.assertEqual(sorted(results["ids"][0]), ["b", "c"])
+        reopened.close()
+    
+    @patch('ia_assistant.database.faiss_backend.COMPACTION_MIN_REMOVED', 2)
+    def test_compaction_drops_removed_labels(self):
+        """Testa a reconstrução do índice quando há rótulos descartados demais."""
+        self.collection.delete(ids=["a"])
+        self.assertEqual(self.collection._index.ntotal, 3)
+        
+        self.collection.upsert(ids=["b"], embeddings=self.vectors[3:4], documents=["novo b"])
+        self.assertEqual(self.collection._index.ntotal, 2)
+        self.assertEqual(self.collection._removed_count(), 0)
+        
+        results = self.collection.query(query_embeddings=self.vectors[3:4], n_results=3)
+        self.assertEqual(results["ids"][0][0], "b")
+        self.assertEqual(sorted(results["ids"][0]), ["b", "c"])
+    
+    def test_quantized_collection(self):
+        """Testa a coleção com vetores em float16."""
+        client = FaissClient(os.path.join(self.temp_dir, "quantizado"), quantized=True)
+        collection = client.get_or_create_collection("codigo_fonte")
+        collection.upsert(ids=["a", "b"], embeddings=self.vectors[:2], documents=["doc a", "doc b"])
+        
+        results = collection.query(query_embeddings=self.vectors[1:2], n_results=1)
+        self.assertEqual(results["ids"], [["b"]])
+        self.assertAlmostEqual(results["distances"][0][0], 0.0, places=3)
+        client.delete_collection("codigo_fonte")
+    
+    def test_quantized_setting_reaches_vector_database(self):
+        """Testa que FAISS_QUANTIZED define o índice criado por get_vector_database."""
+        from ia_assistant.database import vector_db
+        
+        with patch.object(vector_db, "VECTOR_BACKEND", "faiss"), \
+                patch.object(vector_db, "FAISS_DIR", os.path.join(self.temp_dir, "config")), \
+                patch.object(vector_db, "FAISS_QUANTIZED", True):
+            self.assertTrue(vector_db.get_vector_database().client.quantized)
+            self.assertFalse(vector_db.get_vector_database(quantized=False).client.quantized)
+
+if __name__ == '__main__':
+    unittest.main()
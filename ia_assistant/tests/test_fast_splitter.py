@@ -0,0 +1,105 @@
+"""
+Testes para o divisor de texto por janelas fixas.
+Valida limites dos chunks, preferência de quebras e a sobreposição.
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ia_assistant.database import fast_splitter
+from ia_assistant.database.fast_splitter import FastTextSplitter
+
+class TestFastTextSplitter(unittest.TestCase):
+    """Testes para o FastTextSplitter."""
+    
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.splitter = FastTextSplitter(chunk_size=100, chunk_overlap=20)
+        paragraphs = [" ".join(f"palavra{p}_{w}" for w in range(12)) for p in range(10)]
+        self.text = "\n\n".join(paragraphs)
+    
+    def test_short_text_single_chunk(self):
+        """Testa que textos menores que o chunk resultam em um único chunk."""
+        self.assertEqual(self.splitter.split_text("  texto curto \n"), ["texto curto"])
+        self.assertEqual(self.splitter.split_text("   "), [])
+    
+    def test_chunks_respect_size_and_cover_text(self):
+        """Testa que os chunks respeitam o tamanho e cobrem todas as palavras."""
+        chunks = self.splitter.split_text(self.text)
+        
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 100)
+            self.assertIn(chunk, self.text)
+        
+        covered = {word for chunk in chunks for word in chunk.split()}
+        self.assertTrue(set(self.text.split()) <= covered)
+    
+    def test_breaks_on_words_with_overlap(self):
+        """Testa que as quebras ocorrem entre palavras e com sobreposição."""
+        chunks = self.splitter.split_text(" ".join(f"w{i:03d}" for i in range(200)))
+        
+        for chunk in chunks:
+            for word in chunk.split():
+                self.assertEqual(len(word), 4)
+        
+        for previous, current in zip(chunks, chunks[1:]):
+            self.assertIn(previous.split()[-1], current.split())
+    
+    def test_pure_python_matches_numba(self):
+        """Testa que a implementação sem Numba produz os mesmos chunks."""
+        expected = self.splitter.split_text(self.text + "é" * 250)
+        
+        with patch.object(fast_splitter, 'NUMBA_AVAILABLE', False):
+            self.assertEqual(self.splitter.split_text(self.text + "é" * 250), expected)
+    
+    def test_rfind_breaks_match_loop(self):
+        """Testa que a busca com str.rfind encontra as mesmas quebras do laço por caractere."""
+        text = self.text + "\n\n\nlinha\nfinal é " * 40
+        codes = memoryview(text.encode('utf-32-le')).cast('I')
+        
+        for chunk_size, chunk_overlap in ((100, 20), (60, 0), (40, 39)):
+            min_fill = max(chunk_overlap + 1, chunk_size // 2)
+            bounds = [0] * (2 * len(text))
+            count = fast_splitter._find_breaks(codes, chunk_size, chunk_overlap, min_fill, bounds)
+            self.assertEqual(
+                fast_splitter._find_breaks_str(text, chunk_size, chunk_overlap, min_fill),
+                bounds[:2 * count]
+            )
+    
+    def test_fallback_not_slower_than_langchain(self):
+        """Testa que, sem Numba, a divisão não é mais lenta que o RecursiveCharacterTextSplitter."""
+        try:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+        except ImportError:
+            self.skipTest("langchain_text_splitters não instalado")
+        
+        text = (self.text + "\nlinha avulsa\n") * 400
+        splitter = FastTextSplitter(chunk_size=1000, chunk_overlap=200)
+        reference = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+        
+        def best_time(split):
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                split(text)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+        
+        with patch.object(fast_splitter, 'NUMBA_AVAILABLE', False):
+            fallback_time = best_time(splitter.split_text)
+        self.assertLessEqual(fallback_time, best_time(reference.split_text))
+    
+    def test_invalid_overlap(self):
+        """Testa que a sobreposição deve ser menor que o chunk."""
+        with self.assertRaises(ValueError):
+            FastTextSplitter(chunk_size=100, chunk_overlap=100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,8 @@ import sys
 import unittest
 import tempfile
 import shutil
+import pickle
+import mmap
 from unittest.mock import patch, MagicMock
 from datetime import datetime
 
@@ -19,8 +21,10 @@ from ia_assistant.analysis.impact_analyzer import (
     ImpactLevel, 
     DependencyType,
     Dependency,
-    ImpactAnalysis
+    ImpactAnalysis,
+    HYPERSCAN_AVAILABLE
 )
+from ia_assistant.analysis.impact_jit import find_newlines
 
 class TestImpactAnalyzer(unittest.TestCase):
     """Testes para o analisador de impacto."""
@@ -44,8 +48,9 @@ class TestImpactAnalyzer(unittest.TestCase):
             with open(file_path, 'w') as f:
                 f.write(content)
         
-        # Inicializa analisador
-        self.analyzer = ImpactAnalyzer([self.test_dir])
+        # Inicializa analisador (com cache isolado no diretório temporário)
+        self.cache_file = os.path.join(self.temp_dir, "dependency_cache.pickle")
+        self.analyzer = ImpactAnalyzer([self.test_dir], cache_file=self.cache_file)
     
     def tearDown(self):
         """Limpeza após os testes."""
@@ -66,6 +71,107 @@ class TestImpactAnalyzer(unittest.TestCase):
         self.assertGreater(len(self.analyzer.dependency_graph.nodes), 0)
         self.assertGreater(len(self.analyzer.dependency_graph.edges), 0)
     
+    def test_parallel_dependency_scan(self):
+        """Testa que a varredura paralela encontra as mesmas dependências."""
+        with patch('ia_assistant.analysis.impact_analyzer.PARALLEL_SCAN_THRESHOLD', 1):
+            parallel_analyzer = ImpactAnalyzer([self.test_dir], max_workers=2, use_cache=False)
+        
+        def summarize(analyzer):
+            return sorted(
+                (dep.source_file, dep.target_file, dep.dependency_type.value, dep.line_number)
+                for deps in analyzer.file_dependencies.values() for dep in deps
+            )
+        
+        self.assertEqual(summarize(parallel_analyzer), summarize(self.analyzer))
+    
+    def test_scan_overlapping_matches(self):
+        """Testa que ocorrências sobrepostas não são contadas duas vezes."""
+        analyzer = ImpactAnalyzer([self.test_dir], use_cache=False, use_hyperscan=False)
+        occurrences = analyzer._scanner.scan(b'[x]([y](z)) see foo.md import a.b @c')
+        
+        targets = [target for _, target, _, _ in occurrences]
+        self.assertIn(b'x', targets)
+        self.assertNotIn(b'y', targets)
+    
+    @unittest.skipUnless(HYPERSCAN_AVAILABLE, "hyperscan não instalado")
+    def test_hyperscan_matches_regex_scan(self):
+        """Testa que Hyperscan e expressões regulares produzem o mesmo resultado."""
+        regex_analyzer = ImpactAnalyzer([self.test_dir], use_cache=False, use_hyperscan=False)
+        hyperscan_analyzer = ImpactAnalyzer([self.test_dir], use_cache=False, use_hyperscan=True)
+        self.assertIsNotNone(hyperscan_analyzer._scanner._hyperscan_db)
+        
+        contents = [
+            b'[x]([y](z)) see foo.md import a.b @c',
+            b'from a.b import c\nimport d @e [f](g.md) h.py',
+            b'nenhuma ocorrencia aqui',
+            # Ocorrências que começam dentro de outras
+            b'[@a](see b.md) @@c import import d from x import y',
+            b''
+        ]
+        for content in contents:
+            self.assertEqual(
+                hyperscan_analyzer._scanner.scan(content),
+                regex_analyzer._scanner.scan(content)
+            )
+        
+        # Arquivos mapeados em memória são varridos sem cópia
+        file_path = os.path.join(self.test_dir, 'mapped.md')
+        with open(file_path, 'wb') as f:
+            f.write(contents[1])
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            self.assertEqual(
+                hyperscan_analyzer._scanner.scan(content),
+                regex_analyzer._scanner.scan(contents[1])
+            )
+        
+        self.assertEqual(hyperscan_analyzer.file_dependencies, regex_analyzer.file_dependencies)
+    
+    def test_scan_cache_reuse(self):
+        """Testa reaproveitamento do cache de varredura entre execuções."""
+        self.assertTrue(os.path.exists(self.cache_file))
+        
+        # Arquivos inalterados não devem ser relidos
+        with patch('ia_assistant.analysis.impact_analyzer._scan_file_matches') as mock_scan:
+            cached_analyzer = ImpactAnalyzer([self.test_dir], cache_file=self.cache_file)
+            mock_scan.assert_not_called()
+        
+        self.assertEqual(cached_analyzer.file_dependencies, self.analyzer.file_dependencies)
+        
+        # Arquivo modificado deve ser analisado novamente
+        impl_file = os.path.join(self.test_dir, "implementation.py")
+        with open(impl_file, 'w') as f:
+            f.write("# Implementation\n")
+        os.utime(impl_file, ns=(0, 0))
+        
+        updated_analyzer = ImpactAnalyzer([self.test_dir], cache_file=self.cache_file)
+        self.assertNotIn(impl_file, updated_analyzer.file_dependencies)
+    
+    def test_scan_cache_opt_in_and_scoped(self):
+        """Testa que o cache só é persistido com cache_file e guarda apenas os arquivos varridos."""
+        self.assertIsNone(ImpactAnalyzer([self.test_dir]).cache_file)
+        
+        # Outro projeto no mesmo arquivo de cache substitui as entradas anteriores
+        other_dir = os.path.join(self.temp_dir, "outro_projeto")
+        os.makedirs(other_dir)
+        other_file = os.path.join(other_dir, "adr_009.md")
+        with open(other_file, 'w') as f:
+            f.write("# ADR 009\n\nVeja [ADR 001](adr_001.md).")
+        ImpactAnalyzer([other_dir], cache_file=self.cache_file)
+        
+        with open(self.cache_file, 'rb') as f:
+            self.assertEqual(list(pickle.load(f)['files']), [other_file])
+    
+    def test_scan_cache_bare_filename(self):
+        """Testa cache_file relativo sem diretório."""
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            ImpactAnalyzer([self.test_dir], cache_file="cache_relativo.pickle")
+        finally:
+            os.chdir(cwd)
+        
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "cache_relativo.pickle")))
+    
     def test_impact_analysis(self):
         """Testa análise de impacto."""
         # Analisa impacto de mudança em ADR
@@ -113,6 +219,16 @@ class TestImpactAnalyzer(unittest.TestCase):
         strength = self.analyzer._calculate_dependency_strength('reference', '[ADR 001](adr_001.md)')
         self.assertLess(strength, 0.5)  # Referências têm força menor
     
+    def test_line_number_detection(self):
+        """Testa cálculo do número da linha das dependências."""
+        self.assertEqual(list(find_newlines(b"a\nb\nc")), [1, 3])
+        
+        # Dependências detectadas registram a linha correta
+        impl_file = os.path.join(self.test_dir, "implementation.py")
+        self.assertGreater(len(self.analyzer.file_dependencies.get(impl_file, [])), 0)
+        for dep in self.analyzer.file_dependencies.get(impl_file, []):
+            self.assertIn(dep.line_number, [2, 3])
+    
     def test_recommendations_generation(self):
         """Testa geração de recomendações."""
         adr_file = os.path.join(self.test_dir, "adr_001.md")
@@ -228,6 +344,7 @@ class TestImpactAnalyzer(unittest.TestCase):
         self.assertEqual(analysis.changed_file, new_analysis.changed_file)
         self.assertEqual(analysis.impact_level, new_analysis.impact_level)
         self.assertEqual(len(analysis.affected_files), len(new_analysis.affected_files))
+        self.assertEqual(analysis.dependencies, new_analysis.dependencies)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
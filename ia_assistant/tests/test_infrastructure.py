@@ -86,7 +86,7 @@ class TestInfrastructure(unittest.TestCase):
         try:
             processor = QueryProcessor()
             self.assertIsNotNone(processor)
-            self.assertEqual(processor.model_name, "gpt-3.5-turbo-instruct")
+            self.assertEqual(processor.model_name, "gpt-4o-mini")
         except Exception as e:
             self.fail(f"Falha ao criar processador de consultas: {e}")
     
@@ -99,9 +99,9 @@ class TestInfrastructure(unittest.TestCase):
             processor.switch_model("gpt-4")
             self.assertEqual(processor.model_name, "gpt-4")
             
-            # Testa troca de volta para GPT-3.5
-            processor.switch_model("gpt-3.5-turbo-instruct")
-            self.assertEqual(processor.model_name, "gpt-3.5-turbo-instruct")
+            # Testa troca de volta para GPT-4o mini
+            processor.switch_model("gpt-4o-mini")
+            self.assertEqual(processor.model_name, "gpt-4o-mini")
         except Exception as e:
             self.fail(f"Falha na troca de modelos: {e}")
     
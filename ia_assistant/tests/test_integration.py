@@ -16,7 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ia_assistant.main import initialize_assistant
 from ia_assistant.validate_assistant import test_queries
-from ia_assistant.interface.cli import QueryProcessor
+from ia_assistant.interface.cli import QueryProcessor, _get_llm
 from ia_assistant.data_collector.collectors import DataCollector
 
 class TestIntegration(unittest.TestCase):
@@ -24,6 +24,8 @@ class TestIntegration(unittest.TestCase):
     
     def setUp(self):
         """Configuração inicial para os testes."""
+        # Modelos compartilhados não podem vazar entre testes com OpenAI simulado
+        _get_llm.cache_clear()
         self.temp_dir = tempfile.mkdtemp()
         self.test_project_root = self.temp_dir
         
@@ -223,7 +225,7 @@ O objetivo principal é criar um ambiente de desenvolvimento onde a inteligênci
         self.assertIn('consistency', results)
         self.assertIn('decisoes_arquiteturais', results['consistency'])
     
-    @patch('ia_assistant.interface.cli.OpenAI')
+    @patch('langchain_openai.ChatOpenAI')
     def test_query_processing_integration(self, mock_openai):
         """Testa a integração do processamento de consultas."""
         # Configura o mock do LLM
@@ -9,17 +9,45 @@ import unittest
 from unittest.mock import patch, MagicMock
 import tempfile
 import shutil
+import asyncio
+import io
+import json
+from contextlib import redirect_stdout
 
 # Adiciona o diretório raiz ao path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ia_assistant.interface.cli import QueryProcessor
+from langchain_core.caches import InMemoryCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from ia_assistant.database.robust_vector_db import RobustVectorDatabase
+from ia_assistant.interface import cli
+from ia_assistant.interface.cli import CLI, QueryProcessor, _get_llm
+
+ADR_SOURCE = "/projeto/docs/adrs/adr-001-arquitetura-hexagonal.md"
+ADR_DOCUMENT = """# ADR-001: Adoção da Arquitetura Hexagonal
+
+## Status
+Aceito
+
+## Decisão
+Adotaremos a Arquitetura Hexagonal como padrão arquitetural para o projeto.
+"""
+
+class _FakeChatModel(FakeListChatModel):
+    """Modelo simulado com os parâmetros do ChatOpenAI (respostas elegíveis ao cache semântico)."""
+    model_name: str = "gpt-4o-mini"
+    temperature: float = 0.2
+    max_tokens: int = 500
 
 class TestQueryProcessing(unittest.TestCase):
     """Testes para o processamento de consultas."""
     
     def setUp(self):
         """Configuração inicial para os testes."""
+        # Modelos compartilhados não podem vazar entre testes com OpenAI simulado
+        _get_llm.cache_clear()
         self.temp_dir = tempfile.mkdtemp()
         self.test_project_root = self.temp_dir
         
@@ -72,7 +100,7 @@ Adotaremos a **Arquitetura Hexagonal** como padrão arquitetural para o projeto.
         try:
             processor = QueryProcessor()
             self.assertIsNotNone(processor)
-            self.assertEqual(processor.model_name, "gpt-3.5-turbo-instruct")
+            self.assertEqual(processor.model_name, "gpt-4o-mini")
         except Exception as e:
             self.fail(f"Falha ao inicializar processador: {e}")
     
@@ -171,7 +199,7 @@ Adotaremos a **Arquitetura Hexagonal** como padrão arquitetural para o projeto.
             self.assertEqual(extracted_id, expected_id, 
                            f"Falha ao extrair ID de: {query}")
     
-    @patch('ia_assistant.interface.cli.OpenAI')
+    @patch('langchain_openai.ChatOpenAI')
     def test_query_processing_with_mock_llm(self, mock_openai):
         """Testa o processamento de consultas com LLM simulado."""
         # Configura o mock do LLM
@@ -218,9 +246,9 @@ Adotaremos a **Arquitetura Hexagonal** como padrão arquitetural para o projeto.
         processor.switch_model("gpt-4")
         self.assertEqual(processor.model_name, "gpt-4")
         
-        # Testa troca de volta para GPT-3.5
-        processor.switch_model("gpt-3.5-turbo-instruct")
-        self.assertEqual(processor.model_name, "gpt-3.5-turbo-instruct")
+        # Testa troca de volta para GPT-4o mini
+        processor.switch_model("gpt-4o-mini")
+        self.assertEqual(processor.model_name, "gpt-4o-mini")
     
     def test_error_handling(self):
         """Testa o tratamento de erros."""
@@ -249,5 +277,404 @@ Adotaremos a **Arquitetura Hexagonal** como padrão arquitetural para o projeto.
         response = processor.process_query("   ")
         self.assertIn("vazia", response.lower() or "pergunta", response.lower())
 
+class _MockedProcessorTestCase(unittest.TestCase):
+    """Base dos testes com um processador sobre uma base vetorial robusta simulada."""
+    
+    def setUp(self):
+        """Cria o processador sem OpenAI, monitoramento ou caches em disco."""
+        # O cache de prompts exatos é global no LangChain
+        self.addCleanup(set_llm_cache, get_llm_cache())
+        set_llm_cache(None)
+        
+        self.vector_db = MagicMock(spec=RobustVectorDatabase)
+        self.vector_db.version = 0
+        self.vector_db.embed_query.side_effect = self._embed
+        self._embedded_queries = {}
+        self.llm = _FakeChatModel(responses=["Resposta simulada da IA", "Outra resposta"])
+        
+        with patch('ia_assistant.interface.cli._get_llm', return_value=self.llm), \
+             patch('ia_assistant.interface.cli._configure_llm_cache', return_value=False), \
+             patch('ia_assistant.interface.cli.SEMANTIC_CACHE_PATH', None), \
+             patch.object(QueryProcessor, '_initialize_change_detector'), \
+             patch.object(QueryProcessor, '_initialize_suggestion_engine'):
+            self.processor = QueryProcessor(vector_db=self.vector_db)
+    
+    def _embed(self, text):
+        """Embedding simulado: consultas iguais (após normalização) têm o mesmo vetor, as demais são ortogonais."""
+        index = self._embedded_queries.setdefault(text.strip().lower(), len(self._embedded_queries))
+        vector = [0.0] * 32
+        vector[index] = 1.0
+        return vector
+    
+    async def _collect(self, query):
+        """Trechos entregues por astream_response."""
+        return [chunk async for chunk in self.processor.astream_response(query)]
+    
+    def _adr_results(self, documents, sources):
+        """Resultado de consulta no formato do ChromaDB."""
+        return {
+            "documents": [documents],
+            "metadatas": [[{"source": source} for source in sources]]
+        }
+
+class TestQueryRouting(_MockedProcessorTestCase):
+    """Testes das rotas de consulta sobre uma base vetorial robusta simulada."""
+    
+    def test_classify_query(self):
+        """Testa a escolha da rota de cada consulta."""
+        test_cases = [
+            ("Quais são os ADRs do projeto?", cli.ROUTE_ADR_LISTING),
+            ("Listar ADRs", cli.ROUTE_ADR_LISTING),
+            ("Fale sobre a ADR-001", cli.ROUTE_SPECIFIC_ADR),
+            ("Detalhes da ADR 002", cli.ROUTE_SPECIFIC_ADR),
+            # Listagem sem menção a ADR segue o fluxo geral
+            ("Listar documentos", cli.ROUTE_GENERAL),
+            ("Como funciona o checkout?", cli.ROUTE_GENERAL)
+        ]
+        
+        for query, expected_route in test_cases:
+            self.assertEqual(self.processor._classify_query(query), expected_route,
+                             f"Rota incorreta para: {query}")
+    
+    def test_adr_lookup_cached_until_ttl_or_write(self):
+        """Testa que consultas de ADRs são reaproveitadas até o TTL ou a próxima escrita na base."""
+        self.vector_db.query.return_value = self._adr_results([ADR_DOCUMENT], [ADR_SOURCE])
+        now = [1000.0]
+        
+        with patch('ia_assistant.interface.cli.time.monotonic', side_effect=lambda: now[0]):
+            listing = self.processor._get_adr_listing()
+            self.assertEqual(self.processor._get_adr_listing(), listing)
+            self.processor._get_specific_adr("001")
+            self.assertEqual(self.vector_db.query.call_count, 2)
+            
+            # Dentro do TTL o resultado é reaproveitado
+            now[0] += cli.ADR_CACHE_TTL - 1
+            self.processor._get_adr_listing()
+            self.assertEqual(self.vector_db.query.call_count, 2)
+            
+            # Após o TTL a base é consultada novamente
+            now[0] += 2
+            self.processor._get_adr_listing()
+            self.assertEqual(self.vector_db.query.call_count, 3)
+            
+            # Uma escrita na base (nova versão) invalida o resultado
+            self.vector_db.version = 1
+            self.processor._get_adr_listing()
+            self.assertEqual(self.vector_db.query.call_count, 4)
+            
+            # Assim como a invalidação explícita
+            self.processor.invalidate_adr_cache()
+            self.processor._get_specific_adr("001")
+            self.assertEqual(self.vector_db.query.call_count, 5)
+    
+    @patch('ia_assistant.interface.cli.CONTEXT_MAX_CHARS_PER_DOC', 400)
+    @patch('ia_assistant.interface.cli.CONTEXT_MAX_CHARS', 1000)
+    def test_context_budget(self):
+        """Testa os limites do contexto por documento e por coleção."""
+        self.vector_db.query_all_collections.return_value = {
+            "decisoes_arquiteturais": {"documents": [["§" * 1000, "§" * 1000, "§" * 1000]], "metadatas": None},
+            "documentacao": {"documents": [["¶" * 300, "¶" * 1000]], "metadatas": [[{"source": "README.md"}, {}]]},
+            "codigo_fonte": {"error": "Falha simulada"},
+            "historico_git": {"documents": []}
+        }
+        
+        context = self.processor._get_relevant_context("Como funciona o checkout?")
+        
+        # Apenas as duas coleções com documentos dividem o limite (500 cada)
+        self.assertEqual(context.count("§"), 500)
+        self.assertIn("§" * 400, context)
+        self.assertEqual(context.count("¶"), 500)
+        self.assertIn("Fonte: README.md", context)
+        self.assertNotIn("codigo_fonte", context)
+        self.assertNotIn("historico_git", context)
+        
+        # Sem resultados, o contexto informa a ausência de informações
+        self.vector_db.query_all_collections.return_value = {"codigo_fonte": {"error": "Falha simulada"}}
+        self.assertIn("Não foram encontradas", self.processor._get_relevant_context("Outra pergunta"))
+    
+    def test_adr_listing_route(self):
+        """Testa a listagem de ADRs sobre a base robusta."""
+        self.vector_db.query.return_value = self._adr_results([ADR_DOCUMENT], [ADR_SOURCE])
+        
+        chain, inputs = self.processor._prepare_query("Quais são os ADRs do projeto?")
+        
+        self.assertIs(chain, self.processor.list_resources_chain)
+        self.assertIn("ADR-001: Adoção da Arquitetura Hexagonal", inputs["resources"])
+        self.vector_db.query.assert_called_once_with(
+            collection_name="decisoes_arquiteturais",
+            query_text="ADR Architecture Decision Record",
+            n_results=15
+        )
+    
+    def test_specific_adr_route(self):
+        """Testa a consulta de um ADR específico sobre a base robusta."""
+        self.vector_db.query.return_value = self._adr_results([ADR_DOCUMENT], [ADR_SOURCE])
+        
+        chain, inputs = self.processor._prepare_query("Fale sobre a ADR-001")
+        
+        self.assertIs(chain, self.processor.adr_detail_chain)
+        self.assertIn("Arquitetura Hexagonal", inputs["adr_content"])
+        self.vector_db.query_all_collections.assert_not_called()
+    
+    def test_specific_adr_route_falls_back_to_all_collections(self):
+        """Testa a busca ampla quando a coleção de decisões não traz o ADR."""
+        self.vector_db.query.return_value = self._adr_results(["Outro documento"], ["/projeto/README.md"])
+        self.vector_db.query_all_collections.return_value = {
+            "codigo_fonte": {"error": "Falha simulada"},
+            "documentacao": self._adr_results([ADR_DOCUMENT], [ADR_SOURCE])
+        }
+        
+        chain, inputs = self.processor._prepare_query("Fale sobre a ADR-001")
+        
+        self.assertIs(chain, self.processor.adr_detail_chain)
+        self.assertIn("Arquitetura Hexagonal", inputs["adr_content"])
+        self.vector_db.query_all_collections.assert_called_once_with("ADR 001", n_results_per_collection=10)
+    
+    def test_general_query_streams_answer(self):
+        """Testa que consultas gerais são respondidas em trechos pela chain com contexto."""
+        self.vector_db.query_all_collections.return_value = {
+            "documentacao": self._adr_results(["O checkout usa o serviço de pagamentos."], ["/projeto/README.md"])
+        }
+        
+        chunks = asyncio.run(self._collect("Como funciona o checkout?"))
+        
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), "Resposta simulada da IA")
+        self.vector_db.query_all_collections.assert_called_once_with("Como funciona o checkout?", 5)
+        
+        # process_query entrega os trechos da próxima resposta a on_token
+        tokens = []
+        response = self.processor.process_query("Como funciona o pagamento?", on_token=tokens.append)
+        self.assertEqual(response, "Outra resposta")
+        self.assertEqual("".join(tokens), "Outra resposta")
+        self.assertGreater(len(tokens), 1)
+    
+    def test_general_answer_served_from_semantic_cache(self):
+        """Testa que respostas gerais são guardadas e reaproveitadas pelo cache semântico."""
+        self.vector_db.query_all_collections.return_value = {}
+        
+        self.assertEqual(self.processor.process_query("Como funciona o checkout?"), "Resposta simulada da IA")
+        self.assertEqual(self.processor.process_query("  como funciona o checkout? "), "Resposta simulada da IA")
+        self.assertEqual(asyncio.run(self._collect("Como funciona o checkout?")), ["Resposta simulada da IA"])
+        self.vector_db.query_all_collections.assert_called_once()
+        
+        # O escopo não inclui a versão da base, que não vale entre processos
+        self.assertEqual(self.processor._semantic_cache_scope("Fale sobre a ADR-001"),
+                         (self.processor.model_name, "001"))
+    
+    def test_semantic_cache_cleared_when_database_changes(self):
+        """Testa que uma escrita na base descarta as respostas em cache."""
+        self.vector_db.query_all_collections.return_value = {}
+        
+        self.assertEqual(self.processor.process_query("Como funciona o checkout?"), "Resposta simulada da IA")
+        self.vector_db.version = 1
+        self.assertEqual(self.processor.process_query("Como funciona o checkout?"), "Outra resposta")
+        self.assertEqual(self.vector_db.query_all_collections.call_count, 2)
+    
+    def test_semantic_cache_shared_per_path(self):
+        """Testa que o cache persistido é criado e registrado para salvamento uma vez por arquivo."""
+        path = os.path.join(tempfile.mkdtemp(), "semantic_cache.pkl")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        
+        with patch.dict(cli._semantic_caches, clear=True), \
+             patch('ia_assistant.interface.cli.atexit.register') as mock_register:
+            first = cli._get_semantic_cache(path, self._embed)
+            second = cli._get_semantic_cache(path, self._embed)
+            
+            self.assertIs(first, second)
+            mock_register.assert_called_once_with(first.save)
+            
+            # Sem arquivo, cada processador tem o próprio cache, que não é salvo
+            self.assertIsNot(cli._get_semantic_cache(None, self._embed), cli._get_semantic_cache(None, self._embed))
+            mock_register.assert_called_once()
+    
+    def test_streamed_answer_fills_llm_cache(self):
+        """Testa que a resposta transmitida por _run_chain é a que invoke encontra no cache de prompts exatos."""
+        set_llm_cache(InMemoryCache())
+        inputs = {"context": "O checkout usa o serviço de pagamentos.", "query": "Como funciona o checkout?"}
+        
+        tokens = []
+        self.assertEqual(self.processor._run_chain(self.processor.chain, inputs, tokens.append),
+                         "Resposta simulada da IA")
+        self.assertGreater(len(tokens), 1)
+        
+        # Sem o cache, o modelo simulado devolveria a próxima resposta
+        self.assertEqual(self.processor.chain.invoke(inputs), "Resposta simulada da IA")
+        
+        # Em cache, a resposta chega de uma vez, sem chamar o modelo
+        tokens = []
+        self.assertEqual(self.processor._run_chain(self.processor.chain, inputs, tokens.append),
+                         "Resposta simulada da IA")
+        self.assertEqual(tokens, ["Resposta simulada da IA"])
+        self.assertEqual(self.processor.chain.invoke({**inputs, "query": "Outra pergunta"}), "Outra resposta")
+    
+    def test_astream_response_fills_llm_cache(self):
+        """Testa que a resposta transmitida por astream_response é a que invoke encontra no cache de prompts exatos."""
+        set_llm_cache(InMemoryCache())
+        self.vector_db.query.return_value = self._adr_results([ADR_DOCUMENT], [ADR_SOURCE])
+        query = "Fale sobre a ADR-001"
+        
+        chunks = asyncio.run(self._collect(query))
+        self.assertGreater(len(chunks), 1)
+        
+        chain, inputs = self.processor._prepare_query(query)
+        self.assertEqual(chain.invoke(inputs), "Resposta simulada da IA")
+
+class TestBatchProcessing(_MockedProcessorTestCase):
+    """Testes do processamento de várias consultas."""
+    
+    def test_batch_process_returns_exceptions_in_order(self):
+        """Testa que uma consulta com falha não descarta as respostas das demais."""
+        running = [0]
+        max_running = [0]
+        
+        async def aprocess_query(query):
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+            await asyncio.sleep(0.01 if query == "primeira" else 0)
+            running[0] -= 1
+            if query == "falha":
+                raise ValueError("Erro simulado")
+            return f"Resposta: {query}"
+        
+        with patch.object(self.processor, 'aprocess_query', side_effect=aprocess_query):
+            responses = asyncio.run(self.processor.batch_process(
+                ["primeira", "falha", "terceira", "quarta"], max_concurrency=2
+            ))
+        
+        self.assertEqual(responses[0], "Resposta: primeira")
+        self.assertIsInstance(responses[1], ValueError)
+        self.assertEqual(responses[2:], ["Resposta: terceira", "Resposta: quarta"])
+        self.assertLessEqual(max_running[0], 2)
+    
+    def test_run_piped_keeps_order(self):
+        """Testa que a entrada redirecionada é respondida em ordem, com comandos entre os lotes."""
+        self.vector_db.warm_up.return_value = 0
+        interface = CLI(self.processor)
+        interface._warm_up_thread.join()
+        
+        calls = []
+        
+        async def batch_process(queries):
+            calls.append(list(queries))
+            return [ValueError("Erro simulado") if query == "falha" else f"Resposta: {query}"
+                    for query in queries]
+        
+        stdin = io.StringIO("primeira\n\n!modelo\nsegunda\nfalha\nterceira\n")
+        output = io.StringIO()
+        loop = asyncio.new_event_loop()
+        try:
+            with patch.object(self.processor, 'batch_process', side_effect=batch_process), \
+                 patch.object(self.processor, 'switch_model') as mock_switch, \
+                 patch('sys.stdin', stdin), redirect_stdout(output):
+                interface._run_piped(loop)
+        finally:
+            loop.close()
+        
+        # O comando separa os lotes e roda depois das consultas anteriores
+        self.assertEqual(calls, [["primeira"], ["segunda", "falha", "terceira"]])
+        mock_switch.assert_called_once()
+        
+        text = output.getvalue()
+        positions = [text.index(marker) for marker in (
+            "Resposta: primeira", "> segunda", "Resposta: segunda",
+            "Erro ao processar consulta: Erro simulado", "Resposta: terceira"
+        )]
+        self.assertEqual(positions, sorted(positions))
+    
+    def _mock_batch_client(self, mock_openai, output_lines, status="completed"):
+        """Cliente da OpenAI simulado cujo lote termina com os resultados informados."""
+        client = mock_openai.return_value
+        client.files.create.return_value = MagicMock(id="arquivo-entrada")
+        client.batches.create.return_value = MagicMock(
+            id="lote-1", status=status, output_file_id="arquivo-saida"
+        )
+        client.files.content.return_value = MagicMock(
+            text="\n".join(json.dumps(line) for line in output_lines) + "\n"
+        )
+        return client
+    
+    def _batch_requests(self, client):
+        """Requisições enviadas no arquivo do lote."""
+        _, payload = client.files.create.call_args.kwargs["file"]
+        return [json.loads(line) for line in payload.decode("utf-8").splitlines()]
+    
+    @patch('openai.OpenAI')
+    def test_batch_api_results_mapped_by_custom_id(self, mock_openai):
+        """Testa que as respostas da Batch API voltam na ordem das consultas, pelo custom_id, e preenchem os caches."""
+        set_llm_cache(InMemoryCache())
+        
+        # Resultados fora de ordem, um com erro e uma consulta sem resultado
+        client = self._mock_batch_client(mock_openai, [
+            {"custom_id": "consulta-2", "response": {"body": {"choices": [{"message": {"content": "Resposta 2"}}]}}},
+            {"custom_id": "consulta-0", "response": {"body": {"choices": [{"message": {"content": "Resposta 0"}}]}}},
+            {"custom_id": "consulta-1", "response": None, "error": {"message": "limite excedido"}}
+        ])
+        
+        queries = ["primeira", "segunda", "terceira", "quarta"]
+        with patch.object(self.processor, '_get_relevant_context', return_value="Contexto"):
+            answers = self.processor.process_queries_batch(queries, poll_interval=0)
+        
+            self.assertEqual(answers[0], "Resposta 0")
+            self.assertIn("limite excedido", answers[1])
+            self.assertEqual(answers[2], "Resposta 2")
+            self.assertEqual(answers[3], "Consulta sem resposta no lote.")
+            
+            # Uma requisição de chat por consulta, identificada pela posição e
+            # com os parâmetros do modelo configurado
+            requests = self._batch_requests(client)
+            self.assertEqual([request["custom_id"] for request in requests],
+                             [f"consulta-{index}" for index in range(4)])
+            self.assertEqual([message["role"] for message in requests[1]["body"]["messages"]], ["system", "user"])
+            self.assertIn("segunda", requests[1]["body"]["messages"][1]["content"])
+            self.assertEqual(
+                {key: requests[0]["body"][key] for key in ("model", "temperature", "max_tokens")},
+                {"model": "gpt-4o-mini", "temperature": 0.2, "max_tokens": 500}
+            )
+            
+            # Respostas do lote ficam nos dois caches; erros não são guardados
+            self.assertEqual(self.processor.process_query("primeira"), "Resposta 0")
+            self.assertEqual(self.processor.chain.invoke({"context": "Contexto", "query": "terceira"}), "Resposta 2")
+            self.assertEqual(self.processor.process_query("segunda"), "Resposta simulada da IA")
+    
+    @patch('openai.OpenAI')
+    def test_batch_api_skips_cached_and_adr_queries(self, mock_openai):
+        """Testa que consultas em cache e sobre ADRs são respondidas sem entrar no lote."""
+        self.vector_db.query_all_collections.return_value = {}
+        self.vector_db.query.return_value = self._adr_results([ADR_DOCUMENT], [ADR_SOURCE])
+        self.assertEqual(self.processor.process_query("Como funciona o checkout?"), "Resposta simulada da IA")
+        
+        client = self._mock_batch_client(mock_openai, [
+            {"custom_id": "consulta-2", "response": {"body": {"choices": [{"message": {"content": "Resposta 2"}}]}}}
+        ])
+        
+        answers = self.processor.process_queries_batch(
+            ["Como funciona o checkout?", "Quais são os ADRs do projeto?", "Como funciona o frete?"], poll_interval=0
+        )
+        
+        self.assertEqual(answers, ["Resposta simulada da IA", "Outra resposta", "Resposta 2"])
+        self.assertEqual([request["custom_id"] for request in self._batch_requests(client)], ["consulta-2"])
+        
+        # Sem consultas pendentes, nenhum lote é criado
+        client.batches.create.reset_mock()
+        self.assertEqual(self.processor.process_queries_batch(["Como funciona o frete?"]), ["Resposta 2"])
+        client.batches.create.assert_not_called()
+    
+    @patch('openai.OpenAI')
+    def test_batch_api_timeout_falls_back_to_sync(self, mock_openai):
+        """Testa que um lote não concluído no prazo é cancelado e as consultas são respondidas uma a uma."""
+        self.vector_db.query_all_collections.return_value = {}
+        client = self._mock_batch_client(mock_openai, [], status="in_progress")
+        
+        with redirect_stdout(io.StringIO()):
+            answers = self.processor.process_queries_batch(
+                ["Como funciona o checkout?", "Como funciona o frete?"], poll_interval=0, timeout=0
+            )
+        
+        self.assertEqual(answers, ["Resposta simulada da IA", "Outra resposta"])
+        client.batches.cancel.assert_called_once_with("lote-1")
+        client.batches.retrieve.assert_not_called()
+        self.assertEqual(self.processor.process_query("Como funciona o frete?"), "Outra resposta")
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
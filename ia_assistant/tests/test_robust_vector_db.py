@@ -10,11 +10,12 @@ from unittest.mock import patch, MagicMock, call
 import tempfile
 import shutil
 import time
+import asyncio
 
 # Adiciona o diretório raiz ao path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ia_assistant.database.robust_vector_db import RobustVectorDatabase, get_robust_vector_database
+from ia_assistant.database.robust_vector_db import RobustVectorDatabase, get_robust_vector_database, tune_sqlite
 
 class TestRobustVectorDatabase(unittest.TestCase):
     """Testes para a base de dados vetorial robusta."""
@@ -56,6 +57,19 @@ class TestRobustVectorDatabase(unittest.TestCase):
         self.assertEqual(db.operation_metrics['total_operations'], 0)
         self.assertEqual(db.operation_metrics['successful_operations'], 0)
     
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    @patch('ia_assistant.database.robust_vector_db.chromadb.HttpClient')
+    @patch('ia_assistant.database.robust_vector_db.CHROMA_MODE', 'server')
+    def test_initialization_server_mode(self, mock_http_client, mock_persistent_client):
+        """Testa que o modo servidor usa HttpClient em vez do cliente embarcado."""
+        mock_http_client.return_value = MagicMock()
+        
+        db = RobustVectorDatabase(**self.test_config)
+        
+        mock_http_client.assert_called_once()
+        mock_persistent_client.assert_not_called()
+        self.assertIs(db.client, mock_http_client.return_value)
+    
     @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
     def test_initialization_with_retry_failure_then_success(self, mock_client):
         """Testa inicialização com falha inicial seguida de sucesso."""
@@ -168,6 +182,27 @@ class TestRobustVectorDatabase(unittest.TestCase):
         self.assertEqual(db.operation_metrics['successful_operations'], 0)
         self.assertEqual(db.operation_metrics['failed_operations'], 1)
     
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_retry_operation_non_retryable_failure(self, mock_client):
+        """Testa que erros determinísticos não são repetidos."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.heartbeat.return_value = None
+        mock_client.return_value = mock_client_instance
+        
+        db = RobustVectorDatabase(**self.test_config)
+        db.reset_metrics()
+        
+        operation = MagicMock(side_effect=ValueError("Entrada inválida"))
+        
+        with patch('ia_assistant.database.robust_vector_db.time.sleep') as mock_sleep:
+            with self.assertRaises(ValueError):
+                db.retry_operation(operation)
+            mock_sleep.assert_not_called()
+        
+        # Uma única tentativa, registrada como falha
+        self.assertEqual(operation.call_count, 1)
+        self.assertEqual(db.operation_metrics['failed_operations'], 1)
+    
     @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
     def test_add_documents_with_retry(self, mock_client):
         """Testa adição de documentos com retry mechanism."""
@@ -178,9 +213,8 @@ class TestRobustVectorDatabase(unittest.TestCase):
         
         # Mock da coleção
         mock_collection = MagicMock()
-        mock_collection.add.return_value = ["doc1", "doc2"]
-        mock_client_instance.get_collection.return_value = mock_collection
-        mock_client_instance.create_collection.return_value = mock_collection
+        mock_collection.upsert.return_value = ["doc1", "doc2"]
+        mock_client_instance.get_or_create_collection.return_value = mock_collection
         
         db = RobustVectorDatabase(**self.test_config)
         
@@ -195,7 +229,303 @@ class TestRobustVectorDatabase(unittest.TestCase):
         self.assertEqual(result, ["doc1", "doc2"])
         
         # Verifica se a operação foi chamada
-        mock_collection.add.assert_called_once()
+        mock_collection.upsert.assert_called_once()
+        
+        # Cada escrita avança a versão da base
+        self.assertEqual(db.version, 1)
+        db.delete_documents("test_collection", ["id1"])
+        self.assertEqual(db.version, 2)
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_delete_stale_chunks(self, mock_client):
+        """Testa a remoção dos chunks de um documento ausentes da versão atual."""
+        mock_client_instance = MagicMock()
+        mock_client.return_value = mock_client_instance
+        
+        mock_collection = MagicMock()
+        mock_collection.get.return_value = {"ids": ["doc_1", "doc_2", "doc_antigo"]}
+        mock_client_instance.get_or_create_collection.return_value = mock_collection
+        
+        db = RobustVectorDatabase(**self.test_config)
+        
+        db.delete_stale_chunks("test_collection", "doc", ["doc_1", "doc_2"])
+        mock_collection.get.assert_called_once_with(where={"document_id": "doc"}, include=[])
+        mock_collection.delete.assert_called_once_with(ids=["doc_antigo"])
+        self.assertEqual(db.version, 1)
+        
+        # Sem chunks antigos, nada é removido
+        mock_collection.get.return_value = {"ids": ["doc_1"]}
+        db.delete_stale_chunks("test_collection", "doc", ["doc_1"])
+        mock_collection.delete.assert_called_once()
+        self.assertEqual(db.version, 1)
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_add_documents_many_concurrently(self, mock_client):
+        """Testa inserção concorrente de vários lotes."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.heartbeat.return_value = None
+        mock_client.return_value = mock_client_instance
+        
+        mock_collection = MagicMock()
+        mock_collection.upsert.side_effect = lambda documents, metadatas, ids: ids
+        mock_client_instance.get_or_create_collection.return_value = mock_collection
+        
+        db = RobustVectorDatabase(**self.test_config)
+        
+        jobs = [
+            ("test_collection", [f"Document {i}"], [{"source": f"test{i}"}], [f"id{i}"])
+            for i in range(5)
+        ]
+        results = asyncio.run(db.aadd_documents_many(jobs, concurrency=2))
+        
+        # Resultados na ordem dos lotes, um upsert por lote
+        self.assertEqual(results, [[f"id{i}"] for i in range(5)])
+        self.assertEqual(mock_collection.upsert.call_count, 5)
+        
+        # A coleção é resolvida uma única vez e reutilizada
+        mock_client_instance.get_or_create_collection.assert_called_once()
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_add_documents_many_reports_failures_per_job(self, mock_client):
+        """Testa que a falha de um lote não descarta o resultado dos demais."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.heartbeat.return_value = None
+        mock_client.return_value = mock_client_instance
+        
+        def upsert(documents, metadatas, ids):
+            if ids == ["id1"]:
+                raise ValueError("Lote inválido")
+            return ids
+        
+        mock_collection = MagicMock()
+        mock_collection.upsert.side_effect = upsert
+        mock_client_instance.get_or_create_collection.return_value = mock_collection
+        
+        db = RobustVectorDatabase(**self.test_config)
+        
+        jobs = [("test_collection", [f"Document {i}"], [{"source": f"test{i}"}], [f"id{i}"]) for i in range(3)]
+        results = asyncio.run(db.aadd_documents_many(jobs, concurrency=3))
+        
+        self.assertEqual(results[0], ["id0"])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2], ["id2"])
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_collection_info_cached_until_write(self, mock_client):
+        """Testa que as informações da coleção são reaproveitadas até a próxima escrita."""
+        mock_client_instance = MagicMock()
+        mock_client.return_value = mock_client_instance
+        
+        mock_collection = MagicMock()
+        mock_collection.name = "test_collection"
+        mock_collection.count.side_effect = [2, 3]
+        mock_client_instance.get_or_create_collection.return_value = mock_collection
+        
+        db = RobustVectorDatabase(**self.test_config)
+        
+        self.assertEqual(db.get_collection_info("test_collection")["count"], 2)
+        self.assertEqual(db.get_collection_info("test_collection")["count"], 2)
+        self.assertEqual(mock_collection.count.call_count, 1)
+        
+        db.add_documents("test_collection", ["Document 3"], [{"source": "test3"}], ["id3"])
+        self.assertEqual(db.get_collection_info("test_collection")["count"], 3)
+        self.assertEqual(mock_collection.count.call_count, 2)
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_warm_up_queries_each_collection(self, mock_client):
+        """Testa o aquecimento das coleções existentes."""
+        mock_client_instance = MagicMock()
+        mock_client.return_value = mock_client_instance
+        
+        collections = []
+        for name in ("colecao_a", "colecao_b"):
+            collection = MagicMock()
+            collection.name = name
+            collections.append(collection)
+        mock_client_instance.list_collections.return_value = collections
+        
+        mock_collection = MagicMock()
+        mock_collection.query.side_effect = [None, Exception("Index not ready")]
+        mock_client_instance.get_or_create_collection.return_value = mock_collection
+        
+        db = RobustVectorDatabase(**self.test_config)
+        
+        # Falhas de aquecimento não são propagadas
+        self.assertEqual(db.warm_up(), 1)
+        self.assertEqual(mock_collection.query.call_count, 2)
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_query_all_collections(self, mock_client):
+        """Testa a busca em todas as coleções, com falhas isoladas por coleção."""
+        mock_client_instance = MagicMock()
+        mock_client.return_value = mock_client_instance
+        
+        # Mesma função de embedding nas duas coleções: a consulta é embutida uma única vez
+        embedding_function = MagicMock(return_value=[[0.1, 0.2]])
+        embedding_function.get_config.return_value = {"model": "teste"}
+        
+        collections = {}
+        for name in ("colecao_a", "colecao_b"):
+            collection = MagicMock()
+            collection.name = name
+            collection._embedding_function = embedding_function
+            collections[name] = collection
+        collections["colecao_a"].query.return_value = {"documents": [["doc a"]]}
+        collections["colecao_b"].query.side_effect = ValueError("Coleção inválida")
+        mock_client_instance.list_collections.return_value = list(collections.values())
+        mock_client_instance.get_or_create_collection.side_effect = lambda name, metadata=None: collections[name]
+        
+        db = RobustVectorDatabase(**self.test_config)
+        results = db.query_all_collections("pedido", n_results_per_collection=2)
+        
+        self.assertEqual(list(results), ["colecao_a", "colecao_b"])
+        self.assertEqual(results["colecao_a"], {"documents": [["doc a"]]})
+        self.assertIn("error", results["colecao_b"])
+        embedding_function.assert_called_once_with(["pedido"])
+        collections["colecao_a"].query.assert_called_once_with(
+            query_embeddings=[[0.1, 0.2]], n_results=2, where=None, where_document=None
+        )
+        
+        # As threads de consulta são reutilizadas entre chamadas
+        executor = db._query_executor
+        db.query_all_collections("pedido", n_results_per_collection=2)
+        self.assertIs(db._query_executor, executor)
+        self.assertLessEqual(len(executor._threads), 2)
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_embed_query_uses_collection_embedding_function(self, mock_client):
+        """Testa que o embedding da consulta vem da função de embedding das coleções."""
+        mock_client_instance = MagicMock()
+        mock_client.return_value = mock_client_instance
+        
+        collection = MagicMock()
+        collection.name = "colecao_a"
+        collection._embedding_function = MagicMock(return_value=[[0.3, 0.4]])
+        mock_client_instance.list_collections.return_value = [collection]
+        mock_client_instance.get_or_create_collection.return_value = collection
+        
+        db = RobustVectorDatabase(**self.test_config)
+        
+        self.assertEqual(db.embed_query("pedido"), [0.3, 0.4])
+        collection._embedding_function.assert_called_once_with(["pedido"])
+
+        # Consultas repetidas (após normalização) reaproveitam o embedding,
+        # inclusive na busca em todas as coleções
+        self.assertEqual(db.embed_query("  Pedido "), [0.3, 0.4])
+        db.query_all_collections("PEDIDO")
+        collection._embedding_function.assert_called_once_with(["pedido"])
+        collection.query.assert_called_once_with(
+            query_embeddings=[[0.3, 0.4]], n_results=3, where=None, where_document=None
+        )
+
+        # Sem coleções não há função de embedding
+        mock_client_instance.list_collections.return_value = []
+        with self.assertRaises(ValueError):
+            db.embed_query("pedido")
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_query_by_text(self, mock_client):
+        """Testa a consulta por texto com a assinatura do backend FAISS."""
+        mock_client_instance = MagicMock()
+        mock_client.return_value = mock_client_instance
+        
+        collection = MagicMock()
+        collection._embedding_function = MagicMock(return_value=[[0.3, 0.4]])
+        collection.query.return_value = {"ids": [["doc_1"]], "documents": [["Documento"]]}
+        mock_client_instance.get_or_create_collection.return_value = collection
+        
+        db = RobustVectorDatabase(**self.test_config)
+        
+        results = db.query(collection_name="decisoes_arquiteturais", query_text="ADR 001", n_results=5)
+        self.assertEqual(results["documents"], [["Documento"]])
+        collection.query.assert_called_once_with(
+            query_embeddings=[[0.3, 0.4]], n_results=5, where=None, where_document=None
+        )
+        
+        # O embedding é reaproveitado na consulta repetida
+        db.query("decisoes_arquiteturais", "adr 001")
+        collection._embedding_function.assert_called_once_with(["adr 001"])
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_bulk_load_restores_synchronous(self, mock_client):
+        """Testa o modo de carga em massa sobre a conexão SQLite."""
+        import sqlite3
+        mock_client.return_value = MagicMock()
+        db = RobustVectorDatabase(**self.test_config)
+        
+        connection = sqlite3.connect(os.path.join(self.temp_dir, "bulk.sqlite3"))
+        previous = connection.execute("PRAGMA synchronous").fetchone()[0]
+        
+        with patch('ia_assistant.database.robust_vector_db.sqlite_connection', return_value=connection):
+            with db.bulk_load():
+                self.assertEqual(connection.execute("PRAGMA synchronous").fetchone()[0], 0)
+        
+        self.assertEqual(connection.execute("PRAGMA synchronous").fetchone()[0], previous)
+        connection.close()
+    
+    @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
+    def test_bulk_load_covers_worker_thread_connections(self, mock_client):
+        """Testa que a carga em massa alcança as conexões das threads de aadd_documents_many."""
+        import sqlite3
+        import threading
+        mock_client_instance = MagicMock()
+        mock_client.return_value = mock_client_instance
+        
+        # Uma conexão por thread, como no pool do ChromaDB
+        local = threading.local()
+        connections = []
+        connections_lock = threading.Lock()
+        
+        def thread_connection(client):
+            if not hasattr(local, "connection"):
+                local.connection = sqlite3.connect(os.path.join(self.temp_dir, "bulk.sqlite3"),
+                                                   check_same_thread=False)
+                with connections_lock:
+                    connections.append(local.connection)
+            return local.connection
+        
+        synchronous_at_upsert = []
+        
+        def upsert(documents, metadatas, ids):
+            synchronous_at_upsert.append(local.connection.execute("PRAGMA synchronous").fetchone()[0])
+            return ids
+        
+        mock_collection = MagicMock()
+        mock_collection.upsert.side_effect = upsert
+        mock_client_instance.get_or_create_collection.return_value = mock_collection
+        
+        db = RobustVectorDatabase(**self.test_config)
+        jobs = [("test_collection", [f"Document {i}"], [{"source": f"test{i}"}], [f"id{i}"]) for i in range(6)]
+        
+        with patch('ia_assistant.database.robust_vector_db.sqlite_connection', side_effect=thread_connection):
+            with db.bulk_load():
+                asyncio.run(db.aadd_documents_many(jobs, concurrency=3))
+        
+        # Todas as escritas, feitas em threads de trabalho, rodaram sem fsync
+        self.assertEqual(synchronous_at_upsert, [0] * 6)
+        self.assertGreater(len(connections), 1)
+        
+        # E todas as conexões voltaram ao valor anterior ao sair do contexto
+        for connection in connections:
+            self.assertEqual(connection.execute("PRAGMA synchronous").fetchone()[0], 2)
+            connection.close()
+    
+    def test_tune_sqlite_only_when_enabled(self):
+        """Testa que os PRAGMAs de ingestão só são aplicados com CHROMA_TUNE_SQLITE=1."""
+        import sqlite3
+        connection = sqlite3.connect(os.path.join(self.temp_dir, "tune.sqlite3"))
+        
+        with patch('ia_assistant.database.robust_vector_db.sqlite_connection', return_value=connection):
+            with patch.dict(os.environ, {'CHROMA_TUNE_SQLITE': '0'}):
+                self.assertFalse(tune_sqlite(MagicMock()))
+            with patch.dict(os.environ, {'CHROMA_TUNE_SQLITE': '1'}):
+                self.assertTrue(tune_sqlite(MagicMock()))
+        
+        self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        self.assertEqual(connection.execute("PRAGMA synchronous").fetchone()[0], 1)
+        self.assertEqual(connection.execute("PRAGMA temp_store").fetchone()[0], 2)
+        self.assertEqual(connection.execute("PRAGMA cache_size").fetchone()[0], -262144)
+        connection.close()
     
     @patch('ia_assistant.database.robust_vector_db.chromadb.PersistentClient')
     def test_search_with_retry(self, mock_client):
@@ -212,8 +542,7 @@ class TestRobustVectorDatabase(unittest.TestCase):
             "metadatas": [[{"source": "test1"}, {"source": "test2"}]],
             "distances": [[0.1, 0.2]]
         }
-        mock_client_instance.get_collection.return_value = mock_collection
-        mock_client_instance.create_collection.return_value = mock_collection
+        mock_client_instance.get_or_create_collection.return_value = mock_collection
         
         db = RobustVectorDatabase(**self.test_config)
         
@@ -271,6 +600,7 @@ class TestRobustVectorDatabase(unittest.TestCase):
             'retry_operations': 0,
             'average_response_time': 0.0
         }
+        db._total_response_time = 0.0
         db.client = mock_client_instance
         
         # Testa health check
@@ -0,0 +1,88 @@
+"""
+Testes para o cache semântico de respostas.
+Valida o reaproveitamento por similaridade, o escopo, a validade e a persistência.
+"""
+
+import os
+import sys
+import unittest
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ia_assistant.interface.semantic_cache import SemanticCache
+
+# Embeddings fixos: as duas primeiras consultas são quase paralelas
+EMBEDDINGS = {
+    "quais adrs temos": [1.0, 0.0, 0.0],
+    "liste os adrs": [0.99, 0.05, 0.0],
+    "como funciona o checkout": [0.0, 1.0, 0.0]
+}
+
+class TestSemanticCache(unittest.TestCase):
+    """Testes para o SemanticCache."""
+    
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "semantic_cache.pkl")
+        self.cache = SemanticCache(EMBEDDINGS.__getitem__, path=self.path)
+    
+    def tearDown(self):
+        """Limpeza após os testes."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_similar_query_hits(self):
+        """Testa que consultas reformuladas reaproveitam a resposta."""
+        self.assertIsNone(self.cache.get("quais adrs temos"))
+        self.cache.put("quais adrs temos", "ADR-001, ADR-002")
+        
+        self.assertEqual(self.cache.get("liste os adrs"), "ADR-001, ADR-002")
+        self.assertIsNone(self.cache.get("como funciona o checkout"))
+    
+    def test_scope_must_match(self):
+        """Testa que entradas de outro escopo não são reaproveitadas."""
+        self.cache.put("quais adrs temos", "Detalhes do ADR 001", scope="001")
+        
+        self.assertIsNone(self.cache.get("liste os adrs", scope="002"))
+        self.assertEqual(self.cache.get("liste os adrs", scope="001"), "Detalhes do ADR 001")
+    
+    def test_ttl_and_lru_eviction(self):
+        """Testa a expiração por validade e o descarte da entrada usada há mais tempo."""
+        embeddings = dict(EMBEDDINGS, **{"qual o fluxo de pagamento": [0.0, 0.0, 1.0]})
+        with patch("ia_assistant.interface.semantic_cache.time.time") as clock:
+            clock.return_value = 100.0
+            cache = SemanticCache(embeddings.__getitem__, max_entries=2, ttl=300)
+            cache.put("quais adrs temos", "lista")
+            clock.return_value = 110.0
+            cache.put("como funciona o checkout", "checkout")
+            
+            # A listagem é reaproveitada; o checkout passa a ser o usado há mais tempo
+            clock.return_value = 120.0
+            self.assertEqual(cache.get("liste os adrs"), "lista")
+            cache.put("qual o fluxo de pagamento", "pagamento")
+            self.assertEqual(len(cache), 2)
+            self.assertIsNone(cache.get("como funciona o checkout"))
+            
+            # Após a validade, a listagem (criada em 100) expira
+            clock.return_value = 401.0
+            self.assertIsNone(cache.get("quais adrs temos"))
+            self.assertEqual(cache.get("qual o fluxo de pagamento"), "pagamento")
+    
+    def test_eviction_and_persistence(self):
+        """Testa o descarte das entradas antigas e a recarga do arquivo salvo."""
+        cache = SemanticCache(EMBEDDINGS.__getitem__, max_entries=1, path=self.path)
+        cache.put("quais adrs temos", "lista")
+        cache.put("como funciona o checkout", "checkout")
+        self.assertEqual(len(cache), 1)
+        cache.save()
+        
+        reloaded = SemanticCache(EMBEDDINGS.__getitem__, path=self.path)
+        self.assertIsNone(reloaded.get("quais adrs temos"))
+        self.assertEqual(reloaded.get("como funciona o checkout"), "checkout")
+
+if __name__ == '__main__':
+    unittest.main()
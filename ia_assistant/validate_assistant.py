@@ -72,7 +72,7 @@ def initialize_knowledge_base(project_root: str) -> Dict[str, Any]:
     
     return results
 
-def test_queries(project_root: str, queries: List[str], model_name: str = "gpt-3.5-turbo-instruct") -> Dict[str, Any]:
+def test_queries(project_root: str, queries: List[str], model_name: str = "gpt-4o-mini") -> Dict[str, Any]:
     """
     Testa consultas à assistente de IA.
     
@@ -128,13 +128,13 @@ def main():
                        help="Caminho raiz do projeto")
     parser.add_argument("--initialize", action="store_true",
                        help="Inicializar a base de conhecimento")
-    parser.add_argument("--model", choices=["gpt-3.5", "gpt-4"], default="gpt-3.5",
+    parser.add_argument("--model", choices=["gpt-4o-mini", "gpt-4"], default="gpt-4o-mini",
                        help="Modelo da OpenAI a ser utilizado")
     
     args = parser.parse_args()
     
     # Define o modelo a ser utilizado
-    model_name = "gpt-4" if args.model == "gpt-4" else "gpt-3.5-turbo-instruct"
+    model_name = "gpt-4" if args.model == "gpt-4" else "gpt-4o-mini"
     
     # Inicializa a base de conhecimento se solicitado
     if args.initialize: